@@ -0,0 +1,76 @@
+import os
+import pygame
+from settings import ASSETS_PATH
+
+# name -> (sheet path under assets/, frame width, frame height, seconds per frame)
+ANIMATIONS = {
+    'saw_on': (('Traps', 'Saw', 'On (38x38).png'), 38, 38, 0.05),
+    'fire_on': (('Traps', 'Fire', 'On (16x32).png'), 16, 32, 0.08),
+    'fan_on': (('Traps', 'Fan', 'On (24x8).png'), 24, 8, 0.05),
+    'trampoline_jump': (('Traps', 'Trampoline', 'Jump (28x28).png'), 28, 28, 0.05),
+    'spike_head_blink': (('Traps', 'Spike Head', 'Blink (54x52).png'), 54, 52, 0.1),
+    'arrow_idle': (('Traps', 'Arrow', 'Idle (18x18).png'), 18, 18, 0.05),
+    'platform_grey_on': (('Traps', 'Platforms', 'Grey On (32x8).png'), 32, 8, 0.08),
+    'platform_brown_on': (('Traps', 'Platforms', 'Brown On (32x8).png'), 32, 8, 0.08),
+    'confetti': (('Other', 'Confetti (16x16).png'), 16, 16, 0.1),
+}
+
+# Shared animation clock; only Game advances it, so every instance of an
+# animation steps together and per-instance animation state is just a phase
+_clock = 0.0
+
+
+def advance(dt):
+    """Advance the shared clock once per rendered frame"""
+    global _clock
+    _clock += dt
+
+
+def clock():
+    return _clock
+
+
+class SpriteAtlas:
+    """Animation sheets sliced once into frame lists.
+
+    Scaled and rotated variants are built the first time they're asked for
+    and shared by every instance. frame() picks a frame by index from the
+    shared clock, so instances don't update anything per tick.
+    """
+    def __init__(self, asset_manager):
+        self.asset_manager = asset_manager
+        self.sheets = {}  # name -> source frames
+        self.variants = {}  # (name, size, angle) -> frames
+        for name, (parts, frame_w, frame_h, _seconds) in ANIMATIONS.items():
+            path = os.path.join(ASSETS_PATH, *parts)
+            if not os.path.exists(path):
+                continue
+            try:
+                sheet = pygame.image.load(path).convert_alpha()
+            except pygame.error as e:
+                print(f"Error loading animation {name}: {e}")
+                continue
+            self.sheets[name] = asset_manager.extract_frames(sheet, frame_w, frame_h)
+
+    def has(self, name):
+        return bool(self.sheets.get(name))
+
+    def frames(self, name, size=None, angle=0):
+        """Frames of an animation, scaled to `size` and rotated by `angle` degrees; [] if the sheet is missing"""
+        key = (name, size, angle)
+        frames = self.variants.get(key)
+        if frames is None:
+            frames = self.sheets.get(name, [])
+            if size:
+                frames = [pygame.transform.scale(frame, size) for frame in frames]
+            if angle:
+                frames = [pygame.transform.rotate(frame, angle) for frame in frames]
+            self.variants[key] = frames
+        return frames
+
+    def frame(self, name, phase=0.0, size=None, angle=0):
+        """Current frame on the shared clock, offset by `phase` seconds; None if the sheet is missing"""
+        frames = self.frames(name, size, angle)
+        if not frames:
+            return None
+        return frames[int((_clock + phase) / ANIMATIONS[name][3]) % len(frames)]
@@ -1,7 +1,9 @@
 import pygame
+import collections
 import os
 import math
-from settings import ASSETS_PATH, RED, DARK_RED, GRAY, GREEN, DARK_GREEN, WHITE, BLACK, CYAN, DARK_BLUE, DARK_PURPLE, YELLOW, ORANGE
+from animation import SpriteAtlas
+from settings import ASSETS_PATH, LEVEL_THUMBNAIL_CACHE, LEVEL_THUMBNAIL_SIZE, RED, DARK_RED, GRAY, GREEN, DARK_GREEN, WHITE, BLACK, CYAN, DARK_BLUE, DARK_PURPLE, YELLOW, ORANGE
 
 class AssetManager:
     def __init__(self):
@@ -9,6 +11,7 @@ class AssetManager:
         self.ui_images = {}
         self._load_assets()
         self._generate_fallback_assets()  # NEW: Generate programmatic assets if files missing
+        self.atlas = SpriteAtlas(self)  # NEW: Animated trap sheets, sliced once
 
     def _load_assets(self):
         """Load all game assets from files"""
@@ -55,6 +58,21 @@ class AssetManager:
             if os.path.exists(goal_path):
                 self.images['goal'] = pygame.image.load(goal_path).convert_alpha()
 
+            # NEW: Idle moving platform sprites and the chain drawn along their path (animations live in the atlas)
+            platforms_dir = os.path.join(ASSETS_PATH, 'Traps', 'Platforms')
+            for color in ('Grey', 'Brown'):
+                off_path = os.path.join(platforms_dir, f'{color} Off.png')
+                if os.path.exists(off_path):
+                    self.images[f'platform_{color.lower()}_off'] = pygame.image.load(off_path).convert_alpha()
+            chain_path = os.path.join(platforms_dir, 'Chain.png')
+            if os.path.exists(chain_path):
+                self.images['platform_chain'] = pygame.image.load(chain_path).convert_alpha()
+
+            # NEW: Bounce pad sprite (its Jump animation lives in the atlas)
+            trampoline_path = os.path.join(ASSETS_PATH, 'Traps', 'Trampoline', 'Idle.png')
+            if os.path.exists(trampoline_path):
+                self.images['trampoline'] = pygame.image.load(trampoline_path).convert_alpha()
+
             # Background
             bg_path = os.path.join(ASSETS_PATH, 'background', 'background.png')
             if os.path.exists(bg_path):
@@ -82,6 +100,13 @@ class AssetManager:
             if os.path.exists(skull_icon_path):
                 self.ui_images['skull_icon'] = pygame.image.load(skull_icon_path).convert_alpha()
 
+            # NEW: Level-select page arrows (pixel art, drawn at 2x)
+            for name, filename in (('menu_previous', 'Previous.png'), ('menu_next', 'Next.png')):
+                arrow_path = os.path.join(ASSETS_PATH, 'Menu', 'Buttons', filename)
+                if os.path.exists(arrow_path):
+                    arrow = pygame.image.load(arrow_path).convert_alpha()
+                    self.ui_images[name] = pygame.transform.scale(arrow, (arrow.get_width() * 2, arrow.get_height() * 2))
+
         except pygame.error as e:
             print(f"Error loading assets: {e}")
 
@@ -185,3 +210,45 @@ class AssetManager:
                     frame = image.subsurface(pygame.Rect(x, y, frame_w, frame_h))
                     frames.append(frame)
         return frames
+
+
+class ThumbnailCache:
+    """NEW: Level-select icons (assets/Menu/Levels/NN.png), decoded on demand.
+
+    Keeps at most `capacity` scaled thumbnails, evicting the least recently
+    used, so memory doesn't grow with the level count. prefetch() queues
+    levels to decode later, one per load_next() call.
+    """
+    def __init__(self, capacity=LEVEL_THUMBNAIL_CACHE, size=LEVEL_THUMBNAIL_SIZE):
+        self.capacity = capacity
+        self.size = size
+        self.cache = collections.OrderedDict()  # level number -> Surface or None (no icon)
+        self.queue = collections.deque()
+
+    def get(self, level_num):
+        if level_num in self.cache:
+            self.cache.move_to_end(level_num)
+            return self.cache[level_num]
+        thumb = None
+        path = os.path.join(ASSETS_PATH, 'Menu', 'Levels', f"{level_num:02d}.png")
+        if os.path.exists(path):
+            try:
+                thumb = pygame.transform.scale(pygame.image.load(path).convert_alpha(), self.size)
+            except pygame.error as e:
+                print(f"Error loading level icon {level_num}: {e}")
+        self.cache[level_num] = thumb
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        return thumb
+
+    def prefetch(self, level_nums):
+        self.queue = collections.deque(n for n in level_nums if n not in self.cache)
+
+    def load_next(self):
+        """Decode one queued thumbnail; returns False when nothing is left"""
+        while self.queue:
+            level_num = self.queue.popleft()
+            if level_num not in self.cache:
+                self.get(level_num)
+                return True
+        return False
@@ -0,0 +1,346 @@
+"""Replay-driven performance benchmark over every level.
+
+Runs each LevelFactory level headlessly from recorded replays (or a scripted
+fallback trace), times every frame phase and writes the results as JSON.
+Exits with status 1 if any phase's p95 exceeds its budget.
+
+    python benchmark.py --traces replays --out bench.json --budgets budgets.json
+    python benchmark.py --stress-sweep 500,1000,2000,5000 --no-alloc
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Must be set before settings initialises pygame
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import glob
+import json
+import sys
+import time
+import tracemalloc
+from settings import *
+from main import Game
+from quality import QualityGovernor
+from levels import LevelFactory
+from replay import Replayer, read_replay, KEY_BITS
+
+PHASES = ('update', 'collision', 'level_draw', 'overlays', 'scaling')
+
+
+class PhaseTimer:
+    """Accumulates per-phase time within a frame, then keeps one sample per frame"""
+    def __init__(self):
+        self.samples = {phase: [] for phase in PHASES}
+        self.current = dict.fromkeys(PHASES, 0.0)
+
+    def add(self, phase, seconds):
+        self.current[phase] += seconds
+
+    def end_frame(self):
+        # Collision runs inside Level.step, so take it back out of update
+        self.current['update'] -= self.current['collision']
+        for phase in PHASES:
+            self.samples[phase].append(self.current[phase] * 1000)
+            self.current[phase] = 0.0
+
+    def summary(self):
+        result = {}
+        for phase, values in self.samples.items():
+            ordered = sorted(values) or [0.0]
+            result[phase] = {
+                'mean_ms': round(sum(ordered) / len(ordered), 4),
+                'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))], 4),
+                'max_ms': round(ordered[-1], 4),
+            }
+        return result
+
+
+def _timed(timer, phase, func):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.add(phase, time.perf_counter() - start)
+    return wrapper
+
+
+def scripted_trace(level_num, seed=0, ticks=BENCHMARK_SCRIPTED_TICKS):
+    """Fallback input when a level has no recording: run right, hop every 45 ticks"""
+    right = 1 << KEY_BITS.index(pygame.K_d)
+    jump = 1 << KEY_BITS.index(pygame.K_w)
+    frame_ms = (17, 17, 16)  # What clock.tick(60) reports
+    trace = [(right | (jump if t % 45 < 10 else 0), frame_ms[t % 3]) for t in range(ticks)]
+    return {'level': level_num, 'seed': seed, 'fps': FPS}, trace
+
+
+def load_traces(traces_dir):
+    """Map level number -> list of (header, ticks) from every .rep file in traces_dir"""
+    traces = {}
+    if traces_dir:
+        for path in sorted(glob.glob(os.path.join(traces_dir, '*.rep'))):
+            header, ticks = read_replay(path)
+            traces.setdefault(header['level'], []).append((header, ticks))
+    return traces
+
+
+def load_budgets(path):
+    budgets = {'default': dict(BENCHMARK_BUDGETS_MS)}
+    if path:
+        with open(path, 'r') as f:
+            for key, phases in json.load(f).items():
+                budgets.setdefault(key, dict(budgets['default'])).update(phases)
+    return budgets
+
+
+class LevelBenchmark:
+    """Plays one trace through a headless Game, timing or allocation-tracing each frame"""
+    def __init__(self, game, header, ticks):
+        self.game = game
+        self.replayer = Replayer(header, ticks, game.levels, game.asset_manager)
+
+    def run(self, frame_hook):
+        game, replayer = self.game, self.replayer
+        replayer.start()
+        game.current_level = replayer.level
+        game.player = replayer.player
+        game.camera = replayer.camera
+        game.state = 'playing'
+        game.death_flash_active = False
+        frame_hook.instrument(game)
+
+        while True:
+            frame_hook.begin()
+            start = time.perf_counter()
+            outcome = replayer.step()
+            elapsed = time.perf_counter() - start
+            frame_hook.add('update', elapsed)
+            if outcome == 'end':
+                frame_hook.discard()
+                return
+            if outcome == 'reset':
+                game.state = 'playing'
+                frame_hook.discard()
+                frame_hook.respawn_time(elapsed)
+                continue
+
+            self._render(frame_hook)
+            if outcome == 'death':
+                game.state = 'death'
+                game.current_death_message = replayer.death_message
+                game.death_flash_active = True
+                game.death_flash_timer = DEATH_FLASH_DURATION
+                self._hold(frame_hook, BENCHMARK_DEATH_FRAMES)
+                if not replayer.next_is_reset():
+                    # Scripted traces carry no R presses
+                    start = time.perf_counter()
+                    replayer.reset_level()
+                    frame_hook.respawn_time(time.perf_counter() - start)
+                game.state = 'playing'
+            elif outcome == 'victory':
+                game.state = 'victory'
+                self._hold(frame_hook, BENCHMARK_VICTORY_FRAMES)
+                return
+
+    def _hold(self, frame_hook, frames):
+        """Render frames where the simulation is paused (death/victory screens)"""
+        for _ in range(frames):
+            frame_hook.begin()
+            start = time.perf_counter()
+            self.game._update(1.0 / FPS)
+            frame_hook.add('update', time.perf_counter() - start)
+            self._render(frame_hook)
+
+    def _render(self, frame_hook):
+        game = self.game
+        t0 = time.perf_counter()
+        game._draw_world()
+        t1 = time.perf_counter()
+        game._draw_hud()
+        t2 = time.perf_counter()
+        game._scale_to_screen()
+        t3 = time.perf_counter()
+        game._draw_screen_overlay()
+        t4 = time.perf_counter()
+        frame_hook.add('level_draw', t1 - t0)
+        frame_hook.add('overlays', (t2 - t1) + (t4 - t3))
+        frame_hook.add('scaling', t3 - t2)
+        frame_hook.end()
+
+
+class FrameHook:
+    """No-op base for the per-frame callbacks LevelBenchmark makes"""
+    def instrument(self, game):
+        pass
+
+    def begin(self):
+        pass
+
+    def add(self, phase, seconds):
+        pass
+
+    def discard(self):
+        pass
+
+    def end(self):
+        pass
+
+    def respawn_time(self, seconds):
+        pass
+
+
+class TimingHook(FrameHook):
+    def __init__(self):
+        self.timer = PhaseTimer()
+        self.respawns = []
+
+    def instrument(self, game):
+        # Instance-level wrappers so the game code itself stays untouched
+        player = game.player
+        player._handle_collisions = _timed(self.timer, 'collision', player._handle_collisions)
+        for trap in game.current_level.traps:
+            # Wrap the class method so repeated runs never stack wrappers
+            unwrapped = type(trap).check_collision.__get__(trap)
+            trap.check_collision = _timed(self.timer, 'collision', unwrapped)
+        world = game.current_level.trap_world
+        if world:
+            world.collide = _timed(self.timer, 'collision', type(world).collide.__get__(world))
+
+    def add(self, phase, seconds):
+        self.timer.add(phase, seconds)
+
+    def discard(self):
+        self.timer.current = dict.fromkeys(PHASES, 0.0)
+
+    def end(self):
+        self.timer.end_frame()
+
+    def respawn_time(self, seconds):
+        self.respawns.append(seconds * 1e6)
+
+    def respawn_summary(self):
+        samples = self.respawns or [0.0]
+        return {
+            'count': len(self.respawns),
+            'mean_us': round(sum(samples) / len(samples), 2),
+            'max_us': round(max(samples), 2),
+        }
+
+
+class AllocationHook(FrameHook):
+    """Transient Python-heap bytes per frame (tracemalloc peak above the frame's start).
+
+    SDL surface pixel buffers are allocated outside the Python heap and are not counted.
+    """
+    def __init__(self):
+        self.samples = []
+
+    def begin(self):
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        self.samples.append(tracemalloc.get_traced_memory()[1] - self.base)
+
+    def summary(self):
+        samples = self.samples or [0]
+        return {
+            'mean_kib': round(sum(samples) / len(samples) / 1024, 2),
+            'max_kib': round(max(samples) / 1024, 2),
+        }
+
+
+def bench_traces(game, level_traces, trace_allocations=True):
+    """Time (and optionally allocation-trace) a list of (header, ticks) on one level"""
+    timing = TimingHook()
+    for header, ticks in level_traces:
+        LevelBenchmark(game, header, ticks).run(timing)
+    entry = {
+        'traces': len(level_traces),
+        'frames': len(timing.timer.samples['update']),
+        'phases': timing.timer.summary(),
+        'respawn': timing.respawn_summary(),
+    }
+    if trace_allocations:
+        allocation = AllocationHook()
+        tracemalloc.start()
+        for header, ticks in level_traces:
+            LevelBenchmark(game, header, ticks).run(allocation)
+        tracemalloc.stop()
+        entry['alloc_per_frame'] = allocation.summary()
+    return entry
+
+
+def bench_stress(game, platform_count, seed, trace_allocations=True, trap_backend=None, arrow_launchers=0):
+    """Benchmark a synthetic level; traps scale with the platform count"""
+    trap_mix = {kind: max(1, count * platform_count // 5000) for kind, count in STRESS_DEFAULT_TRAP_MIX.items()}
+    trap_mix['arrow_launcher'] = arrow_launchers
+    level = LevelFactory.create_stress_level(
+        len(game.levels) + 1, width=platform_count * STRESS_PIXELS_PER_PLATFORM,
+        platform_count=platform_count, trap_mix=trap_mix, seed=seed, asset_manager=game.asset_manager,
+        trap_backend=trap_backend)
+    game.levels.append(level)
+    try:
+        entry = bench_traces(game, [scripted_trace(level.num, seed)], trace_allocations)
+    finally:
+        game.levels.pop()
+    entry.update({'platforms': len(level.platforms), 'traps': len(level.traps), 'width': level.width,
+                  'trap_backend': 'arrays' if level.trap_world else 'objects'})
+    return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--traces', default=REPLAY_DIR, help="Directory of .rep recordings")
+    parser.add_argument('--out', default='bench.json', help="JSON results path")
+    parser.add_argument('--budgets', help="JSON overrides: {\"default\": {...}, \"10\": {\"overlays\": 12}}")
+    parser.add_argument('--levels', help="Comma-separated level numbers (default: all)")
+    parser.add_argument('--tier', help="Pin a quality tier by name (default: highest)")
+    parser.add_argument('--no-alloc', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--stress-sweep', help="Comma-separated platform counts for synthetic levels, e.g. 500,1000,5000")
+    parser.add_argument('--stress-seed', type=int, default=0)
+    parser.add_argument('--trap-backend', choices=('objects', 'arrays'), help="Trap backend for stress levels (default: TRAP_BACKEND)")
+    parser.add_argument('--arrows', type=int, default=0, help="Arrow launchers per stress level (forces the objects backend)")
+    args = parser.parse_args(argv)
+
+    game = Game()
+    if args.tier:
+        names = [tier['name'] for tier in QUALITY_TIERS]
+        game.quality = QualityGovernor(FPS, start_tier=names.index(args.tier))
+    traces = load_traces(args.traces)
+    budgets = load_budgets(args.budgets)
+    if args.levels:
+        level_nums = [int(n) for n in args.levels.split(',')]
+    else:
+        level_nums = [] if args.stress_sweep else range(1, len(game.levels) + 1)
+
+    results = {'tier': game.quality.tier['name'], 'levels': {}, 'stress': [], 'failures': []}
+    for level_num in level_nums:
+        level_traces = traces.get(level_num) or [scripted_trace(level_num)]
+        entry = bench_traces(game, level_traces, not args.no_alloc)
+
+        level_budget = budgets.get(str(level_num), budgets['default'])
+        for phase, stats in entry['phases'].items():
+            limit = level_budget.get(phase)
+            if limit is not None and stats['p95_ms'] > limit:
+                results['failures'].append(f"level {level_num} {phase}: p95 {stats['p95_ms']}ms > budget {limit}ms")
+        results['levels'][str(level_num)] = entry
+        phases = '  '.join(f"{phase} {stats['p95_ms']:.2f}" for phase, stats in entry['phases'].items())
+        print(f"Level {level_num:2d} ({entry['frames']} frames) p95 ms: {phases}")
+
+    # Frame time against entity count, per subsystem (not budget-checked)
+    if args.stress_sweep:
+        for platform_count in [int(n) for n in args.stress_sweep.split(',')]:
+            entry = bench_stress(game, platform_count, args.stress_seed, not args.no_alloc, args.trap_backend, args.arrows)
+            results['stress'].append(entry)
+            phases = '  '.join(f"{phase} {stats['mean_ms']:.2f}" for phase, stats in entry['phases'].items())
+            print(f"Stress {entry['platforms']} platforms / {entry['traps']} traps, mean ms: {phases}")
+
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    for failure in results['failures']:
+        print(f"BUDGET EXCEEDED: {failure}")
+    return 1 if results['failures'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import collections
+import os
+import struct
+from settings import DEATH_LOG_BATCH, DEATH_HEATMAP_CELL, GAME_HEIGHT
+
+try:
+    import numpy as np
+except ImportError:  # Aggregation falls back to chunked struct parsing
+    np = None
+
+# One fixed-width record per death: level, x, y, tick, cause, trap index
+RECORD_FORMAT = '<HffIBH'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+NO_TRAP = 0xFFFF
+CHUNK_RECORDS = 65536
+
+# Cause codes are stored as indexes into this tuple; append only, never reorder
+CAUSES = ('fall', 'InvisibleSpike', 'FakePlatform', 'TrollSaw', 'FakeGoal', 'NarrowGap', 'other', 'ArrowLauncher')
+_cause_codes = {name: code for code, name in enumerate(CAUSES)}
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('level', '<u2'), ('x', '<f4'), ('y', '<f4'),
+                             ('tick', '<u4'), ('cause', 'u1'), ('trap', '<u2')])
+
+
+class DeathLog:
+    """Append-only binary log of every death, flushed in batches.
+
+    Queries stream the file (memory-mapped when NumPy is available) instead
+    of materialising one Python object per death.
+    """
+    def __init__(self, log_file="rage_deaths.bin", batch=DEATH_LOG_BATCH):
+        self.log_file = log_file
+        self.batch = batch
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def record(self, level_num, x, y, tick, cause='fall', trap_index=None):
+        code = _cause_codes.get(cause, _cause_codes['other'])
+        trap = NO_TRAP if trap_index is None else trap_index
+        self.buffer += struct.pack(RECORD_FORMAT, level_num, x, y, tick, code, trap)
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        try:
+            with open(self.log_file, 'ab') as f:
+                f.write(self.buffer)
+        except IOError:
+            print(f"Error: Could not append to death log '{self.log_file}'.")
+            return
+        self.buffer.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+
+    def __len__(self):
+        size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        return size // RECORD_SIZE + self.pending
+
+    def _records(self):
+        """Memory-mapped structured array of every flushed record (NumPy only)"""
+        self.flush()
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.log_file, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def _iter_chunks(self):
+        """Yields lists of record tuples, CHUNK_RECORDS at a time"""
+        self.flush()
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'rb') as f:
+            while True:
+                data = f.read(CHUNK_RECORDS * RECORD_SIZE)
+                if len(data) < RECORD_SIZE:
+                    return
+                usable = len(data) - len(data) % RECORD_SIZE
+                yield struct.iter_unpack(RECORD_FORMAT, data[:usable])
+
+    def positions(self, level_num):
+        """(xs, ys) of every death on a level; NumPy arrays when available"""
+        if np is not None:
+            records = self._records()
+            on_level = records[records['level'] == level_num]
+            return on_level['x'].astype(np.float32), on_level['y'].astype(np.float32)
+        xs, ys = [], []
+        for chunk in self._iter_chunks():
+            for level, x, y, _tick, _cause, _trap in chunk:
+                if level == level_num:
+                    xs.append(x)
+                    ys.append(y)
+        return xs, ys
+
+    def heatmap(self, level_num, width, height=GAME_HEIGHT, cell=DEATH_HEATMAP_CELL):
+        """Death counts bucketed into cell x cell squares, as rows of ints"""
+        cols = max(1, -(-width // cell))
+        rows = max(1, -(-height // cell))
+        if np is not None:
+            xs, ys = self.positions(level_num)
+            col = np.clip((xs // cell).astype(np.int64), 0, cols - 1)
+            row = np.clip((ys // cell).astype(np.int64), 0, rows - 1)
+            counts = np.bincount(row * cols + col, minlength=rows * cols)
+            return counts.reshape(rows, cols).tolist()
+        grid = [[0] * cols for _ in range(rows)]
+        xs, ys = self.positions(level_num)
+        for x, y in zip(xs, ys):
+            grid[min(max(int(y // cell), 0), rows - 1)][min(max(int(x // cell), 0), cols - 1)] += 1
+        return grid
+
+    def kill_counts(self, level_num=None):
+        """Counter of (cause, trap index) -> deaths, optionally for one level"""
+        counts = collections.Counter()
+        if np is not None:
+            records = self._records()
+            if level_num is not None:
+                records = records[records['level'] == level_num]
+            keys, totals = np.unique(records[['cause', 'trap']], return_counts=True)
+            for (cause, trap), total in zip(keys.tolist(), totals.tolist()):
+                counts[(CAUSES[cause], None if trap == NO_TRAP else trap)] += total
+            return counts
+        for chunk in self._iter_chunks():
+            for level, _x, _y, _tick, cause, trap in chunk:
+                if level_num is None or level == level_num:
+                    counts[(CAUSES[cause], None if trap == NO_TRAP else trap)] += 1
+        return counts
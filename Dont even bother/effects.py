@@ -0,0 +1,104 @@
+import pygame
+from settings import *
+
+
+class EffectSprites:
+    """Pre-rendered sprites for screen-space UI particles.
+
+    Dots are drawn once per (color, size) at PARTICLE_FADE_STEPS alpha levels;
+    confetti pieces (from the shipped confetti sheet, or plain squares when
+    it's missing) are rotated once per size into CONFETTI_ROTATION_STEPS
+    angles. Each sprite is stored with its offset from the particle (confetti
+    is centred on it), so a rotation step is a list index, not a transform.
+    """
+    def __init__(self, asset_manager=None):
+        self.atlas = asset_manager.atlas if asset_manager else None
+        self.dots = {}
+        self.confetti = {}
+
+    def dot(self, color, size, alpha=255):
+        """Fade sequence for a circle of radius `size`: index 0 is faintest, the last is `alpha`"""
+        key = (color, size, alpha)
+        if key not in self.dots:
+            frames = []
+            for step in range(1, PARTICLE_FADE_STEPS + 1):
+                surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surf, (*color, alpha * step // PARTICLE_FADE_STEPS), (size, size), size)
+                frames.append((surf, (0, 0)))
+            self.dots[key] = frames
+        return self.dots[key]
+
+    def confetti_kinds(self):
+        """How many distinct confetti pieces there are"""
+        return len(self.atlas.frames('confetti')) if self.atlas and self.atlas.has('confetti') else len(CONFETTI_COLORS)
+
+    def confetti_piece(self, kind, size):
+        """Rotation sequence (CONFETTI_ROTATION_STEPS angles) for one piece"""
+        key = (kind, size)
+        if key not in self.confetti:
+            if self.atlas and self.atlas.has('confetti'):
+                base = pygame.transform.scale(self.atlas.frames('confetti')[kind], (size * 2, size * 2))
+            else:
+                base = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.rect(base, CONFETTI_COLORS[kind], (0, 0, size, size))
+            frames = []
+            for step in range(CONFETTI_ROTATION_STEPS):
+                rotated = pygame.transform.rotate(base, step * 360 / CONFETTI_ROTATION_STEPS)
+                frames.append((rotated, (-rotated.get_width() // 2, -rotated.get_height() // 2)))
+            self.confetti[key] = frames
+        return self.confetti[key]
+
+
+class EffectLayer:
+    """Screen-space particles advanced by real dt and drawn in one Surface.blits batch.
+
+    Particles are small lists [x, y, vx, vy, life, max_life, angle, spin,
+    frames]. Ones with a life fade through their frames; spinning ones pick
+    the frame for their angle. Particles leaving the bottom expire, unless
+    the layer wraps (menu dust).
+    """
+    def __init__(self, wrap=None):
+        self.wrap = wrap  # (width, height) to wrap around instead of expiring
+        self.particles = []
+
+    def __len__(self):
+        return len(self.particles)
+
+    def clear(self):
+        self.particles.clear()
+
+    def spawn(self, x, y, vx, vy, frames, life=None, angle=0.0, spin=0.0):
+        self.particles.append([x, y, vx, vy, life, life, angle, spin, frames])
+
+    def update(self, dt, bottom=SCREEN_HEIGHT):
+        alive = []
+        for p in self.particles:
+            p[0] += p[2] * dt
+            p[1] += p[3] * dt
+            p[6] += p[7] * dt
+            if p[4] is not None:
+                p[4] -= dt
+                if p[4] <= 0:
+                    continue
+            if self.wrap:
+                p[0] %= self.wrap[0]
+                p[1] %= self.wrap[1]
+            elif p[1] > bottom + 20:
+                continue
+            alive.append(p)
+        self.particles = alive
+
+    def sprite(self, p):
+        """(surface, top-left position) for a particle's current frame"""
+        frames = p[8]
+        if p[7]:
+            index = int(p[6] * len(frames) / 360) % len(frames)
+        elif p[4] is not None:
+            index = min(len(frames) - 1, int(len(frames) * p[4] / p[5]))
+        else:
+            index = len(frames) - 1
+        surf, (ox, oy) = frames[index]
+        return surf, (int(p[0]) + ox, int(p[1]) + oy)
+
+    def draw(self, screen):
+        screen.blits([self.sprite(p) for p in self.particles], False)
@@ -0,0 +1,135 @@
+import collections
+import pygame
+from settings import GAME_WIDTH, PLAYER_WIDTH, PLAYER_HEIGHT, GREEN, GHOST_MAX_ATTEMPTS, GHOST_ALPHA
+
+try:
+    import numpy as np
+except ImportError:  # Ghosts are simply unavailable without NumPy
+    np = None
+
+ANIMATION_STATES = ('idle', 'run', 'jump')
+
+
+class GhostTrack:
+    """One attempt sampled per tick: x, y and an index into the ghost sprite atlas"""
+    def __init__(self, capacity=1024):
+        self.xs = np.empty(capacity, dtype=np.int32)
+        self.ys = np.empty(capacity, dtype=np.int16)
+        self.sprites = np.empty(capacity, dtype=np.uint16)
+        self.length = 0
+
+    def append(self, x, y, sprite):
+        if self.length == len(self.xs):
+            for name in ('xs', 'ys', 'sprites'):
+                old = getattr(self, name)
+                grown = np.empty(len(old) * 2, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        self.xs[self.length] = x
+        self.ys[self.length] = y
+        self.sprites[self.length] = sprite
+        self.length += 1
+
+
+class GhostStack:
+    """A level's stored attempts as (ghosts, ticks) arrays; the oldest row is overwritten"""
+    def __init__(self, rows, width=1024):
+        self.xs = np.zeros((rows, width), dtype=np.int32)
+        self.ys = np.zeros((rows, width), dtype=np.int16)
+        self.sprites = np.zeros((rows, width), dtype=np.uint16)
+        self.lengths = np.zeros(rows, dtype=np.int64)
+        self.next_row = 0
+
+    def store(self, track):
+        length = track.length
+        if length > self.xs.shape[1]:
+            width = max(length, self.xs.shape[1] * 2)
+            for name in ('xs', 'ys', 'sprites'):
+                old = getattr(self, name)
+                grown = np.zeros((old.shape[0], width), dtype=old.dtype)
+                grown[:, :old.shape[1]] = old
+                setattr(self, name, grown)
+        row = self.next_row
+        self.xs[row, :length] = track.xs[:length]
+        self.ys[row, :length] = track.ys[:length]
+        self.sprites[row, :length] = track.sprites[:length]
+        self.lengths[row] = length
+        self.next_row = (row + 1) % len(self.lengths)
+
+
+class GhostManager:
+    """Records each attempt and replays the last few as translucent runners.
+
+    All ghosts of a level live in one GhostStack, so a tick is a single
+    column lookup and drawing is one Surface.blits call over a shared atlas
+    of translucent player frames. Respawning only copies the finished attempt
+    into its row; nothing is reallocated.
+    """
+    def __init__(self, max_ghosts=GHOST_MAX_ATTEMPTS):
+        self.stacks = collections.defaultdict(lambda: GhostStack(max_ghosts))
+        self.atlas = None
+        self.state_base = {}
+        self.facing_offset = 0
+        self.recording = None
+        self.stack = None
+        self.level_num = None
+        self.tick = 0
+
+    def _build_atlas(self, animations):
+        """Translucent copies of every player frame, right-facing then left-facing"""
+        right = []
+        for state in ANIMATION_STATES:
+            self.state_base[state] = len(right)
+            for frame in animations.get(state, []):
+                ghost = frame.copy()
+                ghost.set_alpha(GHOST_ALPHA)
+                right.append(ghost)
+        left = [pygame.transform.flip(frame, True, False) for frame in right]
+        fallback = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+        fallback.fill((*GREEN, GHOST_ALPHA))
+        self.facing_offset = len(right)
+        self.fallback_sprite = len(right) + len(left)
+        self.atlas = right + left + [fallback]
+
+    def _sprite_index(self, player):
+        frames = player.animations.get(player.state)
+        if not frames:
+            return self.fallback_sprite
+        index = self.state_base[player.state] + min(player.frame, len(frames) - 1)
+        return index if player.facing_right else index + self.facing_offset
+
+    def begin_attempt(self, level_num, player):
+        """Store the attempt in progress (if any) and restart playback from tick 0"""
+        self.end_attempt()
+        if self.atlas is None:
+            self._build_atlas(player.animations)
+            self.recording = GhostTrack()
+        self.level_num = level_num
+        self.stack = self.stacks[level_num]
+        self.tick = 0
+
+    def end_attempt(self):
+        if self.recording is not None and self.recording.length:
+            self.stacks[self.level_num].store(self.recording)
+            self.recording.length = 0  # Buffer is reused for the next attempt
+
+    def update(self, player):
+        """Sample the live player and advance every ghost by one tick"""
+        if self.stack is not None:
+            self.recording.append(int(player.x), int(player.y), self._sprite_index(player))
+        self.tick += 1
+
+    def draw(self, screen, camera_x):
+        stack = self.stack
+        if stack is None:
+            return
+        t = self.tick
+        active = np.nonzero(stack.lengths > t)[0]
+        if not len(active):
+            return
+        xs = stack.xs[active, t] - int(camera_x)
+        on_screen = (xs > -PLAYER_WIDTH) & (xs < GAME_WIDTH)
+        atlas = self.atlas
+        screen.blits([(atlas[sprite], (x, y)) for x, y, sprite in zip(
+            xs[on_screen].tolist(), stack.ys[active, t][on_screen].tolist(),
+            stack.sprites[active, t][on_screen].tolist())], doreturn=False)
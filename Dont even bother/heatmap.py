@@ -0,0 +1,110 @@
+import pygame
+from settings import GAME_WIDTH, GAME_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, DEATH_HEATMAP_CELL, HEATMAP_BLUR_RADIUS
+
+try:
+    import numpy as np
+except ImportError:  # The overlay is simply unavailable without NumPy
+    np = None
+
+
+def _gaussian_kernel(radius):
+    offsets = np.arange(-radius, radius + 1, dtype=np.float32)
+    kernel = np.exp(-(offsets ** 2) / (2 * max(radius / 2, 0.5) ** 2))
+    return kernel / kernel.sum()
+
+
+def _blur(grid, kernel):
+    """Separable blur: sum shifted copies along each axis (no Python loop over cells)"""
+    radius = len(kernel) // 2
+    for axis in (0, 1):
+        pad = [(0, 0), (0, 0)]
+        pad[axis] = (radius, radius)
+        padded = np.pad(grid, pad)
+        size = grid.shape[axis]
+        grid = sum(weight * padded.take(range(i, i + size), axis=axis) for i, weight in enumerate(kernel))
+    return grid
+
+
+def _build_colormap():
+    """256-entry lookup: transparent -> dark red -> red -> yellow -> white"""
+    stops = np.array([0, 64, 128, 192, 255], dtype=np.float32)
+    index = np.arange(256, dtype=np.float32)
+    rgb = np.stack([
+        np.interp(index, stops, [80, 160, 230, 255, 255]),
+        np.interp(index, stops, [0, 0, 40, 215, 255]),
+        np.interp(index, stops, [0, 0, 20, 0, 220]),
+    ], axis=1).astype(np.uint8)
+    alpha = np.interp(index, [0, 8, 255], [0, 90, 210]).astype(np.uint8)
+    return rgb, alpha
+
+
+class DeathHeatmap:
+    """Colour-mapped death density for one level, rendered at one pixel per cell.
+
+    Built once from the death log with a NumPy 2D histogram + blur; each new
+    death then stamps the blur kernel into the cached density and recolours
+    only that window.
+    """
+    def __init__(self, death_log, level, cell=DEATH_HEATMAP_CELL):
+        self.cell = cell
+        self.cols = max(1, -(-level.width // cell))
+        self.rows = max(1, -(-GAME_HEIGHT // cell))
+        self.kernel_1d = _gaussian_kernel(HEATMAP_BLUR_RADIUS)
+        self.kernel = np.outer(self.kernel_1d, self.kernel_1d)
+        self.colormap_rgb, self.colormap_alpha = _build_colormap()
+
+        xs, ys = death_log.positions(level.num)
+        cols, rows = self._to_cells(np.asarray(xs, dtype=np.float32), np.asarray(ys, dtype=np.float32))
+        hist = np.zeros((self.rows, self.cols), dtype=np.float32)
+        np.add.at(hist, (rows, cols), 1)
+        self.density = _blur(hist, self.kernel_1d)
+        self.peak = float(self.density.max())
+
+        self.surface = pygame.Surface((self.cols, self.rows), pygame.SRCALPHA)
+        self._recolor(0, self.rows, 0, self.cols)
+        self.version = 0
+        self._view_cache = None  # (first column, version, scaled surface)
+
+    def _to_cells(self, xs, ys):
+        cols = np.clip(((xs + PLAYER_WIDTH / 2) // self.cell).astype(np.int64), 0, self.cols - 1)
+        rows = np.clip(((ys + PLAYER_HEIGHT / 2) // self.cell).astype(np.int64), 0, self.rows - 1)
+        return cols, rows
+
+    def add_death(self, x, y):
+        cols, rows = self._to_cells(np.array([x], dtype=np.float32), np.array([y], dtype=np.float32))
+        col, row = int(cols[0]), int(rows[0])
+        radius = len(self.kernel_1d) // 2
+        r0, r1 = max(0, row - radius), min(self.rows, row + radius + 1)
+        c0, c1 = max(0, col - radius), min(self.cols, col + radius + 1)
+        kr0, kc0 = r0 - (row - radius), c0 - (col - radius)
+        self.density[r0:r1, c0:c1] += self.kernel[kr0:kr0 + (r1 - r0), kc0:kc0 + (c1 - c0)]
+
+        window_peak = float(self.density[r0:r1, c0:c1].max())
+        if window_peak > self.peak:
+            self.peak = window_peak  # Normalisation changed, so every cell's colour did too
+            self._recolor(0, self.rows, 0, self.cols)
+        else:
+            self._recolor(r0, r1, c0, c1)
+        self.version += 1
+
+    def _recolor(self, r0, r1, c0, c1):
+        if self.peak <= 0:
+            return
+        index = np.clip(self.density[r0:r1, c0:c1] * (255.0 / self.peak), 0, 255).astype(np.uint8)
+        # surfarray is indexed [x][y], the density grid [row][col]
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        pixels[c0:c1, r0:r1] = self.colormap_rgb[index].transpose(1, 0, 2)
+        del pixels
+        alpha = pygame.surfarray.pixels_alpha(self.surface)
+        alpha[c0:c1, r0:r1] = self.colormap_alpha[index].T
+        del alpha
+
+    def draw(self, screen, camera_x):
+        first_col = min(max(0, int(camera_x // self.cell)), self.cols - 1)
+        view_cols = min(GAME_WIDTH // self.cell + 2, self.cols - first_col)
+        cache = self._view_cache
+        if cache is None or cache[0] != first_col or cache[1] != self.version:
+            view = self.surface.subsurface(pygame.Rect(first_col, 0, view_cols, self.rows))
+            scaled = pygame.transform.smoothscale(view, (view_cols * self.cell, self.rows * self.cell))
+            self._view_cache = cache = (first_col, self.version, scaled)
+        screen.blit(cache[2], (first_col * self.cell - camera_x, 0))
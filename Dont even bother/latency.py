@@ -0,0 +1,103 @@
+import collections
+import time
+from settings import FPS, LOW_LATENCY_SPIN_MS, LOW_LATENCY_WINDOW, INPUT_LATENCY_BUCKET_MS
+
+
+class FramePacer:
+    """Sleep-first frame pacing for the low-latency loop.
+
+    Instead of sleeping right after the flip (clock.tick at the top of the
+    loop), wait until just before the next frame deadline minus the recent
+    worst-case work time, so input is sampled as late as possible and the
+    frame is presented right after. Sleeps coarsely, then spins the last
+    LOW_LATENCY_SPIN_MS for precision.
+    """
+    def __init__(self, fps=FPS):
+        self.period = 1.0 / fps
+        self.work = collections.deque(maxlen=LOW_LATENCY_WINDOW)
+        self.deadline = time.perf_counter() + self.period
+        self.last_wake = time.perf_counter()
+
+    def wait(self):
+        """Sleep until it's time to sample input; returns seconds since the previous wake"""
+        estimate = max(self.work, default=0.0)
+        wake_at = self.deadline - estimate
+        now = time.perf_counter()
+        spin = LOW_LATENCY_SPIN_MS / 1000.0
+        if wake_at - now > spin:
+            time.sleep(wake_at - now - spin)
+        while time.perf_counter() < wake_at:
+            pass
+        now = time.perf_counter()
+        dt, self.last_wake = now - self.last_wake, now
+        return dt
+
+    def frame_done(self):
+        """Call after the flip: records this frame's work time and schedules the next deadline"""
+        now = time.perf_counter()
+        self.work.append(now - self.last_wake)
+        self.deadline += self.period
+        if self.deadline < now:  # Missed it; restart the cadence instead of rushing frames
+            self.deadline = now + self.period
+
+
+class InputLatencyTracker:
+    """Key event -> presented frame latency.
+
+    Each gameplay key event is timestamped when it is pumped, marked when the
+    simulation samples the keys, and resolved when the frame carrying that
+    tick is flipped. Keeps the last few thousand samples for histograms.
+    """
+    def __init__(self, capacity=4096):
+        self.pending = []  # (event time, event frame) not yet sampled
+        self.sampled = []  # Sampled this frame, awaiting the flip
+        self.samples = collections.deque(maxlen=capacity)  # (seconds, frames)
+        self.frame = 0
+
+    def key_event(self):
+        self.pending.append((time.perf_counter(), self.frame))
+
+    def consume(self):
+        """The simulation just read the keys"""
+        self.sampled.extend(self.pending)
+        self.pending.clear()
+
+    def discard(self):
+        """Leaving gameplay: events not sampled by the simulation have no effect to measure"""
+        self.pending.clear()
+        self.sampled.clear()
+
+    def presented(self):
+        """Call right after pygame.display.flip()"""
+        now = time.perf_counter()
+        for event_time, event_frame in self.sampled:
+            self.samples.append((now - event_time, self.frame - event_frame))
+        self.sampled.clear()
+        self.frame += 1
+
+    def histogram(self, bucket_ms=INPUT_LATENCY_BUCKET_MS):
+        """Counter of latency bucket (lower edge, ms) -> events"""
+        return collections.Counter(int(seconds * 1000 // bucket_ms) * bucket_ms for seconds, _ in self.samples)
+
+    def summary(self):
+        if not self.samples:
+            return {'events': 0}
+        ordered = sorted(seconds * 1000 for seconds, _ in self.samples)
+        return {
+            'events': len(ordered),
+            'mean_ms': round(sum(ordered) / len(ordered), 2),
+            'p50_ms': round(ordered[len(ordered) // 2], 2),
+            'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+            'max_ms': round(ordered[-1], 2),
+            'frames': dict(sorted(collections.Counter(frames for _, frames in self.samples).items())),
+        }
+
+    def report(self):
+        """Summary plus a text histogram, printed when the game exits"""
+        lines = [f"Input latency: {self.summary()}"]
+        histogram = self.histogram()
+        peak = max(histogram.values(), default=0)
+        for bucket in sorted(histogram):
+            bar = '#' * max(1, 40 * histogram[bucket] // peak)
+            lines.append(f"  {bucket:4d}-{bucket + INPUT_LATENCY_BUCKET_MS:<4d} ms {histogram[bucket]:6d} {bar}")
+        return '\n'.join(lines)
@@ -3,6 +3,11 @@ import random
 import math
 from traps import *
 from settings import *
+from quality import current_tier
+from trapworld import TrapWorld
+from platforms import Broadphase, MovingPlatform
+from projectiles import ProjectilePool, ArrowLauncher, np as projectile_numpy
+from zones import Zone, ZoneGrid
 
 class Goal:
     def __init__(self, x, y, asset_manager=None):
@@ -11,6 +16,7 @@ class Goal:
         self.asset_manager = asset_manager  # NEW: Asset manager for sprite loading
         self.sparkle_timer = 0  # NEW: Sparkle effect
         self.particles = []  # NEW: Victory particles
+        self.fx_rng = random  # NEW: Seeded per level via Level.reseed
 
     def update(self, dt):
         self.pulse += dt * 3
@@ -20,17 +26,24 @@ class Goal:
         self.particles = [p for p in self.particles if p.update(dt)]
         
         # NEW: Spawn victory sparkles
-        if random.random() < 0.1:
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(30, 80)
+        if self.fx_rng.random() < 0.1:
+            angle = self.fx_rng.uniform(0, 2 * math.pi)
+            speed = self.fx_rng.uniform(30, 80)
             vx = math.cos(angle) * speed
             vy = math.sin(angle) * speed - 60
-            life = random.uniform(0.5, 1.0)
+            life = self.fx_rng.uniform(0.5, 1.0)
             self.particles.append(Particle(self.rect.centerx, self.rect.centery, vx, vy, GREEN, life, size=2))
 
     def check_collision(self, player):
         return self.rect.colliderect(player.get_rect())
 
+    def get_state(self):
+        """NEW: Compact snapshot for the rewind buffer"""
+        return (self.pulse, self.sparkle_timer)
+
+    def set_state(self, state):
+        self.pulse, self.sparkle_timer = state
+
     def draw(self, screen, camera_x):
         # Draw particles first
         for particle in self.particles:
@@ -52,42 +65,171 @@ class Goal:
             pygame.draw.line(screen, BLACK, (x + 18, self.rect.y + 35), (x + 32, self.rect.y + 15), 3)
         
         # NEW: Victory glow effect (green, not yellow)
-        glow_alpha = int(60 + 50 * abs(math.sin(self.sparkle_timer)))
-        glow_surf = pygame.Surface((self.rect.w + 20, self.rect.h + 20), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surf, (*GREEN, glow_alpha), (0, 0, self.rect.w + 20, self.rect.h + 20))
-        screen.blit(glow_surf, (x - 10, self.rect.y - 10))
+        if current_tier()['glow']:
+            glow_alpha = int(60 + 50 * abs(math.sin(self.sparkle_timer)))
+            glow_surf = pygame.Surface((self.rect.w + 20, self.rect.h + 20), pygame.SRCALPHA)
+            pygame.draw.rect(glow_surf, (*GREEN, glow_alpha), (0, 0, self.rect.w + 20, self.rect.h + 20))
+            screen.blit(glow_surf, (x - 10, self.rect.y - 10))
 
 class Level:
     
-    def __init__(self, num, platforms, traps, spawn, goal_pos, width, asset_manager=None):
+    def __init__(self, num, platforms, traps, spawn, goal_pos, width, asset_manager=None, trap_backend=None,
+                 moving_platforms=(), zones=()):
         self.num = num
         self.platforms = platforms
         self.fake_platforms = [t for t in traps if isinstance(t, FakePlatform)]
         self.traps = traps
+        # NEW: Kinematic platforms; their rects are moved in place and re-filed in the broadphase
+        self.moving_platforms = list(moving_platforms)
+        self.riders = {id(mover.rect): mover for mover in self.moving_platforms}
+        self.broadphase = Broadphase()
+        for plat in platforms:
+            self.broadphase.insert(plat)
+        for mover in self.moving_platforms:
+            mover.handle = self.broadphase.insert(mover.rect)
+        for fake in self.fake_platforms:
+            self.broadphase.insert(fake)
+        # NEW: Optional array-backed traps (falls back to objects without NumPy or with custom trap types)
+        trap_backend = TRAP_BACKEND if trap_backend is None else trap_backend
+        self.trap_world = TrapWorld(traps) if trap_backend == 'arrays' and TrapWorld.supports(traps) else None
+        # NEW: Initial snapshot + dirty list make reset O(changed traps)
+        self.dirty_traps = []
+        for trap in traps:
+            trap.initial_state = trap.get_state()
+            trap.dirty_sink = self.dirty_traps
+        # NEW: Arrow launchers share one preallocated projectile pool
+        launchers = [(i, t) for i, t in enumerate(traps) if isinstance(t, ArrowLauncher)]
+        self.projectiles = ProjectilePool(asset_manager=asset_manager) if launchers and projectile_numpy is not None else None
+        if self.projectiles:
+            self.projectiles.set_solids(platforms)
+            for i, launcher in launchers:
+                launcher.bind(self.projectiles, i)
+        self.zones = ZoneGrid(zones, width) if zones else None  # NEW: Wind, bounce pads and surface materials
         self.spawn = spawn
         self.goal = Goal(goal_pos[0], goal_pos[1], asset_manager)  # NEW: Pass asset_manager
         self.width = width
         self.death_count = 0
         self.asset_manager = asset_manager  # NEW: Store asset manager
+        self.seed = None  # NEW: Set by reseed()
+        self.ticks = 0  # NEW: Simulation ticks since the attempt started
+        self.killer_index = None  # NEW: Index of the trap that caused the last death (None = fell)
+        self.fx_rng = random  # NEW: Player death particles
+        self.message_rng = random  # NEW: Death message choice
+    
+    def reseed(self, seed):
+        """NEW: Give every trap its own seeded random streams so runs are reproducible"""
+        self.seed = seed
+        root = random.Random(seed)
+        for trap in self.traps:
+            trap.rng = random.Random(root.getrandbits(64))
+            trap.fx_rng = random.Random(root.getrandbits(64))
+        self.goal.fx_rng = random.Random(root.getrandbits(64))
+        self.fx_rng = random.Random(root.getrandbits(64))
+        self.message_rng = random.Random(root.getrandbits(64))
+        if self.trap_world:
+            self.trap_world.reseed(root.getrandbits(64))
     
     def get_all_platforms(self):
-        solid = self.platforms.copy()
-        for fake in self.fake_platforms:
-            if fake.active:
-                solid.append(fake.get_platform_rect())
-        return solid
+        """Every solid rect; Level.step only asks the broadphase for the ones near the player"""
+        return self.broadphase.all()
+
+    def move_platforms(self, dt, player):
+        """NEW: Advance moving platforms, re-file them and carry whoever stood on one"""
+        rider = self.riders.get(id(player.ground)) if player.ground is not None else None
+        if rider is None and self.moving_platforms and player.vel_y >= 0:
+            # on_ground drops every other tick while standing (gravity sinks the player less than a
+            # pixel), so feet resting flush on a mover's top count too, or riders lag and slide off
+            feet = player.get_rect()
+            rider = next((mover for mover in self.moving_platforms if mover.rect.top == feet.bottom
+                          and mover.rect.left < feet.right and feet.left < mover.rect.right), None)
+        for mover in self.moving_platforms:
+            mover.update(dt)
+            self.broadphase.move(mover.handle)
+        if rider:
+            player.x += rider.dx
+            player.y += rider.dy
+
+    def nearby_platforms(self, dt, player):
+        """Solids the player can reach this tick (horizontal speed is capped at PLAYER_SPEED)"""
+        reach = PLAYER_SPEED * dt + BROADPHASE_MARGIN
+        return self.broadphase.query(player.x - reach, player.x + player.width + reach)
     
     def reset(self):
-        for trap in self.traps:
-            trap.reset()
+        """Restore only the traps that changed since the initial snapshot"""
+        if self.trap_world:
+            self.trap_world.reset()
+        for trap in self.dirty_traps:
+            trap.restore(trap.initial_state)
+        self.dirty_traps.clear()
+        if self.projectiles:
+            self.projectiles.clear()
+        for mover in self.moving_platforms:
+            mover.reset()
+            self.broadphase.move(mover.handle)
         self.goal.pulse = 0
+        self.ticks = 0
+        self.killer_index = None
 
-    def update(self, dt, player):
+    def get_state(self):
+        """NEW: Level-wide counters for the rewind buffer (traps snapshot themselves)"""
+        return (self.ticks,)
+
+    def set_state(self, state):
+        self.ticks, = state
+        if self.trap_world:
+            return
+        # A rewind can touch any trap, so the next reset must consider them all
         for trap in self.traps:
-            trap.update(dt, player)
+            trap.mark_dirty()
+
+    def snapshot_entities(self, player, camera):
+        """NEW: Everything whose state a world snapshot must capture, in a fixed order"""
+        pool = [self.projectiles] if self.projectiles else []
+        if self.trap_world:
+            return [player, camera, self, self.goal, self.trap_world] + self.moving_platforms + pool
+        return [player, camera, self, self.goal] + self.traps + self.moving_platforms + pool
+
+    def update(self, dt, player):
+        if self.trap_world:
+            self.trap_world.update(dt, player)
+        else:
+            for trap in self.traps:
+                trap.update(dt, player)
+        if self.projectiles:
+            self.projectiles.update(dt, player)  # After launchers fire, before collisions are checked
         self.goal.update(dt)
     
+    def step(self, dt, keys, player):
+        """NEW: Advance one simulation tick; returns 'death', 'victory' or None"""
+        if keys[pygame.K_w] or keys[pygame.K_UP] or keys[pygame.K_SPACE]:
+            player.jump()
+
+        self.ticks += 1
+        self.move_platforms(dt, player)
+        player.update(dt, keys, self.nearby_platforms(dt, player), self.zones)
+        self.update(dt, player)
+
+        if self.trap_world:
+            killer = self.trap_world.collide(player)
+            if killer is not None:
+                self.killer_index = killer
+                return 'death'
+        else:
+            for i, trap in enumerate(self.traps):
+                if trap.check_collision(player):
+                    self.killer_index = i
+                    return 'death'
+        if player.y > GAME_HEIGHT + 100:
+            self.killer_index = None
+            return 'death'
+        if self.goal.check_collision(player):
+            return 'victory'
+        return None
+    
     def draw(self, screen, camera_x):
+        if self.zones:
+            self.zones.draw(screen, camera_x)
+
         # NEW: Enhanced platform rendering with gradient effect
         for plat in self.platforms:
             x = plat.x - camera_x
@@ -101,8 +243,17 @@ class Level:
             # Border
             pygame.draw.rect(screen, GRAY, (x, plat.y, plat.width, plat.height), 2)
         
-        for trap in self.traps:
-            trap.draw(screen, camera_x)
+        for mover in self.moving_platforms:
+            if mover.rect.right + mover.total > camera_x and mover.rect.x - mover.total < camera_x + GAME_WIDTH:
+                mover.draw(screen, camera_x)
+
+        if self.trap_world:
+            self.trap_world.draw(screen, camera_x)
+        else:
+            for trap in self.traps:
+                trap.draw(screen, camera_x)
+        if self.projectiles:
+            self.projectiles.draw(screen, camera_x)
         
         self.goal.draw(screen, camera_x)
 
@@ -154,7 +305,11 @@ class LevelFactory:
             FakeGoal(1800, 330), 
             TrollSaw(2050, 410, 2200, 230, asset_manager),
         ]
-        levels.append(Level(2, plat2, trap2, (50, 500), (2800, 400), 3000, asset_manager))
+        # NEW: The goal sits 600px past the last platform; a ferry shuttles across the gap
+        movers2 = [
+            MovingPlatform([(2215, 450), (2740, 450)], 64, 140, wait=1.0, asset_manager=asset_manager),
+        ]
+        levels.append(Level(2, plat2, trap2, (50, 500), (2800, 400), 3000, asset_manager, moving_platforms=movers2))
         
         # LEVEL 3 - ORIGINAL DIFFICULTY
         plat3 = [
@@ -197,20 +352,20 @@ class LevelFactory:
             pygame.Rect(1470, 440, 70, 20), pygame.Rect(1580, 460, 150, 20),
         ]
         trap4 = [
-            NarrowGap(265, 450, 34),
-            NarrowGap(360, 430, 32),
-            NarrowGap(470, 410, 30),
-            NarrowGap(585, 390, 30),
+            NarrowGap(265, 414, 102),
+            NarrowGap(360, 396, 100),
+            NarrowGap(470, 378, 98),
+            NarrowGap(585, 358, 98),
             FakePlatform(630, 420, 60, 0.3), 
-            NarrowGap(690, 370, 26),
-            NarrowGap(795, 350, 28),
-            NarrowGap(905, 330, 30),
-            NarrowGap(1010, 310, 28), 
+            NarrowGap(690, 342, 94),
+            NarrowGap(795, 320, 96),
+            NarrowGap(905, 278, 98),
+            NarrowGap(1010, 280, 96), 
             FakePlatform(1170, 360, 55, 0.25),
-            NarrowGap(1230, 330, 26), 
-            NarrowGap(1340, 350, 28),
-            NarrowGap(1440, 370, 30), 
-            NarrowGap(1550, 390, 32),
+            NarrowGap(1230, 322, 94), 
+            NarrowGap(1340, 340, 96),
+            NarrowGap(1440, 358, 98), 
+            NarrowGap(1550, 376, 100),
             FakeGoal(1650, 410),
         ]
         levels.append(Level(4, plat4, trap4, (50, 500), (1820, 410), 2000, asset_manager))
@@ -241,7 +396,12 @@ class LevelFactory:
             FakeGoal(1840, 430), 
             TrollSaw(1920, 460, 2020, 250, asset_manager),
         ]
-        levels.append(Level(5, plat5, trap5, (50, 500), (2050, 430), 2200, asset_manager))
+        # NEW: A bounce pad out of the valley and ice on the final platform
+        zones5 = [
+            Zone.bounce(plat5[7], asset_manager=asset_manager),
+            Zone.surface(plat5[13], 'ice', asset_manager),
+        ]
+        levels.append(Level(5, plat5, trap5, (50, 500), (2050, 430), 2200, asset_manager, zones=zones5))
         
         # LEVEL 6 - ORIGINAL DIFFICULTY
         plat6 = [
@@ -269,6 +429,7 @@ class LevelFactory:
             FakeGoal(1700, 250),
             FakePlatform(2000, 420, 100, 0.4), 
             FakeGoal(2100, 370),
+            ArrowLauncher(2404, 456, (-1, 0), 1.2, 280),  # NEW: Arrows at knee height down the final run
         ]
         levels.append(Level(6, plat6, trap6, (50, 500), (2350, 430), 2500, asset_manager))
         
@@ -321,19 +482,19 @@ class LevelFactory:
         ]
         trap8 = [
             TrollSaw(245, 410, 345, 260, asset_manager), 
-            NarrowGap(350, 320, 28), 
+            NarrowGap(350, 310, 136), 
             FakePlatform(505, 310, 60, 0.25), 
             TrollSaw(565, 350, 665, 270, asset_manager),
             InvisibleSpike(740, 414, 60, asset_manager), 
-            NarrowGap(870, 330, 26),
+            NarrowGap(870, 252, 134),
             TrollSaw(970, 290, 1070, 280, asset_manager), 
             InvisibleSpike(1050, 234, 60, asset_manager),
             FakePlatform(1230, 370, 60, 0.22), 
             TrollSaw(1285, 290, 1385, 290, asset_manager),
-            NarrowGap(1390, 320, 28), 
+            NarrowGap(1390, 250, 136), 
             InvisibleSpike(1465, 354, 60, asset_manager),
             TrollSaw(1600, 410, 1700, 270, asset_manager), 
-            FakeGoal(1710, 260), 
+            FakeGoal(1710, 190), 
             InvisibleSpike(1780, 294, 60, asset_manager),
             FakePlatform(1965, 430, 70, 0.25),
             TrollSaw(2020, 470, 2120, 280, asset_manager), 
@@ -357,18 +518,18 @@ class LevelFactory:
         ]
         trap9 = [
             InvisibleSpike(180, 474, 50, asset_manager), 
-            NarrowGap(205, 400, 26),
+            NarrowGap(205, 392, 114),
             TrollSaw(380, 390, 480, 290, asset_manager), 
             InvisibleSpike(300, 434, 50, asset_manager),
-            NarrowGap(470, 350, 24), 
+            NarrowGap(470, 274, 112), 
             InvisibleSpike(555, 314, 50, asset_manager),
             FakePlatform(600, 290, 40, 0.2), 
-            NarrowGap(640, 280, 26),
+            NarrowGap(640, 192, 114),
             TrollSaw(820, 310, 920, 300, asset_manager), 
-            NarrowGap(905, 350, 24), 
+            NarrowGap(905, 274, 112), 
             FakePlatform(1125, 290, 40, 0.18), 
             TrollSaw(1255, 230, 1355, 310, asset_manager),
-            NarrowGap(1345, 240, 22), 
+            NarrowGap(1345, 120, 146), 
             InvisibleSpike(1430, 234, 50, asset_manager),
             TrollSaw(1520, 310, 1620, 300, asset_manager), 
             FakePlatform(1650, 370, 40, 0.2),
@@ -396,27 +557,27 @@ class LevelFactory:
             pygame.Rect(2170, 490, 200, 20),
         ]
         trap10 = [
-            InvisibleSpike(150, 474, 60, asset_manager), 
+            InvisibleSpike(150, 510, 60, asset_manager), 
             TrollSaw(75, 420, 175, 280, asset_manager), 
             FakePlatform(140, 340, 65, 0.25),
             TrollSaw(135, 270, 235, 290, asset_manager), 
-            NarrowGap(255, 220, 24), 
+            NarrowGap(255, 110, 296), 
             TrollSaw(375, 170, 475, 310, asset_manager), 
             InvisibleSpike(565, 174, 60, asset_manager), 
-            NarrowGap(655, 180, 22),
+            NarrowGap(655, 136, 70),
             FakePlatform(700, 190, 45, 0.18), 
             TrollSaw(745, 170, 845, 320, asset_manager),
             TrollSaw(925, 270, 1025, 300, asset_manager), 
-            NarrowGap(1020, 300, 24), 
+            NarrowGap(1020, 234, 122), 
             FakePlatform(1160, 290, 45, 0.2), 
             TrollSaw(1205, 220, 1305, 310, asset_manager), 
-            NarrowGap(1300, 260, 22),
+            NarrowGap(1300, 186, 120),
             TrollSaw(1390, 320, 1490, 300, asset_manager), 
             FakeGoal(1580, 340), 
             TrollSaw(1585, 370, 1685, 290, asset_manager), 
             FakePlatform(1825, 440, 60, 0.22),
             TrollSaw(1875, 470, 1975, 310, asset_manager), 
-            NarrowGap(1980, 410, 24), 
+            NarrowGap(1980, 384, 122), 
             FakeGoal(2220, 440),
             TrollSaw(2115, 470, 2215, 300, asset_manager), 
             InvisibleSpike(2280, 474, 60, asset_manager),
@@ -424,3 +585,79 @@ class LevelFactory:
         levels.append(Level(10, plat10, trap10, (50, 500), (2340, 440), 2500, asset_manager))
         
         return levels
+
+    @staticmethod
+    def create_stress_level(num, width=100000, platform_count=5000, trap_mix=None, seed=0, asset_manager=None, trap_backend=None,
+                            moving_count=STRESS_MOVING_PLATFORMS, zone_count=STRESS_ZONES):
+        """NEW: Synthetic level for scalability testing.
+
+        A reachable stepping-stone path runs from spawn to the goal across the
+        whole width; the remaining platforms and most traps go in a sky lane
+        above the jump apex so the path stays beatable at any density.
+        """
+        rng = random.Random(seed)
+        trap_mix = STRESS_DEFAULT_TRAP_MIX if trap_mix is None else trap_mix
+        ground_y = 550
+
+        # Main path: gaps and height steps stay well inside jump reach
+        path = [pygame.Rect(0, ground_y, 200, 50)]
+        x, y = 200, 500
+        while x < width - 300:
+            x += rng.randint(40, 100)
+            y = max(250, min(520, y + rng.randint(-40, 40)))
+            plat_w = rng.randint(60, 140)
+            path.append(pygame.Rect(x, y, plat_w, 20))
+            x += plat_w
+        if len(path) > platform_count:
+            raise ValueError(f"{platform_count} platforms can't span {width}px (path alone needs {len(path)})")
+        last = path[-1]
+        goal_pos = (last.centerx - 20, last.y - 50)
+
+        sky = [pygame.Rect(rng.randint(400, width - 100), rng.randint(20, 100), rng.randint(40, 120), 20)
+               for _ in range(platform_count - len(path))]
+
+        def sky_spot():
+            return rng.randint(400, width - 100), rng.randint(20, 100)
+
+        traps = []
+        for _ in range(trap_mix.get('saw', 0)):
+            saw_x, saw_y = sky_spot()
+            traps.append(TrollSaw(saw_x, saw_y, saw_x + rng.randint(60, 200), rng.randint(100, 320), asset_manager))
+        for _ in range(trap_mix.get('spike', 0)):
+            plat = rng.choice(sky) if sky else None
+            spike_x, spike_y = (plat.x, plat.y - 16) if plat else sky_spot()
+            traps.append(InvisibleSpike(spike_x, spike_y, rng.randint(50, 80), asset_manager))
+        for _ in range(trap_mix.get('fake_platform', 0)):
+            fake_x, fake_y = sky_spot()
+            traps.append(FakePlatform(fake_x, fake_y, rng.randint(40, 100), rng.uniform(FAKE_PLATFORM_DELAY_MIN, FAKE_PLATFORM_DELAY_MAX)))
+        for _ in range(trap_mix.get('fake_goal', 0)):
+            traps.append(FakeGoal(*sky_spot()))
+        # Narrow gaps sit over a path platform with an opening taller than the jump
+        for _ in range(trap_mix.get('narrow_gap', 0)):
+            plat = rng.choice(path[1:-1]) if len(path) > 2 else path[0]
+            traps.append(NarrowGap(plat.x + (plat.w - 20) // 2, plat.y - 140, 140))
+        # Arrow launchers fire sideways along the sky lane (not in the default mix: they need the object backend)
+        for _ in range(trap_mix.get('arrow_launcher', 0)):
+            launch_x, launch_y = sky_spot()
+            traps.append(ArrowLauncher(launch_x, launch_y, (rng.choice((-1, 1)), 0), rng.uniform(0.2, 1.5),
+                                       rng.randint(200, 500), rng.uniform(0, 1.5)))
+
+        movers = []
+        for _ in range(moving_count):
+            move_x, move_y = sky_spot()
+            movers.append(MovingPlatform([(move_x, move_y), (move_x + rng.randint(80, 300), move_y)],
+                                         rng.choice((64, 128)), rng.randint(40, 160), asset_manager=asset_manager))
+
+        # Materials go on the path (all stay beatable); wind and bounce pads only in the sky lane
+        zones = []
+        for _ in range(zone_count):
+            kind = rng.choice(('ice', 'mud', 'sand', 'wind', 'bounce'))
+            if kind == 'wind':
+                wind_x, wind_y = sky_spot()
+                zones.append(Zone.wind((wind_x, wind_y, rng.randint(48, 120), 80), rng.uniform(-800, 800), asset_manager=asset_manager))
+            elif kind == 'bounce' and sky:
+                zones.append(Zone.bounce(rng.choice(sky), asset_manager=asset_manager))
+            elif kind != 'bounce':
+                zones.append(Zone.surface(rng.choice(path), kind, asset_manager))
+
+        return Level(num, path + sky, traps, (50, 500), goal_pos, width, asset_manager, trap_backend, movers, zones)
@@ -1,11 +1,21 @@
 import pygame
-import random
+import collections
+import os
+import time
 from settings import *
 from assets import AssetManager
-from utils import SaveManager, Camera
-from player import Player
+from utils import SaveManager
 from levels import LevelFactory
 from ui import UIManager
+from quality import QualityGovernor
+import animation
+from replay import InputRecorder, encode_keys, KEY_BITS
+from deathlog import DeathLog
+from heatmap import DeathHeatmap, np as heatmap_numpy
+from ghosts import GhostManager, np as ghost_numpy
+from simthread import SimulationThread
+from latency import FramePacer, InputLatencyTracker
+from warmup import LevelWarmup
 
 class Game:
     def __init__(self):
@@ -20,6 +30,11 @@ class Game:
 
         self.asset_manager = AssetManager()
         self.save_manager = SaveManager()
+        self.death_log = DeathLog()  # NEW: Where and how every death happened
+        self.show_heatmap = False  # NEW: Death heatmap overlay (H)
+        self.heatmaps = {}  # Level number -> DeathHeatmap, built on first use
+        self.ghosts = GhostManager() if ghost_numpy is not None else None  # NEW: Previous attempts (G)
+        self.show_ghosts = self.ghosts is not None
         self.levels = LevelFactory.create_all_levels(self.asset_manager)  # NEW: Pass asset_manager
         self.ui_manager = UIManager(self.save_manager, len(self.levels), self.asset_manager)  # NEW: Pass asset_manager
 
@@ -30,38 +45,91 @@ class Game:
         self.current_death_message = ""
         self.death_flash_timer = 0  # NEW: Death flash effect
         self.death_flash_active = False  # NEW: Track flash state
+        self.quality = QualityGovernor(FPS)  # NEW: Adaptive effect quality
+        self.recorder = None  # NEW: Input recorder for the current level attempt
+        self.rewind = None  # NEW: Snapshot history for the current level
+        self.respawn_latency = collections.deque(maxlen=100)  # NEW: Seconds per R-press respawn
+        # NEW: Optional simulation thread; rendering draws a mirror of each level from its snapshots
+        self.sim_thread = SimulationThread(self) if THREADED_SIMULATION else None
+        self.render_levels = LevelFactory.create_all_levels(self.asset_manager) if self.sim_thread else None
+        self.render_view = None
+        self.warmup = None  # NEW: Next level being prepared while the victory screen is up
+        self.pacer = FramePacer(FPS) if LOW_LATENCY_LOOP else None  # NEW: Sleep-first frame pacing
+        self.latency = InputLatencyTracker() if INPUT_LATENCY_TRACKING else None  # NEW: Key -> screen timing
 
     def run(self):
         while self.is_running:
-            dt = self.clock.tick(FPS) / 1000.0
+            if self.pacer:
+                # NEW: Sleep before sampling, so input is read just before the step and flip
+                dt = self.pacer.wait()
+            else:
+                dt = self.clock.tick(FPS) / 1000.0
+            frame_start = time.perf_counter()
             self._handle_events()
+            self._latch_input()
             self._update(dt)
             self._draw()
+            if self.pacer:
+                self.pacer.frame_done()
+            # NEW: Feed work time (excluding the tick sleep) to the quality governor
+            self.quality.record(time.perf_counter() - frame_start)
+        if self.sim_thread:
+            self.sim_thread.stop()
+        self._stop_recording()
+        self.save_manager.close()  # NEW: Flush pending saves before exit
+        self.death_log.close()
+        if self.latency:
+            print(self.latency.report())
         pygame.quit()
 
     def _handle_events(self):
-        mouse_pos = pygame.mouse.get_pos()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.is_running = False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+                self.ui_manager.invalidate()  # NEW: Retained menus must repaint the whole window
+
+            # NEW: Timestamp gameplay key changes as soon as they are pumped
+            if (self.latency and self.state == 'playing' and event.type in (pygame.KEYDOWN, pygame.KEYUP)
+                    and event.key in KEY_BITS):
+                self.latency.key_event()
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_F11: self._toggle_fullscreen()
-                if event.key == pygame.K_ESCAPE: self.state = 'menu'
+                if event.key == pygame.K_h and heatmap_numpy is not None:
+                    self.show_heatmap = not self.show_heatmap
+                if event.key == pygame.K_g and self.ghosts:
+                    self.show_ghosts = not self.show_ghosts
+                if event.key == pygame.K_ESCAPE:
+                    if self.sim_thread:
+                        self.sim_thread.pause()
+                    self._stop_recording()
+                    self.state = 'menu'
+
+            # NEW: One hit test per mouse event; buttons animate once per frame in UIManager.update
+            if event.type == pygame.MOUSEMOTION:
+                self.ui_manager.hover(self.state, event.pos)
 
             if self.state == 'menu':
-                for btn in self.ui_manager.menu_buttons:
-                    btn.update(mouse_pos)
-                    if btn.is_clicked(event):
-                        if btn.text == "PLAY": self.state = 'level_select'
-                        elif btn.text == "EXIT": self.is_running = False
-
-            if self.state == 'level_select':
-                unlocked = self.save_manager.data["unlocked_level"]
-                for i, btn in enumerate(self.ui_manager.level_buttons):
-                    btn.update(mouse_pos)
-                    if i + 1 <= unlocked and btn.is_clicked(event):
-                        self._start_level(i + 1)
+                btn = self.ui_manager.clicked_button(self.state, event)
+                if btn:
+                    if btn.text == "PLAY": self.state = 'level_select'
+                    elif btn.text == "EXIT": self.is_running = False
+
+            elif self.state == 'level_select':
+                btn = self.ui_manager.clicked_button(self.state, event)
+                page = self.ui_manager.level_page
+                if btn in self.ui_manager.page_buttons:
+                    self.ui_manager.show_level_page(page + btn.value)
+                elif btn and btn.value <= self.save_manager.data["unlocked_level"]:
+                    self._start_level(btn.value)
+                # NEW: Arrow keys and the mouse wheel also turn pages
+                elif event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_PAGEUP):
+                    self.ui_manager.show_level_page(page - 1)
+                elif event.type == pygame.KEYDOWN and event.key in (pygame.K_RIGHT, pygame.K_PAGEDOWN):
+                    self.ui_manager.show_level_page(page + 1)
+                elif event.type == pygame.MOUSEWHEEL and event.y:
+                    self.ui_manager.show_level_page(page - event.y)
 
             if self.state == 'death' and event.type == pygame.KEYDOWN and event.key == pygame.K_r:
                 self._reset_level()
@@ -73,9 +141,12 @@ class Game:
                     self.save_manager.unlock_level(next_level_num)
                     self._start_level(next_level_num)
                 else:
+                    self._stop_recording()
                     self.state = 'menu'
 
     def _update(self, dt):
+        animation.advance(dt)  # NEW: Shared clock for every animated sprite
+        self.ui_manager.update(dt, self.state, self.screen.get_height())  # NEW: UI effects follow real time
         # NEW: Update death flash timer
         if self.death_flash_active:
             self.death_flash_timer -= dt
@@ -83,103 +154,207 @@ class Game:
                 self.death_flash_active = False
         
         if self.state == 'playing':
-            keys = pygame.key.get_pressed()
+            if self.sim_thread:
+                outcome = self.sim_thread.take_outcome()  # The thread pauses itself after one
+            else:
+                if self.latency:
+                    self.latency.consume()
+                outcome = self._simulate(dt, pygame.key.get_pressed())
 
-            if keys[pygame.K_w] or keys[pygame.K_UP] or keys[pygame.K_SPACE]:
-                self.player.jump()
+            if outcome == 'death':
+                self._player_die()
+            elif outcome == 'victory':
+                if self.ghosts:
+                    self.ghosts.end_attempt()
+                self.state = 'victory'
+                if self.current_level.num < len(self.levels):
+                    self.warmup = LevelWarmup(self, self.current_level.num + 1)
+        elif self.state == 'victory' and self.warmup:
+            self.warmup.advance()  # NEW: Prepare the next level in idle frame time
+        if self.state != 'playing' and self.latency:
+            self.latency.discard()
 
-            self.player.update(dt, keys, self.current_level.get_all_platforms())
-            self.current_level.update(dt, self.player)
-            self.camera.update(self.player.x, dt)
+    def _simulate(self, dt, keys):
+        """NEW: One gameplay tick (runs on the simulation thread when THREADED_SIMULATION is on)"""
+        if self.recorder:
+            self.recorder.record(keys, dt)
 
-            for trap in self.current_level.traps:
-                if trap.check_collision(self.player):
-                    self._player_die(); return
-            
-            if self.player.y > GAME_HEIGHT + 100:
-                self._player_die(); return
+        # NEW: Holding the rewind key scrubs back instead of simulating
+        if keys[REWIND_KEY]:
+            self.rewind.rewind()
+            return None
 
-            if self.current_level.goal.check_collision(self.player):
-                self.state = 'victory'
+        outcome = self.current_level.step(dt, keys, self.player)
+        self.camera.update(self.player.x, dt)
+        self.rewind.capture()
+        if self.ghosts:
+            self.ghosts.update(self.player)
+        return outcome
+
+    def _latch_input(self):
+        """NEW: Hand the simulation thread the current keys (SDL input is main-thread only)"""
+        if self.sim_thread:
+            pygame.event.pump()
+            self.sim_thread.set_input(encode_keys(pygame.key.get_pressed()))
+            if self.latency and self.state == 'playing':
+                self.latency.consume()  # Approximate: the thread's next tick picks the mask up
+
+    def _view(self):
+        """NEW: Level, player and camera to draw; the snapshot mirror while the thread is ticking"""
+        if self.sim_thread and self.state == 'playing' and self.render_view:
+            return self.render_view.sync(self.sim_thread.buffer.acquire(), self.current_level)
+        return self.current_level, self.player, self.camera
 
     def _draw(self):
+        dirty = None  # NEW: Menus return the rects that changed (None = present the whole screen)
         if self.state == 'menu':
-            self.ui_manager.draw_menu(self.screen)
+            dirty = self.ui_manager.draw_menu(self.screen)
         elif self.state == 'level_select':
-            self.ui_manager.draw_level_select(self.screen)
+            dirty = self.ui_manager.draw_level_select(self.screen)
         elif self.state in ['playing', 'death', 'victory']:
-            self.game_surface.fill(DARK_BLUE)
-
-            # NEW: Enhanced parallax background rendering
-            bg_image = self.asset_manager.images.get('background')
-            if bg_image:
-                bg_width = bg_image.get_width()
-                camera_x_offset = self.camera.get_x() % bg_width
-                for i in range(-1, (GAME_WIDTH // bg_width) + 2):
-                    self.game_surface.blit(bg_image, (i * bg_width - camera_x_offset, 0))
-            
-            # NEW: Parallax layer 1 (slower)
-            bg_layer1 = self.asset_manager.images.get('bg_layer1')
-            if bg_layer1:
-                layer1_offset = (self.camera.get_x() * 0.5) % bg_layer1.get_width()
-                for i in range(-1, (GAME_WIDTH // bg_layer1.get_width()) + 2):
-                    self.game_surface.blit(bg_layer1, (i * bg_layer1.get_width() - layer1_offset, 0))
-            
-            # NEW: Parallax layer 2 (even slower)
-            bg_layer2 = self.asset_manager.images.get('bg_layer2')
-            if bg_layer2:
-                layer2_offset = (self.camera.get_x() * 0.2) % bg_layer2.get_width()
-                for i in range(-1, (GAME_WIDTH // bg_layer2.get_width()) + 2):
-                    self.game_surface.blit(bg_layer2, (i * bg_layer2.get_width() - layer2_offset, 0))
-
-            camera_x = self.camera.get_x()
-            self.current_level.draw(self.game_surface, camera_x)
-            self.player.draw(self.game_surface, camera_x)
-            self.ui_manager.draw_hud(self.game_surface, self.current_level)
-            
-            # NEW: Death flash effect
-            if self.death_flash_active:
-                flash_alpha = int(255 * (self.death_flash_timer / DEATH_FLASH_DURATION))
-                flash_surf = pygame.Surface(self.game_surface.get_size(), pygame.SRCALPHA)
-                flash_surf.fill((*DEATH_FLASH_COLOR[:3], min(flash_alpha, DEATH_FLASH_COLOR[3])))
-                self.game_surface.blit(flash_surf, (0, 0))
-            
-            scaled_surface = pygame.transform.scale(self.game_surface, self.screen.get_size())
-            self.screen.blit(scaled_surface, (0, 0))
-            
-            if self.state == 'death':
-                self.ui_manager.draw_death_screen(self.screen, self.current_death_message)
-            elif self.state == 'victory':
-                self.ui_manager.draw_victory_screen(self.screen, self.current_level.death_count)
-        pygame.display.flip()
+            self._draw_world()
+            self._latch_input()  # Slow draws don't delay input reaching the simulation thread
+            self._draw_hud()
+            self._scale_to_screen()
+            self._latch_input()
+            self._draw_screen_overlay()
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        if self.latency:
+            self.latency.presented()
+
+    # NEW: Gameplay drawing split into phases (also timed individually by benchmark.py)
+    def _draw_world(self):
+        level, player, camera = self._view()
+        self.game_surface.fill(DARK_BLUE)
+
+        # NEW: Enhanced parallax background rendering
+        bg_image = self.asset_manager.images.get('background')
+        if bg_image:
+            bg_width = bg_image.get_width()
+            camera_x_offset = camera.get_x() % bg_width
+            for i in range(-1, (GAME_WIDTH // bg_width) + 2):
+                self.game_surface.blit(bg_image, (i * bg_width - camera_x_offset, 0))
+        
+        # NEW: Parallax layer 1 (slower)
+        bg_layer1 = self.asset_manager.images.get('bg_layer1')
+        if bg_layer1:
+            layer1_offset = (camera.get_x() * 0.5) % bg_layer1.get_width()
+            for i in range(-1, (GAME_WIDTH // bg_layer1.get_width()) + 2):
+                self.game_surface.blit(bg_layer1, (i * bg_layer1.get_width() - layer1_offset, 0))
+        
+        # NEW: Parallax layer 2 (even slower)
+        bg_layer2 = self.asset_manager.images.get('bg_layer2')
+        if bg_layer2:
+            layer2_offset = (camera.get_x() * 0.2) % bg_layer2.get_width()
+            for i in range(-1, (GAME_WIDTH // bg_layer2.get_width()) + 2):
+                self.game_surface.blit(bg_layer2, (i * bg_layer2.get_width() - layer2_offset, 0))
+
+        camera_x = camera.get_x()
+        level.draw(self.game_surface, camera_x)
+        if self.show_heatmap:
+            self._get_heatmap(self.current_level).draw(self.game_surface, camera_x)
+        if self.show_ghosts:
+            self.ghosts.draw(self.game_surface, camera_x)
+        player.draw(self.game_surface, camera_x)
+
+    def _get_heatmap(self, level):
+        if level.num not in self.heatmaps:
+            self.heatmaps[level.num] = DeathHeatmap(self.death_log, level)
+        return self.heatmaps[level.num]
+
+    def _draw_hud(self):
+        self.ui_manager.draw_hud(self.game_surface, self.current_level)
+        
+        # NEW: Death flash effect
+        if self.death_flash_active:
+            flash_alpha = int(255 * (self.death_flash_timer / DEATH_FLASH_DURATION))
+            flash_surf = pygame.Surface(self.game_surface.get_size(), pygame.SRCALPHA)
+            flash_surf.fill((*DEATH_FLASH_COLOR[:3], min(flash_alpha, DEATH_FLASH_COLOR[3])))
+            self.game_surface.blit(flash_surf, (0, 0))
+
+    def _scale_to_screen(self):
+        scaled_surface = pygame.transform.scale(self.game_surface, self.screen.get_size())
+        self.screen.blit(scaled_surface, (0, 0))
+
+    def _draw_screen_overlay(self):
+        if self.state == 'death':
+            self.ui_manager.draw_death_screen(self.screen, self.current_death_message)
+        elif self.state == 'victory':
+            self.ui_manager.draw_victory_screen(self.screen, self.current_level.death_count)
 
     def _start_level(self, level_num):
         if 1 <= level_num <= len(self.levels):
-            self.current_level = self.levels[level_num - 1]
-            self.current_level.death_count = 0
-            self.current_level.reset()
-            spawn_x, spawn_y = self.current_level.spawn
-            self.player = Player(spawn_x, spawn_y, self.asset_manager)
-            self.camera = Camera(self.current_level.width)
+            # NEW: Reset, seeding, player/camera/rewind construction and save flushes happen in
+            # LevelWarmup; if the victory screen already prepared this level, starting it is a swap
+            warmup, self.warmup = self.warmup, None
+            if warmup is None or warmup.level_num != level_num:
+                warmup = LevelWarmup(self, level_num)
+            warmup.finish()
+            self.current_level = warmup.level
+            self._start_recording(level_num, warmup.seed)
+            self.player = warmup.player
+            self.camera = warmup.camera
+            self.rewind = warmup.rewind
+            if self.ghosts:
+                self.ghosts.begin_attempt(level_num, self.player)
             self.state = 'playing'
+            if self.sim_thread:
+                self.render_view = warmup.render_view
+                self._resume_simulation()
 
     def _reset_level(self):
         if self.current_level:
+            start = time.perf_counter()
             spawn_x, spawn_y = self.current_level.spawn
             self.player.reset(spawn_x, spawn_y)
             self.current_level.reset()
+            if self.recorder:
+                self.recorder.mark_reset()
+            self.rewind.clear()
+            if self.ghosts:
+                self.ghosts.begin_attempt(self.current_level.num, self.player)
             self.state = 'playing'
+            self._resume_simulation()
+            self.respawn_latency.append(time.perf_counter() - start)
+
+    def _resume_simulation(self):
+        if self.sim_thread:
+            self.sim_thread.resume(self.current_level.snapshot_entities(self.player, self.camera))
+
+    def _start_recording(self, level_num, seed):
+        """NEW: Begin streaming this attempt's input to a replay file"""
+        self._stop_recording()
+        if REPLAY_RECORDING:
+            filename = f"level{level_num:02d}_{time.strftime('%Y%m%d_%H%M%S')}.rep"
+            self.recorder = InputRecorder(os.path.join(REPLAY_DIR, filename), level_num, seed)
+
+    def _stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
 
     def _player_die(self):
-        self.player.die()
+        self.player.die(self.current_level.fx_rng)
         # NEW: Enhanced camera shake
         self.camera.shake(intensity=SCREEN_SHAKE_INTENSITY, duration=SCREEN_SHAKE_DURATION)
-        self.current_death_message = random.choice(DEATH_MESSAGES)
+        self.current_death_message = self.current_level.message_rng.choice(DEATH_MESSAGES)
         self.current_level.death_count += 1
         self.save_manager.add_death()
+        # NEW: Log where the death happened and which trap caused it
+        killer = self.current_level.killer_index
+        cause = type(self.current_level.traps[killer]).__name__ if killer is not None else 'fall'
+        self.death_log.record(self.current_level.num, self.player.x, self.player.y,
+                              self.current_level.ticks, cause, killer)
+        if self.current_level.num in self.heatmaps:
+            self.heatmaps[self.current_level.num].add_death(self.player.x, self.player.y)
         # NEW: Activate death flash
         self.death_flash_active = True
         self.death_flash_timer = DEATH_FLASH_DURATION
+        if self.ghosts:
+            self.ghosts.end_attempt()
         self.state = 'death'
         # Sound effect placeholder (commented)
         # self.play_sound('death')
@@ -190,6 +365,7 @@ class Game:
             self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
         else:
             self.screen = pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
+        self.ui_manager.invalidate()
 
 if __name__ == "__main__":
     game = Game()
@@ -0,0 +1,377 @@
+"""Monte Carlo trap lethality and difficulty curves.
+
+Runs thousands of noisy bot attempts per level through a NumPy batch
+kernel that reimplements Player movement, gravity, jumping and platform
+collision for N agents at once. Bots follow the solver's route with
+timing jitter and random input slips (or wander randomly when the level
+has no route). Reports per-trap death probabilities and a survival curve
+over horizontal progress.
+
+    python montecarlo.py --agents 5000 --out difficulty.json
+    python montecarlo.py --levels 4 --parity 16    # check the kernel against Player.update
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Must be set before settings initialises pygame
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import sys
+import numpy as np
+from settings import *
+from levels import LevelFactory
+from player import Player
+from traps import InvisibleSpike, FakePlatform, TrollSaw, FakeGoal, NarrowGap
+from projectiles import ArrowLauncher
+from replay import ReplayKeys, KEY_BITS
+from solver import LevelSolver, ACTIONS
+
+LEFT = 1 << KEY_BITS.index(pygame.K_a)
+RIGHT = 1 << KEY_BITS.index(pygame.K_d)
+JUMP = 1 << KEY_BITS.index(pygame.K_w)
+KINDS = (InvisibleSpike, FakePlatform, TrollSaw, FakeGoal, NarrowGap, ArrowLauncher)
+FELL = -1  # Killer code for falling off the world
+PARITY_TOLERANCE = 1e-6
+
+
+class BatchPhysics:
+    """N independent attempts at one level, advanced together.
+
+    Follows Level.step tick for tick: jump, ride moving platforms, zone
+    lookup, movement, gravity, then the same sequential platform collision
+    loop as Player._handle_collisions (vectorised over agents, looping over
+    the platforms near any of them). Saws, moving platforms, launchers and
+    their arrows ignore the player, so one shared copy drives every agent;
+    fake platforms crumble per agent.
+    """
+    def __init__(self, level, count, seed=0):
+        if not self.supports(level):
+            raise ValueError(f"Level {level.num} has traps the batch kernel doesn't model")
+        self.level = level
+        level.reset()
+        level.reseed(seed)
+        self.n = count
+        self.dt = 1.0 / FPS
+
+        spawn_x, spawn_y = level.spawn
+        self.x = np.full(count, float(spawn_x))
+        self.y = np.full(count, float(spawn_y))
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.on_ground = np.zeros(count, dtype=bool)
+        self.ground = np.full(count, -1, dtype=np.int64)  # Solid index stood on
+        self.alive = np.ones(count, dtype=bool)
+        self.won = np.zeros(count, dtype=bool)
+        self.killer = np.full(count, -2, dtype=np.int64)  # Trap index, FELL, or -2 while alive
+        self.end_tick = np.zeros(count, dtype=np.int64)
+        self.max_x = self.x.copy()
+        self.ticks = 0
+
+        # Solids in broadphase insertion order: static, moving, fake
+        self.movers = level.moving_platforms
+        self.fakes = level.fake_platforms
+        self.n_static = len(level.platforms)
+        self.fake_active = np.array([[f.active for f in self.fakes]] * count, dtype=bool).reshape(count, len(self.fakes))
+        self.fake_timer = np.zeros((count, len(self.fakes)))
+        self.fake_delay = np.array([f.delay for f in self.fakes])
+        self.fake_column = {id(f): k for k, f in enumerate(self.fakes)}
+        self.saws = [trap for trap in level.traps if isinstance(trap, TrollSaw)]
+        self.launchers = [trap for trap in level.traps if isinstance(trap, ArrowLauncher)]
+        self.pool = level.projectiles
+
+        zones = level.zones
+        if zones:
+            self.zone_cell, self.zone_cols, self.zone_rows = zones.cell, zones.cols, zones.rows
+            self.zone_cells = np.frombuffer(zones.cells, dtype=np.uint16).astype(np.int64)
+            self.zone_table = np.array(zones.table)
+        else:
+            self.zone_cells = None
+
+    @staticmethod
+    def supports(level):
+        return all(type(trap) in KINDS for trap in level.traps)
+
+    def _solids(self):
+        """(left, top, right, bottom) of every solid as it stands this tick"""
+        rects = list(self.level.platforms) + [m.rect for m in self.movers] + [f.rect for f in self.fakes]
+        return np.array([(r.left, r.top, r.right, r.bottom) for r in rects], dtype=np.int64).reshape(-1, 4)
+
+    def _rects(self):
+        return np.trunc(self.x).astype(np.int64), np.trunc(self.y).astype(np.int64)
+
+    def step(self, masks):
+        """Advance every agent still playing by one tick; masks holds each agent's key bits"""
+        dt = self.dt
+        live = self.alive & ~self.won
+        self.ticks += 1
+        left = (masks & LEFT) != 0
+        right = ((masks & RIGHT) != 0) & ~left
+
+        # Level.step: jump first
+        jumping = live & ((masks & JUMP) != 0) & self.on_ground
+        self.vy[jumping] = JUMP_FORCE
+
+        # Moving platforms advance, then carry their riders: the mover stood on, else one the feet rest flush on
+        if self.movers:
+            on_mover = (self.ground >= self.n_static) & (self.ground < self.n_static + len(self.movers))
+            rider = np.where(on_mover, self.ground - self.n_static, -1)
+            rx, ry = self._rects()
+            for m, mover in enumerate(self.movers):
+                r = mover.rect
+                rider[(rider == -1) & (self.vy >= 0) & (ry + PLAYER_HEIGHT == r.top) & (rx < r.right) & (rx + PLAYER_WIDTH > r.left)] = m
+            for m, mover in enumerate(self.movers):
+                mover.update(dt)
+                riders = live & (rider == m)
+                self.x[riders] += mover.dx
+                self.y[riders] += mover.dy
+
+        # Player.update: one zone lookup under the feet
+        if self.zone_cells is not None:
+            col = np.trunc(self.x + PLAYER_WIDTH / 2).astype(np.int64) // self.zone_cell
+            row = np.trunc(self.y + PLAYER_HEIGHT - 1).astype(np.int64) // self.zone_cell
+            inside = (col >= 0) & (col < self.zone_cols) & (row >= 0) & (row < self.zone_rows)
+            index = np.where(inside, self.zone_cells[np.where(inside, row * self.zone_cols + col, 0)], 0)
+            modifier = self.zone_table[index]
+        else:
+            modifier = np.tile(np.array((1.0, 1.0, 1.0, 0.0, 0.0, 0.0)), (self.n, 1))
+        grounded = self.on_ground[:, None]
+        accel, decel, top_speed = (np.where(grounded, modifier[:, :3], 1.0)).T
+        wind_x, wind_y, bounce = modifier[:, 3], modifier[:, 4], modifier[:, 5]
+
+        vx = self.vx
+        vx = np.where(left, vx - ACCELERATION * accel * dt, vx)
+        vx = np.where(right, vx + ACCELERATION * accel * dt, vx)
+        coast = ~left & ~right
+        vx = np.where(coast & (vx > 0), np.maximum(0, vx - DECELERATION * decel * dt), vx)
+        vx = np.where(coast & (vx < 0), np.minimum(0, vx + DECELERATION * decel * dt), vx)
+        top_speed = top_speed * PLAYER_SPEED
+        vx = np.maximum(-top_speed, np.minimum(top_speed, vx))
+
+        vy = np.where((bounce != 0) & self.on_ground, -bounce, self.vy)
+        vx = vx + wind_x * dt
+        vy = vy + (GRAVITY + wind_y) * dt
+        vy = np.maximum(-PLAYER_MAX_VERTICAL_SPEED, np.minimum(vy, PLAYER_MAX_VERTICAL_SPEED))
+        x = self.x + vx * dt
+        y = self.y + vy * dt
+        # Agents no longer playing keep their state
+        self.vx = np.where(live, vx, self.vx)
+        self.vy = np.where(live, vy, self.vy)
+        self.x = np.where(live, x, self.x)
+        self.y = np.where(live, y, self.y)
+
+        self._collide_platforms(live)
+        self._update_fakes(live)
+        for saw in self.saws:
+            saw.update(dt, None)
+        for launcher in self.launchers:
+            launcher.update(dt, None)
+        if self.pool:
+            self.pool.advance(dt)
+        self._check_outcomes(live)
+
+    def _collide_platforms(self, live):
+        solids = self._solids()
+        self.on_ground = np.where(live, False, self.on_ground)
+        self.ground = np.where(live, -1, self.ground)
+        if not live.any():
+            return
+        # Only platforms in reach of some agent this tick (the game asks its broadphase the same way)
+        reach = PLAYER_SPEED * self.dt + BROADPHASE_MARGIN
+        lo, hi = self.x[live].min() - reach, self.x[live].max() + PLAYER_WIDTH + reach
+        near = np.nonzero((solids[:, 2] > lo) & (solids[:, 0] < hi))[0]
+
+        rx, ry = self._rects()
+        w, h = PLAYER_WIDTH, PLAYER_HEIGHT
+        for j in near.tolist():
+            left, top, right, bottom = solids[j].tolist()
+            active = live
+            if j >= self.n_static + len(self.movers):
+                active = live & self.fake_active[:, j - self.n_static - len(self.movers)]
+            hit = active & (rx < right) & (rx + w > left) & (ry < bottom) & (ry + h > top)
+            if not hit.any():
+                continue
+            land = hit & (self.vy > 0) & (ry + h > top) & (ry + h < top + 25)
+            bonk = hit & ~land & (self.vy < 0) & (ry < bottom)
+            self.y[land] = float(top - h)
+            self.vy[land] = 0
+            self.on_ground |= land
+            self.ground[land] = j
+            self.y[bonk] = float(bottom)
+            self.vy[bonk] = 0
+
+            new_rx, new_ry = self._rects()
+            rx, ry = np.where(hit, new_rx, rx), np.where(hit, new_ry, ry)
+            side = hit & (rx < right) & (rx + w > left) & (ry < bottom) & (ry + h > top)
+            push_left, push_right = side & (self.vx > 0), side & (self.vx < 0)
+            self.x[push_left] = float(left - w)
+            self.x[push_right] = float(right)
+            self.vx[side] = 0
+
+    def _update_fakes(self, live):
+        if not len(self.fakes):
+            return
+        rx, ry = self._rects()
+        for k, fake in enumerate(self.fakes):
+            r = fake.rect
+            touching = live & self.fake_active[:, k] & _overlap(rx, ry, r)
+            self.fake_timer[touching, k] += self.dt
+            self.fake_active[touching & (self.fake_timer[:, k] >= self.fake_delay[k]), k] = False
+
+    def _check_outcomes(self, live):
+        rx, ry = self._rects()
+        dead = np.zeros(self.n, dtype=bool)
+        killer = np.full(self.n, -2, dtype=np.int64)
+        arrow = self.pool.first_hit(rx, ry, PLAYER_WIDTH, PLAYER_HEIGHT) if self.pool else None
+        for i, trap in enumerate(self.level.traps):
+            if isinstance(trap, ArrowLauncher):
+                hit = arrow == i if arrow is not None else np.zeros(self.n, dtype=bool)
+            elif isinstance(trap, NarrowGap):
+                hit = (_overlap(rx, ry, pygame.Rect(trap.rect.x, 0, trap.rect.w, trap.gap_y))
+                       | _overlap(rx, ry, pygame.Rect(trap.rect.x, trap.gap_y + trap.gap_h, trap.rect.w, trap.rect.h)))
+            elif isinstance(trap, FakePlatform):
+                hit = self.fake_active[:, self.fake_column[id(trap)]] & _overlap(rx, ry, trap.rect)
+            else:
+                hit = _overlap(rx, ry, trap.rect) if trap.active else np.zeros(self.n, dtype=bool)
+            first = live & hit & ~dead
+            killer[first] = i
+            dead |= first
+        fell = live & ~dead & (self.y > GAME_HEIGHT + 100)
+        killer[fell] = FELL
+        dead |= fell
+        won = live & ~dead & _overlap(rx, ry, self.level.goal.rect)
+
+        self.alive &= ~dead
+        self.killer = np.where(dead, killer, self.killer)
+        self.won |= won
+        self.end_tick[dead | won] = self.ticks
+        self.max_x = np.where(live, np.maximum(self.max_x, self.x), self.max_x)
+
+    def playing(self):
+        return self.alive & ~self.won
+
+
+def _overlap(rx, ry, rect):
+    """Vectorised pygame.Rect.colliderect of each agent's rect against one rect"""
+    if not rect.w or not rect.h:
+        return np.zeros(len(rx), dtype=bool)
+    return (rx < rect.right) & (rx + PLAYER_WIDTH > rect.left) & (ry < rect.bottom) & (ry + PLAYER_HEIGHT > rect.top)
+
+
+class NoisyBots:
+    """Per-tick key masks: a route with per-agent timing jitter and random slips"""
+    def __init__(self, count, route, seed=0, jitter=MONTE_CARLO_JITTER_TICKS, slip=MONTE_CARLO_SLIP_CHANCE):
+        self.rng = np.random.default_rng(seed)
+        self.route = np.array(route or [RIGHT], dtype=np.int64)
+        self.offset = self.rng.integers(-jitter, jitter + 1, count)
+        self.slip = slip if route else 0.5  # Without a route, wander: half random, half "hold right"
+        self.actions = np.array(ACTIONS, dtype=np.int64)
+
+    def masks(self, tick):
+        index = np.clip(tick + self.offset, 0, len(self.route) - 1)
+        masks = self.route[index]
+        slips = self.rng.random(len(masks)) < self.slip
+        masks[slips] = self.actions[self.rng.integers(0, len(self.actions), int(slips.sum()))]
+        return masks
+
+
+def estimate(level_num, agents=MONTE_CARLO_AGENTS, seed=0, max_ticks=MONTE_CARLO_MAX_TICKS):
+    """Per-trap death probabilities and survival over progress for one level"""
+    route = LevelSolver(LevelFactory.create_all_levels()[level_num - 1], seed).solve()
+    level = LevelFactory.create_all_levels()[level_num - 1]
+    batch = BatchPhysics(level, agents, seed)
+    bots = NoisyBots(agents, route, seed)
+    for tick in range(max_ticks):
+        if not batch.playing().any():
+            break
+        batch.step(bots.masks(tick))
+
+    deaths = {}
+    for index, total in zip(*np.unique(batch.killer[~batch.alive], return_counts=True)):
+        name = 'fall' if index == FELL else f"{index}:{type(level.traps[index]).__name__}"
+        deaths[name] = round(total / agents, 4)
+    buckets = np.arange(0, level.width + MONTE_CARLO_CURVE_STEP, MONTE_CARLO_CURVE_STEP)
+    reached = (batch.max_x[None, :] >= buckets[:, None]).mean(axis=1)
+    return {
+        'level': level_num,
+        'agents': agents,
+        'route_ticks': len(route) if route else None,
+        'victory': round(float(batch.won.mean()), 4),
+        'timeout': round(float(batch.playing().mean()), 4),
+        'deaths': dict(sorted(deaths.items(), key=lambda item: -item[1])),
+        'survival_curve': [[int(x), round(float(p), 4)] for x, p in zip(buckets, reached)],
+    }
+
+
+def parity(level_num, agents, seed=0, max_ticks=MONTE_CARLO_MAX_TICKS):
+    """Largest state difference between the kernel and real Level/Player runs fed the same inputs"""
+    batch = BatchPhysics(LevelFactory.create_all_levels()[level_num - 1], agents, seed)
+    bots = NoisyBots(agents, None, seed)
+    references = []
+    for _ in range(agents):
+        level = LevelFactory.create_all_levels()[level_num - 1]
+        level.reset()
+        level.reseed(seed)
+        references.append((level, Player(*level.spawn, None), ReplayKeys()))
+    worst = 0.0
+    for tick in range(max_ticks):
+        playing = batch.playing()
+        if not playing.any():
+            break
+        masks = bots.masks(tick)
+        batch.step(masks)
+        for i in np.nonzero(playing)[0].tolist():
+            level, player, keys = references[i]
+            keys.mask = int(masks[i])
+            outcome = level.step(1.0 / FPS, keys, player)
+            killer = level.killer_index if outcome == 'death' else -2
+            if outcome == 'death' and killer is None:
+                killer = FELL
+            if (outcome == 'death') != (not batch.alive[i]) or (outcome == 'victory') != bool(batch.won[i]) \
+                    or killer != batch.killer[i]:
+                raise AssertionError(f"level {level_num} agent {i} tick {tick}: outcome {outcome} "
+                                     f"(killer {killer}) vs kernel alive={batch.alive[i]} won={batch.won[i]} "
+                                     f"killer={batch.killer[i]}")
+            worst = max(worst, abs(player.x - batch.x[i]), abs(player.y - batch.y[i]),
+                        abs(player.vel_x - batch.vx[i]), abs(player.vel_y - batch.vy[i]))
+            if worst > PARITY_TOLERANCE:
+                raise AssertionError(f"level {level_num} agent {i} tick {tick}: state differs by {worst}")
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', help="Comma-separated level numbers (default: all)")
+    parser.add_argument('--agents', type=int, default=MONTE_CARLO_AGENTS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parity', type=int, metavar='N', help="Check N agents against Player.update instead")
+    parser.add_argument('--out', help="JSON results path")
+    args = parser.parse_args(argv)
+
+    level_count = len(LevelFactory.create_all_levels())
+    level_nums = [int(n) for n in args.levels.split(',')] if args.levels else range(1, level_count + 1)
+
+    if args.parity:
+        failed = False
+        for level_num in level_nums:
+            try:
+                print(f"Level {level_num:2d}: parity OK (max error {parity(level_num, args.parity, args.seed):.2e})")
+            except AssertionError as e:
+                print(f"PARITY FAILED: {e}")
+                failed = True
+        return 1 if failed else 0
+
+    results = []
+    for level_num in level_nums:
+        entry = estimate(level_num, args.agents, args.seed)
+        results.append(entry)
+        worst = next(iter(entry['deaths'].items()), None)
+        print(f"Level {level_num:2d}: win {entry['victory']:.1%}"
+              + (f", deadliest {worst[0]} {worst[1]:.1%}" if worst else ""))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import bisect
+import math
+import pygame
+from settings import *
+
+TILE_SIZE = (32 * MOVING_PLATFORM_HEIGHT // 8, MOVING_PLATFORM_HEIGHT)  # Source sprites are 32x8
+
+
+class Broadphase:
+    """Solids filed into fixed-width x columns (levels only scroll sideways).
+
+    Entries are pygame.Rects, which may be moved in place and re-filed with
+    move(), or fake platforms, resolved through get_platform_rect() so a
+    crumbled one turns into an empty rect. Queries return rects in insertion
+    order, so collision resolution matches a scan of the full list.
+    """
+    def __init__(self, cell=BROADPHASE_CELL):
+        self.cell = cell
+        self.columns = {}
+        self.items = []
+        self.spans = []
+
+    def _span(self, rect):
+        return rect.left // self.cell, (rect.right - 1) // self.cell
+
+    def insert(self, item):
+        """File a rect or fake platform; returns its handle"""
+        handle = len(self.items)
+        rect = item if isinstance(item, pygame.Rect) else item.rect
+        span = self._span(rect)
+        self.items.append(item)
+        self.spans.append(span)
+        for col in range(span[0], span[1] + 1):
+            self.columns.setdefault(col, []).append(handle)
+        return handle
+
+    def move(self, handle):
+        """Re-file a rect after it moved; only touches columns it entered or left"""
+        old_lo, old_hi = self.spans[handle]
+        lo, hi = self._span(self.items[handle])
+        if (lo, hi) == (old_lo, old_hi):
+            return
+        for col in range(old_lo, old_hi + 1):
+            if not lo <= col <= hi:
+                self.columns[col].remove(handle)
+        for col in range(lo, hi + 1):
+            if not old_lo <= col <= old_hi:
+                self.columns.setdefault(col, []).append(handle)
+        self.spans[handle] = (lo, hi)
+
+    def query(self, left, right):
+        """Solid rects that may overlap the x range [left, right)"""
+        handles = set()
+        for col in range(int(left) // self.cell, int(right) // self.cell + 1):
+            handles.update(self.columns.get(col, ()))
+        return [self._resolve(self.items[handle]) for handle in sorted(handles)]
+
+    def all(self):
+        return [self._resolve(item) for item in self.items]
+
+    @staticmethod
+    def _resolve(item):
+        return item if isinstance(item, pygame.Rect) else item.get_platform_rect()
+
+
+class MovingPlatform:
+    """Kinematic platform that follows a path of waypoints and carries the player.
+
+    Its rect is moved in place every tick, so the level's broadphase entry
+    stays the same object and only needs re-filing. Ping-pong paths wait
+    `wait` seconds at each end; looping paths return from the last waypoint
+    to the first. The sprite animates on the shared clock, offset by `phase`.
+    """
+    def __init__(self, path, width=64, speed=80, loop=False, wait=0.5, color='grey', asset_manager=None, phase=0.0):
+        self.path = [(float(x), float(y)) for x, y in path]
+        self.rect = pygame.Rect(int(self.path[0][0]), int(self.path[0][1]), width, MOVING_PLATFORM_HEIGHT)
+        self.speed = speed
+        self.loop = loop
+        self.wait = wait
+        self.color = color
+        self.phase = phase
+        self.asset_manager = asset_manager
+
+        points = self.path + [self.path[0]] if loop else self.path
+        self.segments = list(zip(points, points[1:]))
+        self.lengths = [0.0]
+        for (x0, y0), (x1, y1) in self.segments:
+            self.lengths.append(self.lengths[-1] + math.hypot(x1 - x0, y1 - y0))
+        self.total = self.lengths[-1]
+
+        self.distance = 0.0
+        self.direction = 1
+        self.wait_timer = 0.0
+        self.dx = self.dy = 0  # Last tick's movement, applied to a rider
+        self.handle = None  # Broadphase entry, set by the owning level
+        self.initial_state = self.get_state()
+
+        self.atlas = self.off_frame = self.chain = None
+        self._load_sprites()
+        self.chain_points = self._chain_points()
+
+    def _load_sprites(self):
+        if not self.asset_manager:
+            return
+        images = self.asset_manager.images
+        if self.asset_manager.atlas.has(f'platform_{self.color}_on'):
+            self.atlas = self.asset_manager.atlas
+        off = images.get(f'platform_{self.color}_off')
+        if off:
+            self.off_frame = pygame.transform.scale(off, TILE_SIZE)
+        self.chain = images.get('platform_chain')
+
+    def _chain_points(self):
+        """Points every 16px along the path, where the chain links are drawn"""
+        if self.total <= 0:
+            return []
+        return [self._position(d) for d in range(0, int(self.total) + 1, 16)]
+
+    def _position(self, distance):
+        i = min(bisect.bisect_right(self.lengths, distance) - 1, len(self.segments) - 1)
+        (x0, y0), (x1, y1) = self.segments[i]
+        length = self.lengths[i + 1] - self.lengths[i]
+        t = (distance - self.lengths[i]) / length if length else 0.0
+        return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+
+    def update(self, dt):
+        old_x, old_y = self.rect.x, self.rect.y
+        if self.wait_timer > 0:
+            self.wait_timer -= dt
+        elif self.total > 0:
+            self.distance += self.direction * self.speed * dt
+            if self.loop:
+                self.distance %= self.total
+            elif self.distance >= self.total or self.distance <= 0:
+                self.distance = min(max(self.distance, 0.0), self.total)
+                self.direction *= -1
+                self.wait_timer = self.wait
+        x, y = self._position(self.distance)
+        self.rect.x, self.rect.y = int(x), int(y)
+        self.dx, self.dy = self.rect.x - old_x, self.rect.y - old_y
+
+    def get_state(self):
+        """Compact snapshot for the rewind buffer"""
+        return (self.distance, self.direction, self.wait_timer, self.rect.x, self.rect.y)
+
+    def set_state(self, state):
+        self.distance, self.direction, self.wait_timer, self.rect.x, self.rect.y = state
+        self.dx = self.dy = 0
+
+    def reset(self):
+        self.set_state(self.initial_state)
+
+    def draw(self, screen, camera_x):
+        if self.chain:
+            for x, y in self.chain_points:
+                screen.blit(self.chain, (x - camera_x + self.rect.w // 2 - 4, y + self.rect.h // 2 - 4))
+
+        x = self.rect.x - camera_x
+        moving = self.wait_timer <= 0
+        if self.atlas:
+            name = f'platform_{self.color}_on'
+            tile = self.atlas.frame(name, self.phase, TILE_SIZE) if moving else self.off_frame or self.atlas.frames(name, TILE_SIZE)[0]
+            tile_w = tile.get_width()
+            for offset in range(0, self.rect.w, tile_w):
+                screen.blit(tile, (x + offset, self.rect.y), (0, 0, min(tile_w, self.rect.w - offset), self.rect.h))
+        else:
+            color = (150, 150, 160) if self.color == 'grey' else (150, 100, 60)
+            pygame.draw.rect(screen, color, (x, self.rect.y, self.rect.w, self.rect.h))
+            pygame.draw.rect(screen, GRAY if moving else (70, 70, 70), (x, self.rect.y, self.rect.w, self.rect.h), 2)
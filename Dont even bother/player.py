@@ -1,5 +1,8 @@
 import pygame
+import random
 from settings import *
+from quality import scaled_count
+from zones import NEUTRAL
 
 class Player:
     def __init__(self, x, y, asset_manager):
@@ -10,6 +13,7 @@ class Player:
         self.vel_x = 0.0
         self.vel_y = 0.0
         self.on_ground = False
+        self.ground = None  # NEW: Rect stood on last tick (moving platforms carry the player)
         self.alive = True
         self.facing_right = True
         self.asset_manager = asset_manager
@@ -29,6 +33,8 @@ class Player:
 
     def _load_animations(self):
         # FIXED: Safer animation loading with validation
+        if not self.asset_manager:  # NEW: Headless replays run without assets
+            return
         if 'idle' in self.asset_manager.images and self.asset_manager.images['idle']:
             frames = self.asset_manager.extract_frames(self.asset_manager.images['idle'], 32, 32)
             if frames:  # Only add if frames exist
@@ -44,7 +50,7 @@ class Player:
             if frames:
                 self.animations['jump'] = frames
 
-    def update(self, dt, keys, platforms):
+    def update(self, dt, keys, platforms, zones=None):
         if not self.alive:
             self.death_timer += dt
             self._update_death_particles(dt)
@@ -54,37 +60,47 @@ class Player:
         if self.state_change_cooldown > 0:
             self.state_change_cooldown -= dt
 
-        self._handle_movement(dt, keys)
-        self._apply_physics(dt)
+        # NEW: One grid lookup under the player's feet picks up wind, bounce pads and surface materials
+        modifier = zones.at(self.x + self.width / 2, self.y + self.height - 1) if zones else NEUTRAL
+        self._handle_movement(dt, keys, modifier)
+        self._apply_physics(dt, modifier)
         self._handle_collisions(platforms)
         self._update_animation(dt)
 
-    def _handle_movement(self, dt, keys):
+    def _handle_movement(self, dt, keys, modifier=NEUTRAL):
         move_left = keys[pygame.K_a] or keys[pygame.K_LEFT]
         move_right = keys[pygame.K_d] or keys[pygame.K_RIGHT]
+        # NEW: Surface materials only grip while standing on them
+        accel, decel, top_speed = modifier[:3] if self.on_ground else NEUTRAL[:3]
 
         if move_left:
-            self.vel_x -= ACCELERATION * dt
+            self.vel_x -= ACCELERATION * accel * dt
             self.facing_right = False
         elif move_right:
-            self.vel_x += ACCELERATION * dt
+            self.vel_x += ACCELERATION * accel * dt
             self.facing_right = True
         else:
             if self.vel_x > 0:
-                self.vel_x = max(0, self.vel_x - DECELERATION * dt)
+                self.vel_x = max(0, self.vel_x - DECELERATION * decel * dt)
             elif self.vel_x < 0:
-                self.vel_x = min(0, self.vel_x + DECELERATION * dt)
-
-        self.vel_x = max(-PLAYER_SPEED, min(PLAYER_SPEED, self.vel_x))
-
-    def _apply_physics(self, dt):
-        self.vel_y += GRAVITY * dt
-        self.vel_y = min(self.vel_y, 1000)
+                self.vel_x = min(0, self.vel_x + DECELERATION * decel * dt)
+
+        top_speed *= PLAYER_SPEED
+        self.vel_x = max(-top_speed, min(top_speed, self.vel_x))
+
+    def _apply_physics(self, dt, modifier=NEUTRAL):
+        _, _, _, wind_x, wind_y, bounce = modifier
+        if bounce and self.on_ground:
+            self.vel_y = -bounce
+        self.vel_x += wind_x * dt
+        self.vel_y += (GRAVITY + wind_y) * dt
+        self.vel_y = max(-PLAYER_MAX_VERTICAL_SPEED, min(self.vel_y, PLAYER_MAX_VERTICAL_SPEED))
         self.x += self.vel_x * dt
         self.y += self.vel_y * dt
 
     def _handle_collisions(self, platforms):
         self.on_ground = False
+        self.ground = None
         player_rect = self.get_rect()
 
         for plat in platforms:
@@ -93,6 +109,7 @@ class Player:
                     self.y = float(plat.top - self.height)
                     self.vel_y = 0
                     self.on_ground = True
+                    self.ground = plat
                 elif self.vel_y < 0 and player_rect.top < plat.bottom:
                     self.y = float(plat.bottom)
                     self.vel_y = 0
@@ -150,22 +167,21 @@ class Player:
         if self.on_ground and self.alive:
             self.vel_y = JUMP_FORCE
 
-    def die(self):
+    def die(self, rng=random):
         self.alive = False
         self.death_timer = 0
         
         # NEW: Create death particles for visual feedback
-        import random
-        for _ in range(20):
-            angle = random.uniform(0, 6.28)
-            speed = random.uniform(100, 300)
+        for _ in range(scaled_count(20)):
+            angle = rng.uniform(0, 6.28)
+            speed = rng.uniform(100, 300)
             self.death_particles.append({
                 'x': self.x + self.width / 2,
                 'y': self.y + self.height / 2,
                 'vx': speed * pygame.math.Vector2(1, 0).rotate_rad(angle).x,
                 'vy': speed * pygame.math.Vector2(1, 0).rotate_rad(angle).y - 200,
-                'life': random.uniform(0.5, 1.0),
-                'color': random.choice([RED, ORANGE, YELLOW])
+                'life': rng.uniform(0.5, 1.0),
+                'color': rng.choice([RED, ORANGE, YELLOW])
             })
 
     def reset(self, x, y):
@@ -173,6 +189,7 @@ class Player:
         self.y = float(y)
         self.vel_x = 0.0
         self.vel_y = 0.0
+        self.ground = None
         self.alive = True
         self.frame = 0
         self.frame_timer = 0
@@ -180,7 +197,16 @@ class Player:
         self.previous_state = 'idle'
         self.state_change_cooldown = 0
         self.death_timer = 0
-        self.death_particles = []
+        self.death_particles.clear()
+
+    def get_state(self):
+        """NEW: Compact snapshot for the rewind buffer (death particles are cosmetic)"""
+        return (self.x, self.y, self.vel_x, self.vel_y, self.on_ground, self.ground, self.alive, self.facing_right,
+                self.state, self.frame, self.frame_timer, self.state_change_cooldown, self.death_timer)
+
+    def set_state(self, state):
+        (self.x, self.y, self.vel_x, self.vel_y, self.on_ground, self.ground, self.alive, self.facing_right,
+         self.state, self.frame, self.frame_timer, self.state_change_cooldown, self.death_timer) = state
 
     def get_rect(self):
         return pygame.Rect(int(self.x), int(self.y), self.width, self.height)
@@ -0,0 +1,213 @@
+import math
+import pygame
+from settings import *
+from traps import Trap
+
+try:
+    import numpy as np
+except ImportError:  # Arrow launchers stay silent without NumPy
+    np = None
+
+class ProjectilePool:
+    """Every projectile of a level in fixed, preallocated arrays.
+
+    Live projectiles are packed at the front; retired ones are overwritten by
+    the next shot, so firing never allocates per projectile. Each projectile
+    flies in a straight line from its origin and knows up front how far it
+    can travel before it hits static geometry (cast once per launcher), so
+    the per-tick platform test is a single comparison. The player test
+    sweeps each projectile's box along the segment it covered this tick.
+    """
+    def __init__(self, capacity=PROJECTILE_POOL_SIZE, asset_manager=None):
+        self.origin = np.zeros((capacity, 2))
+        self.heading = np.zeros((capacity, 2))  # Unit direction
+        self.speed = np.zeros(capacity)
+        self.traveled = np.zeros(capacity)
+        self.prev = np.zeros(capacity)  # Distance at the start of the tick
+        self.reach = np.zeros(capacity)  # Distance to the first static solid
+        self.owner = np.zeros(capacity, dtype=np.int32)  # Launcher index in Level.traps
+        self.angle = np.zeros(capacity, dtype=np.int16)  # Sprite rotation, degrees
+        self.count = 0
+        self.hit = None  # Lowest owner index of a projectile touching the player this tick
+        self.solids = np.zeros((0, 4))
+        self.atlas = asset_manager.atlas if asset_manager and asset_manager.atlas.has('arrow_idle') else None
+
+    def _arrays(self):
+        return (self.origin, self.heading, self.speed, self.traveled, self.prev, self.reach, self.owner, self.angle)
+
+    def set_solids(self, rects):
+        """Static rects that stop projectiles (moving and fake platforms don't)"""
+        self.solids = np.array([(r.left, r.top, r.right, r.bottom) for r in rects], dtype=np.float64).reshape(-1, 4)
+
+    def cast(self, origin, heading, max_range=PROJECTILE_MAX_RANGE):
+        """Distance a projectile box can travel from `origin` along `heading` before touching a solid"""
+        if not len(self.solids):
+            return float(max_range)
+        half = PROJECTILE_HITBOX / 2
+        lo = self.solids[:, :2] - half
+        hi = self.solids[:, 2:] + half
+        near, far = _slabs(np.asarray(origin, dtype=np.float64), np.asarray(heading, dtype=np.float64), lo, hi)
+        hits = near[(near <= far) & (far >= 0)]
+        return float(min(max_range, max(0.0, hits.min()))) if len(hits) else float(max_range)
+
+    def fire(self, owner, origin, heading, speed, reach):
+        """Claim a free slot; shots beyond capacity are dropped"""
+        i = self.count
+        if i >= len(self.speed):
+            return False
+        self.origin[i] = origin
+        self.heading[i] = heading
+        self.speed[i] = speed
+        self.traveled[i] = self.prev[i] = 0.0
+        self.reach[i] = reach
+        self.owner[i] = owner
+        self.angle[i] = int(math.degrees(math.atan2(-heading[1], heading[0]))) - 90  # Sprite points up
+        self.count = i + 1
+        return True
+
+    def update(self, dt, player):
+        self.advance(dt)
+        rect = player.get_rect()
+        owner = int(self.first_hit(np.array((rect.left,)), np.array((rect.top,)), rect.w, rect.h)[0])
+        self.hit = owner if owner >= 0 else None
+
+    def advance(self, dt):
+        """Retire spent projectiles and move the rest; arrows ignore the player, so this is shared by batches"""
+        n = self.count
+        if not n:
+            return
+        # Projectiles that reached a wall last tick retire now, after their final segment was tested
+        spent = self.traveled[:n] >= self.reach[:n]
+        if spent.any():
+            self._retire(spent)
+            n = self.count
+            if not n:
+                return
+
+        self.prev[:n] = self.traveled[:n]
+        self.traveled[:n] += self.speed[:n] * dt
+        np.minimum(self.traveled[:n], self.reach[:n], out=self.traveled[:n])
+
+    def first_hit(self, left, top, width, height):
+        """Per player rect (arrays of left/top): lowest owner index of a projectile that swept into it this tick, or -1"""
+        n = self.count
+        if not n:
+            return np.full(len(left), -1, dtype=np.int64)
+        half = PROJECTILE_HITBOX / 2
+        start = self.origin[:n] + self.heading[:n] * self.prev[:n, None]
+        near, far = _slabs(start, self.heading[:n],
+                           np.stack((left - half, top - half), axis=-1)[:, None, :],
+                           np.stack((left + width + half, top + height + half), axis=-1)[:, None, :])
+        touching = (near <= far) & (far >= 0) & (near <= self.traveled[:n] - self.prev[:n])
+        owners = np.where(touching, self.owner[:n], np.iinfo(np.int64).max).min(axis=1)
+        return np.where(touching.any(axis=1), owners, -1)
+
+    def _retire(self, dead):
+        alive = np.nonzero(~dead)[0]
+        self.count = len(alive)
+        for array in self._arrays():
+            array[:self.count] = array[alive]
+
+    def get_state(self):
+        """Live projectiles packed into one bytes value for the rewind buffer"""
+        n = self.count
+        return (n, b''.join(array[:n].tobytes() for array in self._arrays()))
+
+    def set_state(self, state):
+        n, data = state
+        offset = 0
+        for array in self._arrays():
+            live = array[:n]
+            live[...] = np.frombuffer(data, dtype=array.dtype, count=live.size, offset=offset).reshape(live.shape)
+            offset += live.nbytes
+        self.count = n
+        self.hit = None
+
+    def clear(self):
+        self.count = 0
+        self.hit = None
+
+    def draw(self, screen, camera_x):
+        n = self.count
+        if not n:
+            return
+        pos = self.origin[:n] + self.heading[:n] * self.traveled[:n, None]
+        xs = pos[:, 0] - camera_x
+        on_screen = np.nonzero((xs > -PROJECTILE_HITBOX) & (xs < GAME_WIDTH + PROJECTILE_HITBOX))[0]
+        for x, y, angle, (hx, hy) in zip(xs[on_screen].astype(np.int64).tolist(), pos[on_screen, 1].astype(np.int64).tolist(),
+                                         self.angle[on_screen].tolist(), self.heading[on_screen].tolist()):
+            # Rotated frames are cached per angle in the shared atlas
+            frame = self.atlas.frame('arrow_idle', 0.0, None, angle) if self.atlas else None
+            if frame is not None:
+                screen.blit(frame, frame.get_rect(center=(x, y)))
+            else:
+                tail = (x - hx * 12, y - hy * 12)
+                pygame.draw.line(screen, LIGHT_GRAY, tail, (x, y), 2)
+                pygame.draw.circle(screen, RED, (x, y), 2)
+
+
+class ArrowLauncher(Trap):
+    """Wall-mounted launcher that fires arrows into its level's ProjectilePool.
+
+    The housing itself is harmless; an arrow touching the player counts as
+    this launcher killing them, so death causes and killer_index keep the
+    level's trap order.
+    """
+    def __init__(self, x, y, direction=(-1, 0), interval=1.5, speed=300, delay=0.0):
+        super().__init__(x, y, 16, 16)
+        length = math.hypot(*direction) or 1.0
+        self.heading = (direction[0] / length, direction[1] / length)
+        self.interval = interval
+        self.speed = speed
+        self.delay = delay
+        self.timer = -delay  # Negative delays the first shot, staggering launchers
+        self.pool = None
+        self.index = None
+        self.reach = 0.0
+
+    def bind(self, pool, index):
+        """Called by the owning level: where to fire and how far arrows fly"""
+        self.pool = pool
+        self.index = index
+        self.reach = pool.cast(self.rect.center, self.heading)
+
+    def update(self, dt, player):
+        self.update_particles(dt)
+        self.mark_dirty()  # The fire timer runs from the first tick, so every respawn restores it
+        self.timer += dt
+        if self.timer >= self.interval:
+            self.timer -= self.interval
+            if self.pool is not None:
+                self.pool.fire(self.index, self.rect.center, self.heading, self.speed, self.reach)
+                self.spawn_particles(self.rect.centerx, self.rect.centery, 3, LIGHT_GRAY, speed_range=(20, 60))
+
+    def check_collision(self, player):
+        return self.pool is not None and self.pool.hit == self.index
+
+    def draw(self, screen, camera_x):
+        self.draw_particles(screen, camera_x)
+        x = self.rect.x - camera_x
+        pygame.draw.rect(screen, (70, 70, 80), (x, self.rect.y, self.rect.w, self.rect.h))
+        pygame.draw.rect(screen, GRAY, (x, self.rect.y, self.rect.w, self.rect.h), 2)
+        # Muzzle on the firing side, glowing as the next shot nears
+        charge = max(0.0, min(1.0, self.timer / self.interval))
+        muzzle = (int(self.rect.centerx + self.heading[0] * 6 - camera_x), int(self.rect.centery + self.heading[1] * 6))
+        pygame.draw.circle(screen, (int(80 + 175 * charge), 40, 40), muzzle, 3)
+
+    def get_state(self):
+        return (self.timer,)
+
+    def set_state(self, state):
+        self.timer, = state
+
+
+def _slabs(start, heading, lo, hi):
+    """Entry/exit distances of rays start + s*heading through boxes [lo, hi] (broadcasts)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (lo - start) / heading
+        t2 = (hi - start) / heading
+    parallel = heading == 0
+    inside = (start >= lo) & (start <= hi)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    return near.max(axis=-1), far.min(axis=-1)
@@ -0,0 +1,61 @@
+import collections
+from settings import FPS, QUALITY_TIERS, QUALITY_WINDOW, QUALITY_DOWNGRADE_RATIO, QUALITY_UPGRADE_RATIO, QUALITY_UPGRADE_HOLD
+
+# Active tier shared by traps and UI effects; only the governor changes it
+_active_tier = QUALITY_TIERS[-1]
+
+
+def current_tier():
+    """Effect settings for the tier currently selected by the governor"""
+    return _active_tier
+
+
+def scaled_count(count):
+    """Scale a configured particle count by the active tier"""
+    if count <= 0:
+        return 0
+    return max(1, int(count * _active_tier['particle_scale']))
+
+
+class QualityGovernor:
+    """Watches frame work time against the FPS budget and steps effect tiers.
+
+    Downgrades as soon as one window averages over budget, but only upgrades
+    after several consecutive comfortable windows so tiers don't oscillate.
+    """
+    def __init__(self, fps=FPS, start_tier=None):
+        self.budget = 1.0 / fps
+        self.samples = collections.deque(maxlen=QUALITY_WINDOW)
+        self.tier_index = len(QUALITY_TIERS) - 1 if start_tier is None else start_tier
+        self.good_windows = 0
+        self._apply()
+
+    def record(self, frame_time):
+        """Feed the time (seconds) spent doing work for one frame"""
+        self.samples.append(frame_time)
+        if len(self.samples) < self.samples.maxlen:
+            return
+        average = sum(self.samples) / len(self.samples)
+        self.samples.clear()
+
+        if average > self.budget * QUALITY_DOWNGRADE_RATIO:
+            self.good_windows = 0
+            if self.tier_index > 0:
+                self.tier_index -= 1
+                self._apply()
+        elif average < self.budget * QUALITY_UPGRADE_RATIO:
+            self.good_windows += 1
+            if self.good_windows >= QUALITY_UPGRADE_HOLD and self.tier_index < len(QUALITY_TIERS) - 1:
+                self.good_windows = 0
+                self.tier_index += 1
+                self._apply()
+        else:
+            self.good_windows = 0
+
+    def _apply(self):
+        global _active_tier
+        _active_tier = QUALITY_TIERS[self.tier_index]
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.tier_index]
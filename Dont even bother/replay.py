@@ -0,0 +1,200 @@
+import os
+import struct
+import pygame
+from settings import FPS, REPLAY_FLUSH_BYTES, DEATH_MESSAGES, REWIND_KEY
+from player import Player
+from utils import Camera
+from rewind import RewindBuffer
+
+# File layout: header, then run-length records of
+#   varint run, u8 key mask, varint dt_ms
+# A run of 0 (with no payload) marks a level reset (R pressed after a death).
+REPLAY_MAGIC = b'DEBR'
+REPLAY_VERSION = 1
+HEADER_FORMAT = '<4sBHQB'  # magic, version, level, seed, fps
+
+# Every key the simulation reads, one bit each
+KEY_BITS = (pygame.K_a, pygame.K_LEFT, pygame.K_d, pygame.K_RIGHT, pygame.K_w, pygame.K_UP, pygame.K_SPACE, REWIND_KEY)
+RESET = None
+
+
+def encode_keys(keys):
+    """Pack the simulation keys of a get_pressed() result into one byte"""
+    mask = 0
+    for bit, key in enumerate(KEY_BITS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayKeys:
+    """Stands in for pygame.key.get_pressed() when driving the simulation from a mask"""
+    _bit_for_key = {key: 1 << bit for bit, key in enumerate(KEY_BITS)}
+
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & self._bit_for_key.get(key, 0))
+
+
+class InputRecorder:
+    """Streams per-tick key masks and frame times to disk, run-length encoded"""
+    def __init__(self, path, level_num, seed, fps=FPS):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, level_num, seed, fps))
+        self.buffer = bytearray()
+        self.run_mask = None
+        self.run_dt = None
+        self.run_length = 0
+        self.ticks = 0
+
+    def record(self, keys, dt):
+        """Called once per simulated tick with the keys and dt fed to Level.step"""
+        mask = encode_keys(keys)
+        dt_ms = int(round(dt * 1000))
+        self.ticks += 1
+        if mask == self.run_mask and dt_ms == self.run_dt:
+            self.run_length += 1
+            return
+        self._end_run()
+        self.run_mask, self.run_dt, self.run_length = mask, dt_ms, 1
+
+    def mark_reset(self):
+        self._end_run()
+        self.buffer.append(0)
+
+    def _end_run(self):
+        if self.run_length:
+            _write_varint(self.buffer, self.run_length)
+            self.buffer.append(self.run_mask)
+            _write_varint(self.buffer, self.run_dt)
+            self.run_length = 0
+            self.run_mask = self.run_dt = None
+            if len(self.buffer) >= REPLAY_FLUSH_BYTES:
+                self.file.write(self.buffer)
+                self.buffer.clear()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self._end_run()
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.file.close()
+
+
+def read_replay(path):
+    """Returns (header dict, list of ticks); each tick is (mask, dt_ms) or RESET"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    header_size = struct.calcsize(HEADER_FORMAT)
+    magic, version, level_num, seed, fps = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"'{path}' is not a version {REPLAY_VERSION} replay")
+
+    ticks = []
+    pos = header_size
+    while pos < len(data):
+        run, pos = _read_varint(data, pos)
+        if run == 0:
+            ticks.append(RESET)
+            continue
+        mask = data[pos]
+        dt_ms, pos = _read_varint(data, pos + 1)
+        ticks.extend([(mask, dt_ms)] * run)
+    header = {'level': level_num, 'seed': seed, 'fps': fps}
+    return header, ticks
+
+
+class Replayer:
+    """Drives a Level and Player from a replay file exactly as Game._update did"""
+    def __init__(self, header, ticks, levels, asset_manager=None):
+        self.header = header
+        self.ticks = ticks
+        self.level = levels[header['level'] - 1]
+        self.asset_manager = asset_manager
+        self.player = None
+        self.camera = None
+        self.tick = 0
+        self.death_message = ""
+
+    @classmethod
+    def load(cls, path, levels, asset_manager=None):
+        header, ticks = read_replay(path)
+        return cls(header, ticks, levels, asset_manager)
+
+    def start(self):
+        self.level.death_count = 0
+        self.level.reset()
+        self.level.reseed(self.header['seed'])
+        spawn_x, spawn_y = self.level.spawn
+        self.player = Player(spawn_x, spawn_y, self.asset_manager)
+        self.camera = Camera(self.level.width)
+        self.rewind = RewindBuffer(self.level.snapshot_entities(self.player, self.camera))
+        self.tick = 0
+
+    def step(self):
+        """Replay one recorded tick; returns the Level.step outcome, 'reset', 'rewind' or 'end'"""
+        if self.tick >= len(self.ticks):
+            return 'end'
+        entry = self.ticks[self.tick]
+        self.tick += 1
+        if entry is RESET:
+            self.reset_level()
+            return 'reset'
+
+        mask, dt_ms = entry
+        dt = dt_ms / 1000.0
+        keys = ReplayKeys(mask)
+        if keys[REWIND_KEY]:
+            self.rewind.rewind()
+            return 'rewind'
+        outcome = self.level.step(dt, keys, self.player)
+        self.camera.update(self.player.x, dt)
+        self.rewind.capture()
+        if outcome == 'death':
+            self.player.die(self.level.fx_rng)
+            self.death_message = self.level.message_rng.choice(DEATH_MESSAGES)
+            self.level.death_count += 1
+        return outcome
+
+    def reset_level(self):
+        """Same as Game._reset_level (the R key after a death)"""
+        spawn_x, spawn_y = self.level.spawn
+        self.player.reset(spawn_x, spawn_y)
+        self.level.reset()
+        self.rewind.clear()
+
+    def next_is_reset(self):
+        return self.tick < len(self.ticks) and self.ticks[self.tick] is RESET
+
+    def run(self, on_tick=None):
+        """Replay the whole file, calling on_tick(replayer, outcome) after every tick"""
+        self.start()
+        while True:
+            outcome = self.step()
+            if outcome == 'end':
+                return
+            if on_tick:
+                on_tick(self, outcome)
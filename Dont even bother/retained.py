@@ -0,0 +1,80 @@
+import pygame
+
+
+class RetainedView:
+    """Retained-mode screen that repaints only what changed.
+
+    Each frame the owner hands over its widgets as (key, state, rect, draw)
+    tuples: `state` is any comparable summary of how the widget looks,
+    `rect` bounds everything it draws. Widgets whose state or rect changed
+    (and ones that disappeared) mark their old and new regions dirty; those
+    regions are restored from a cached background and every widget touching
+    them is redrawn, clipped. Static content lives in the background, which
+    is rebuilt when its key changes.
+    """
+    def __init__(self, build_background):
+        self.build_background = build_background  # (size) -> Surface
+        self.background = None
+        self.background_key = None
+        self.drawn = {}  # Widget key -> (state, rect) as last presented
+        self.valid = False
+
+    def invalidate(self):
+        """The screen was drawn over by something else; repaint everything next frame"""
+        self.valid = False
+
+    def render(self, screen, widgets, background_key=()):
+        """Draw this frame; returns the rects to present, or None when the whole screen changed"""
+        background_key = (screen.get_size(), background_key)
+        if background_key != self.background_key:
+            self.background = self.build_background(screen.get_size())
+            self.background_key = background_key
+            self.valid = False
+
+        if not self.valid:
+            screen.blit(self.background, (0, 0))
+            for _key, _state, _rect, draw in widgets:
+                draw(screen)
+            self.drawn = {key: (state, rect) for key, state, rect, _draw in widgets}
+            self.valid = True
+            return None
+
+        dirty = []
+        current = {}
+        for key, state, rect, _draw in widgets:
+            current[key] = (state, rect)
+            previous = self.drawn.get(key)
+            if previous != (state, rect):
+                dirty.append(rect)
+                if previous:
+                    dirty.append(previous[1])
+        dirty.extend(rect for key, (_state, rect) in self.drawn.items() if key not in current)
+        self.drawn = current
+        dirty = _merge(screen.get_rect().clip(rect) for rect in dirty)
+
+        for region in dirty:
+            screen.set_clip(region)
+            screen.blit(self.background, region, region)
+            for _key, _state, rect, draw in widgets:
+                if rect.colliderect(region):
+                    draw(screen)
+        screen.set_clip(None)
+        return dirty
+
+
+def _merge(rects):
+    """Union overlapping rects so shared pixels are restored and presented once"""
+    merged = []
+    for rect in rects:
+        if not rect.w or not rect.h:
+            continue
+        rect = pygame.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
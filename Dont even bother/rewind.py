@@ -0,0 +1,48 @@
+import collections
+from settings import FPS, REWIND_SECONDS, REWIND_KEYFRAME_INTERVAL, REWIND_SPEED
+
+
+class RewindBuffer:
+    """Fixed-length ring of world snapshots.
+
+    Every REWIND_KEYFRAME_INTERVAL ticks a full keyframe (one state tuple per
+    entity) is stored; other ticks keep a reference to that keyframe plus only
+    the (index, state) pairs that differ from it.
+    """
+    def __init__(self, entities, seconds=REWIND_SECONDS, fps=FPS, keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        self.entities = entities
+        self.frames = collections.deque(maxlen=int(seconds * fps))
+        self.keyframe_interval = keyframe_interval
+        self.keyframe = None
+        self.since_keyframe = 0
+
+    def capture(self):
+        states = [entity.get_state() for entity in self.entities]
+        if self.keyframe is None or self.since_keyframe >= self.keyframe_interval:
+            self.keyframe = tuple(states)
+            self.since_keyframe = 0
+            self.frames.append((self.keyframe, ()))
+            return
+        delta = tuple((i, state) for i, (state, base) in enumerate(zip(states, self.keyframe)) if state != base)
+        self.frames.append((self.keyframe, delta))
+        self.since_keyframe += 1
+
+    def rewind(self, steps=REWIND_SPEED):
+        """Step back up to `steps` snapshots and restore the world; False once history runs out"""
+        if len(self.frames) < 2:
+            return False
+        for _ in range(min(steps, len(self.frames) - 1)):
+            self.frames.pop()
+        keyframe, delta = self.frames[-1]
+        states = list(keyframe)
+        for i, state in delta:
+            states[i] = state
+        for entity, state in zip(self.entities, states):
+            entity.set_state(state)
+        # New captures start from a fresh keyframe taken from the restored world
+        self.keyframe = None
+        return True
+
+    def clear(self):
+        self.frames.clear()
+        self.keyframe = None
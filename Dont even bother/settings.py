@@ -40,6 +40,7 @@ PINK = (255, 105, 180)
 GRAVITY = 2500
 PLAYER_SPEED = 300
 JUMP_FORCE = -650
+PLAYER_MAX_VERTICAL_SPEED = 1000  # Original vel_y clamp, both ways
 ACCELERATION = 3000
 DECELERATION = 2200
 
@@ -72,8 +73,26 @@ CAMERA_SMOOTHNESS = 12  # Increased from 10
 BUTTON_HOVER_SCALE = 1.08
 BUTTON_PRESS_SCALE = 0.95
 BUTTON_SHADOW_OFFSET = 5
+BUTTON_HOVER_SMOOTHING = 0.15  # Fraction of the way to the target scale per frame at FPS
+BUTTON_PULSE_SPEED = 3.0  # Hover glow pulse, radians per second
+UI_HIT_CELL = 128  # Cell size of the button hit-test grid (pixels)
+# NEW: Cached button rendering (ui.ButtonSkin)
+BUTTON_SLICE_BORDER = 12  # Nine-slice corner size of the button art (pixels)
+BUTTON_SCALE_STEPS = 8  # Hover scales pre-rendered between 1.0 and BUTTON_HOVER_SCALE
+BUTTON_GLOW_STEPS = 8  # Glow alpha levels
+# NEW: Paged level select; only one page of cells exists at a time
+LEVEL_GRID_ROWS = 2
+LEVEL_GRID_COLS = 5
+LEVEL_THUMBNAIL_SIZE = (57, 51)  # The 19x17 level icons at 3x
+LEVEL_THUMBNAIL_CACHE = 30  # Thumbnails kept decoded (LRU): the current page and both neighbours
 TITLE_PULSE_SPEED = 2.0
 MENU_PARTICLE_COUNT = 50
+DEATH_PARTICLE_COUNT = 30
+VICTORY_CONFETTI_COUNT = 300
+# NEW: Screen-space UI effects (effects.py): sprites are pre-rendered, not built per frame
+PARTICLE_FADE_STEPS = 16  # Alpha levels per dot sprite
+CONFETTI_ROTATION_STEPS = 24  # Pre-rotated angles per confetti piece
+CONFETTI_COLORS = [GREEN, YELLOW, CYAN, WHITE]  # Fallback pieces when the confetti sheet is missing
 
 DEATH_MESSAGES = [
     "Did you even try?", "My grandma is better", "Just quit already", "Pathetic",
@@ -91,3 +110,118 @@ DEATH_MESSAGES = [
     "This is why you have no friends", "My cat plays better blindfolded",
     "Actual skill: 0", "Are you trolling yourself?", "Peak incompetence achieved"
 ]
+
+# NEW: Adaptive quality governor (steps effect tiers to hold the FPS budget)
+# Tiers are ordered lowest -> highest; the governor starts at the highest
+QUALITY_TIERS = [
+    {'name': 'low', 'particle_scale': 0.25, 'particle_cap': 10, 'trail_length': 0, 'glow': False, 'vignette_step': 0},
+    {'name': 'medium', 'particle_scale': 0.5, 'particle_cap': 20, 'trail_length': 2, 'glow': False, 'vignette_step': 60},
+    {'name': 'high', 'particle_scale': 1.0, 'particle_cap': 40, 'trail_length': 5, 'glow': True, 'vignette_step': 20},
+]
+QUALITY_WINDOW = 30  # Frames averaged per decision
+QUALITY_DOWNGRADE_RATIO = 0.9  # Step down when average work time exceeds 90% of the budget
+QUALITY_UPGRADE_RATIO = 0.5  # Step up only when comfortably under budget...
+QUALITY_UPGRADE_HOLD = 4  # ...for this many consecutive windows (hysteresis)
+
+# NEW: Deterministic replays
+REPLAY_RECORDING = False  # Stream every level attempt's input to REPLAY_DIR
+REPLAY_DIR = os.path.join(BASE_PATH, "replays")
+REPLAY_FLUSH_BYTES = 4096  # Encoded bytes buffered before each disk write
+LEVEL_SEED = None  # Fixed seed for every level start (None = random seed per start)
+
+# NEW: Benchmark budgets (p95 milliseconds per phase; benchmark.py fails if exceeded)
+BENCHMARK_BUDGETS_MS = {
+    'update': 2.0,
+    'collision': 1.0,
+    'level_draw': 8.0,
+    'overlays': 16.0,
+    'scaling': 8.0,
+}
+BENCHMARK_DEATH_FRAMES = 30  # Death screen frames rendered after each death
+BENCHMARK_VICTORY_FRAMES = 60
+BENCHMARK_SCRIPTED_TICKS = 1800  # Length of the fallback trace when a level has no recording
+
+# NEW: Synthetic stress levels (LevelFactory.create_stress_level)
+STRESS_DEFAULT_TRAP_MIX = {'saw': 2000, 'spike': 1000, 'fake_platform': 500, 'fake_goal': 100, 'narrow_gap': 50}
+STRESS_PIXELS_PER_PLATFORM = 20  # Level width used per platform in benchmark sweeps
+
+# NEW: Save file writing
+# 'sync'    - write on the calling thread (legacy behaviour)
+# 'async'   - background writer, atomic temp-file + rename
+# 'durable' - like 'async' but fsyncs before the rename
+SAVE_DURABILITY = 'async'
+SAVE_COALESCE_SECONDS = 0.5  # Background writer waits this long to batch bursts of changes
+
+# NEW: Per-death event log
+DEATH_LOG_BATCH = 64  # Records buffered in memory before each append to disk
+DEATH_HEATMAP_CELL = 20  # Heatmap bucket size in game pixels
+HEATMAP_BLUR_RADIUS = 2  # Cells; the overlay toggles with H
+
+# NEW: Ghost playback of previous attempts (toggle with G)
+GHOST_MAX_ATTEMPTS = 10  # Per level
+GHOST_ALPHA = 80
+
+# NEW: Rewind (hold the key to scrub the world backwards)
+REWIND_KEY = pygame.K_BACKSPACE
+REWIND_SECONDS = 5  # History kept; memory stays fixed however long you play
+REWIND_KEYFRAME_INTERVAL = 30  # Ticks between full snapshots; the rest store only what changed
+REWIND_SPEED = 2  # Snapshots stepped back per frame while the key is held
+
+# NEW: Trap backend
+# 'objects' - one Trap instance per hazard (original behaviour)
+# 'arrays'  - trapworld.TrapWorld: per-kind arrays updated in vectorised passes (needs NumPy)
+TRAP_BACKEND = 'objects'
+TRAP_PARTICLE_POOL = 4096  # Shared particle capacity per level with the 'arrays' backend
+
+# NEW: Moving platforms and the platform broadphase
+MOVING_PLATFORM_HEIGHT = 16  # 2x the 8px sprites in assets/Traps/Platforms
+BROADPHASE_CELL = 256  # Width of each x column solids are filed into
+BROADPHASE_MARGIN = 64  # Extra reach queried around the player (covers collision snapping)
+STRESS_MOVING_PLATFORMS = 200
+
+# NEW: Projectiles (arrow launchers)
+PROJECTILE_POOL_SIZE = 1024  # Live projectiles per level; shots beyond this are dropped
+PROJECTILE_HITBOX = 8  # Square box swept along each projectile's path
+PROJECTILE_MAX_RANGE = 2000  # Pixels an arrow flies when nothing static is in the way
+
+# NEW: Physics zones (wind, bounce pads, ice/mud/sand), baked into a per-level grid
+ZONE_CELL = 8  # Grid cell size; zone edges snap to it
+ZONE_SURFACE_BAND = 8  # Height above a platform top that surface zones and bounce pads cover
+BOUNCE_PAD_SPEED = 1000  # Default launch speed; can't exceed PLAYER_MAX_VERTICAL_SPEED or the clamp eats it
+STRESS_ZONES = 100
+
+# NEW: Level solver (solver.py)
+SOLVER_BEAM_WIDTH = 64  # Nodes kept per layer
+SOLVER_HOLD_TICKS = 5  # Ticks each input is held before branching again
+SOLVER_MAX_TICKS = 60 * FPS  # Give up after a minute of game time
+SOLVER_CELL = 6  # Pixels per bucket when merging near-duplicate player states
+SOLVER_FIELD_CELL = 16  # Route-field grid cell (pixels) for the search heuristic
+SOLVER_GROUNDED_SHARE = 0.25  # Fraction of each layer kept for the best players standing on something
+SOLVER_STALL_LAYERS = 120  # Layers without route progress before a search gives up
+SOLVER_BEAM_RETRIES = 2  # Times an unsolved level is searched again with a 4x wider beam
+SOLVER_REPORT_MARGINS = 5  # Narrowest trap passes and landings reported per level
+
+# NEW: Monte Carlo difficulty estimation (montecarlo.py)
+MONTE_CARLO_AGENTS = 2000  # Bot attempts per level
+MONTE_CARLO_MAX_TICKS = 60 * FPS
+MONTE_CARLO_JITTER_TICKS = 4  # Bots run the solver route up to this many ticks early or late
+MONTE_CARLO_SLIP_CHANCE = 0.02  # Per tick chance a bot presses a random key combination instead
+MONTE_CARLO_CURVE_STEP = 100  # Pixels between survival curve samples
+
+# NEW: Run the simulation on its own thread at a fixed FPS; the main thread
+# pumps input and draws the latest published snapshot (trap particles and
+# saw trails are not part of snapshots, so they aren't drawn in this mode)
+THREADED_SIMULATION = False
+
+# NEW: Low-latency loop: sleep first (until the next frame deadline minus the
+# recent worst-case work time), then pump events and sample keys right
+# before the simulation step, instead of clock.tick at the top of the loop
+LOW_LATENCY_LOOP = False
+LOW_LATENCY_SPIN_MS = 1.5  # Busy-wait the tail of the sleep (time.sleep overshoots)
+LOW_LATENCY_WINDOW = 30  # Frames of work time used to predict the next one
+# NEW: Key event -> presented frame latency histograms, printed on exit
+INPUT_LATENCY_TRACKING = False
+INPUT_LATENCY_BUCKET_MS = 2
+
+# NEW: Next-level warm-up on the victory screen (seconds of work per frame)
+WARMUP_FRAME_BUDGET = 0.004
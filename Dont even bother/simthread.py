@@ -0,0 +1,132 @@
+import threading
+import time
+from settings import FPS
+from replay import ReplayKeys
+
+
+class SnapshotBuffer:
+    """Triple buffer of published world snapshots.
+
+    The simulation fills a slot the renderer isn't reading and swaps it in
+    as the latest; the renderer always takes the newest complete snapshot,
+    so neither side waits on the other for more than an index swap.
+    """
+    def __init__(self, slots=3):
+        self.slots = [None] * slots
+        self.lock = threading.Lock()
+        self.latest = None
+        self.reading = None
+        self.writing = 0
+
+    def publish(self, snapshot):
+        self.slots[self.writing] = snapshot
+        with self.lock:
+            self.latest = self.writing
+            self.writing = next(i for i in range(len(self.slots)) if i not in (self.latest, self.reading))
+
+    def acquire(self):
+        """Newest published snapshot (the same one again if nothing new arrived), or None"""
+        with self.lock:
+            if self.latest is not None:
+                self.reading = self.latest
+            return self.slots[self.reading] if self.reading is not None else None
+
+    def clear(self):
+        with self.lock:
+            self.slots = [None] * len(self.slots)
+            self.latest = self.reading = None
+            self.writing = 0
+
+
+class RenderView:
+    """Render-side copy of a level, player and camera, refreshed from snapshots.
+
+    Snapshots hold the same state tuples the rewind buffer stores, so the
+    copy draws exactly what the simulation published. Cosmetic state that
+    isn't snapshotted (trap particles, saw trails) is not mirrored.
+    """
+    def __init__(self, level, player, camera):
+        self.level = level
+        self.player = player
+        self.camera = camera
+        self.entities = level.snapshot_entities(player, camera)
+        self.applied = None
+
+    def sync(self, snapshot, live_level):
+        if snapshot is not None and snapshot is not self.applied:
+            for entity, state in zip(self.entities, snapshot):
+                entity.set_state(state)
+            self.applied = snapshot
+        self.level.death_count = live_level.death_count
+        return self.level, self.player, self.camera
+
+
+class SimulationThread:
+    """Runs Game._simulate at a fixed FPS cadence off the main thread.
+
+    pygame's event pump, key state and display only work on the main thread,
+    so the main thread publishes a key mask (set_input) whenever it pumps
+    events and the simulation never calls into SDL. The thread pauses itself
+    after a death or victory; the main thread handles the outcome and
+    resumes it, so gameplay objects are only touched by one side at a time.
+    """
+    def __init__(self, game, fps=FPS):
+        self.game = game
+        self.dt = 1.0 / fps
+        self.buffer = SnapshotBuffer()
+        self.entities = []
+        self.input_mask = 0
+        self.outcome = None
+        self.running = threading.Event()
+        self.tick_lock = threading.Lock()
+        self.alive = True
+        self.thread = threading.Thread(target=self._loop, name='simulation', daemon=True)
+        self.thread.start()
+
+    def set_input(self, mask):
+        self.input_mask = mask
+
+    def take_outcome(self):
+        outcome, self.outcome = self.outcome, None
+        return outcome
+
+    def resume(self, entities):
+        """Start ticking the world made of `entities` (Level.snapshot_entities order)"""
+        self.pause()
+        self.entities = entities
+        self.outcome = None
+        self.buffer.clear()
+        self.buffer.publish(tuple(entity.get_state() for entity in entities))
+        self.running.set()
+
+    def pause(self):
+        """Stop ticking; returns once any tick in progress has finished"""
+        self.running.clear()
+        with self.tick_lock:
+            pass
+
+    def stop(self):
+        self.alive = False
+        self.running.set()
+        self.thread.join()
+
+    def _loop(self):
+        deadline = time.perf_counter()
+        while self.alive:
+            if not self.running.is_set():
+                self.running.wait()
+                deadline = time.perf_counter()
+            with self.tick_lock:
+                if not self.running.is_set() or not self.alive:
+                    continue
+                outcome = self.game._simulate(self.dt, ReplayKeys(self.input_mask))
+                self.buffer.publish(tuple(entity.get_state() for entity in self.entities))
+                if outcome:
+                    self.outcome = outcome
+                    self.running.clear()
+            deadline += self.dt
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.dt:
+                deadline = time.perf_counter()  # Fell behind; don't try to catch up in a burst
@@ -0,0 +1,428 @@
+"""Headless level solver and par-time calculator.
+
+Beam-searches key inputs through the game's own Player physics and trap
+logic (trap randomness seeded) and reports whether each level is
+beatable, the fastest run found and its narrowest margins. Nodes are
+scored by their route distance to the goal over a gravity-aware cell
+grid, and each layer's expansion is split across worker processes; a
+search that stops making route progress is retried with a wider beam.
+Exits with status 1 if any level goes unsolved.
+
+    python solver.py
+    python solver.py --levels 3,7 --beam 128 --out par.json
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Must be set before settings initialises pygame
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import json
+import math
+import random
+import sys
+import time
+from settings import *
+from levels import LevelFactory
+from player import Player
+from utils import Camera
+from traps import FakePlatform, InvisibleSpike, NarrowGap
+from projectiles import ArrowLauncher
+from replay import ReplayKeys, KEY_BITS
+
+LEFT = 1 << KEY_BITS.index(pygame.K_a)
+RIGHT = 1 << KEY_BITS.index(pygame.K_d)
+JUMP = 1 << KEY_BITS.index(pygame.K_w)
+ACTIONS = (RIGHT, RIGHT | JUMP, 0, JUMP, LEFT, LEFT | JUMP)
+UNREACHABLE = float('inf')
+
+
+class WorldState:
+    """Snapshot/restore of a level attempt, rng streams included so branches replay exactly.
+
+    The rect the player stands on is stored as its index among the level's
+    solids rather than the rect itself, so snapshots pickle to worker
+    processes (which build their own copy of the level) and still carry
+    the player on moving platforms there.
+    """
+    def __init__(self, level, player):
+        self.entities = level.snapshot_entities(player, Camera(level.width))
+        self.rngs = list({id(trap.rng): trap.rng for trap in level.traps if trap.rng is not random}.values())
+        self.player = player
+        self.solids = [item if isinstance(item, pygame.Rect) else item.rect for item in level.broadphase.items]
+        self.solid_index = {id(rect): i for i, rect in enumerate(self.solids)}
+
+    def capture(self):
+        states = [entity.get_state() for entity in self.entities]
+        ground = self.player.ground
+        if ground is not None:
+            states[0] = states[0][:5] + (self.solid_index.get(id(ground), pygame.Rect(ground)),) + states[0][6:]
+        return states, [rng.getstate() for rng in self.rngs]
+
+    def restore(self, snapshot):
+        states, rng_states = snapshot
+        for entity, state in zip(self.entities, states):
+            entity.set_state(state)
+        if isinstance(self.player.ground, int):
+            self.player.ground = self.solids[self.player.ground]
+        for rng, state in zip(self.rngs, rng_states):
+            rng.setstate(state)
+
+
+class RouteField:
+    """Route length to the goal, in cells, for every cell of a coarse grid.
+
+    A cell is supported when a jump can reach it: within jump height above
+    a standable surface (platforms, fake platforms, a moving platform's
+    sweep, bounce pads at their launch speed) and within a jump's ascent
+    drift of its ends, or inside an updraft. The player can move any way
+    out of a supported cell, but only down or diagonally down out of any
+    other. A breadth-first pass out from the goal over those moves scores
+    routes that first have to climb or turn away from the goal as progress,
+    where straight-line distance would rank them as regress. Cells are
+    tested at the player's centre; solids and static hazards (spikes,
+    narrow-gap walls) are blocked.
+    """
+    def __init__(self, level, cell=SOLVER_FIELD_CELL):
+        self.cell = cell
+        self.cols = level.width // cell + 1
+        self.rows = (GAME_HEIGHT + 100) // cell + 1
+        self.blocked = bytearray(self.cols * self.rows)
+        self.supported = bytearray(self.cols * self.rows)
+
+        half_w, half_h = PLAYER_WIDTH // 2, PLAYER_HEIGHT // 2
+        solids = list(level.platforms) + [fake.rect for fake in level.fake_platforms]
+        for rect in solids + list(self._hazards(level)):
+            # Only cells wholly inside the player-centre obstacle, so a player standing flush on a surface isn't in one
+            self._fill(self.blocked, rect.inflate(2 * half_w - cell - 2, 2 * half_h - cell - 2))
+
+        surfaces = [(rect, -JUMP_FORCE) for rect in solids]
+        for mover in level.moving_platforms:
+            sweep = mover.rect.unionall([mover.rect.move(x - mover.rect.x, y - mover.rect.y) for x, y in mover.path])
+            surfaces.append((sweep, -JUMP_FORCE))
+        for zone in level.zones.zones if level.zones else ():
+            if zone.kind == 'bounce':
+                surfaces.append((zone.rect, zone.modifier[5]))
+            elif zone.kind == 'wind' and zone.modifier[4] < -GRAVITY:
+                self._fill(self.supported, zone.rect.inflate(2 * half_w, 2 * half_h))
+        for rect, speed in surfaces:
+            rise = speed * speed / (2 * GRAVITY)
+            drift = PLAYER_SPEED * speed / GRAVITY + half_w
+            self._fill(self.supported, pygame.Rect(rect.left - drift, rect.top - half_h - rise,
+                                                   rect.w + 2 * drift, half_h + rise))
+
+        self.dist = [UNREACHABLE] * (self.cols * self.rows)
+        queue = collections.deque()
+        goal = level.goal.rect.inflate(2 * half_w, 2 * half_h)
+        for i in self._cells(goal):
+            if not self.blocked[i]:
+                self.dist[i] = 0
+                queue.append(i)
+        while queue:
+            i = queue.popleft()
+            row, col = divmod(i, self.cols)
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    r, c = row + d_row, col + d_col
+                    if not (0 <= r < self.rows and 0 <= c < self.cols):
+                        continue
+                    j = r * self.cols + c
+                    # (r, c) -> (row, col) moves down by -d_row rows; anything else needs support
+                    if self.dist[j] is UNREACHABLE and not self.blocked[j] and (d_row == -1 or self.supported[j]):
+                        self.dist[j] = self.dist[i] + 1
+                        queue.append(j)
+
+    @staticmethod
+    def _hazards(level):
+        for trap in level.traps:
+            if isinstance(trap, InvisibleSpike):
+                yield trap.rect
+            elif isinstance(trap, NarrowGap):
+                yield pygame.Rect(trap.rect.x, 0, trap.rect.w, trap.gap_y)
+                yield pygame.Rect(trap.rect.x, trap.gap_y + trap.gap_h, trap.rect.w, GAME_HEIGHT)
+
+    def _cells(self, rect):
+        """Indices of cells whose centres lie inside rect"""
+        half = self.cell // 2
+        col_lo = max(0, math.ceil((rect.left - half) / self.cell))
+        col_hi = min(self.cols - 1, (rect.right - 1 - half) // self.cell)
+        row_lo = max(0, math.ceil((rect.top - half) / self.cell))
+        row_hi = min(self.rows - 1, (rect.bottom - 1 - half) // self.cell)
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                yield row * self.cols + col
+
+    def _fill(self, grid, rect):
+        for i in self._cells(rect):
+            grid[i] = 1
+
+    def at(self, x, y):
+        col = min(self.cols - 1, max(0, int(x) // self.cell))
+        row = min(self.rows - 1, max(0, int(y) // self.cell))
+        return self.dist[row * self.cols + col]
+
+
+class LevelSolver:
+    """Beam search over inputs held for `hold` ticks at a time.
+
+    Every node in a layer sits at the same tick, so nodes compete on route
+    distance to the goal (straight-line distance breaks ties, and ranks
+    nodes the field can't route). Nodes whose player lands in the same
+    position/velocity bucket at the same tick are duplicates; only the
+    best-scored one is kept, so the beam keeps spreading out instead of
+    filling with one trajectory.
+    """
+    def __init__(self, level, seed=0, beam=SOLVER_BEAM_WIDTH, hold=SOLVER_HOLD_TICKS, max_ticks=SOLVER_MAX_TICKS):
+        self.level = level
+        self.seed = seed
+        self.beam = beam
+        self.hold = hold
+        self.max_ticks = max_ticks
+        self.dt = 1.0 / FPS
+        self.field = RouteField(level)
+
+    def start(self):
+        self.level.reset()
+        self.level.reseed(self.seed)
+        self.player = Player(*self.level.spawn, None)
+        self.world = WorldState(self.level, self.player)
+
+    def solve(self, expand=None):
+        """Input masks (one per tick) of the fastest run found, or None.
+
+        `expand` maps a list of snapshots to expand() results for each; pass
+        a LayerPool's to spread every layer across processes.
+        """
+        self.start()
+        expand = expand or self.expand
+        layer = [(self.world.capture(), None)]
+        closest, stalled = UNREACHABLE, 0
+        for _ in range(self.max_ticks // self.hold):
+            children = {}
+            for (_snapshot, path), results in zip(layer, expand([snapshot for snapshot, _path in layer])):
+                for action, outcome, ticks, key, score, snapshot in results:
+                    if outcome == 'victory':
+                        return _unroll((path, action, ticks))
+                    if key not in children or score < children[key][0]:
+                        children[key] = (score, snapshot, (path, action, ticks))
+            if not children:
+                return None
+            ranked = sorted(children.items(), key=lambda item: item[1][0])
+            # Part of the beam goes to players standing on something (the key's last field), one per
+            # route distance: a beam racing out over a gap still holds some waiting further back for
+            # a moving platform to come round or a saw to pass
+            reserved = {}
+            for key, (score, _snapshot, _path) in ranked:
+                if len(reserved) == int(self.beam * SOLVER_GROUNDED_SHARE):
+                    break
+                if key[-1] and score[0] not in reserved:
+                    reserved[score[0]] = key
+            best = [children[key] for key in reserved.values()]
+            reserved = set(reserved.values())
+            best += [child for key, child in ranked if key not in reserved][:self.beam - len(best)]
+            layer = [(snapshot, path) for _score, snapshot, path in best]
+            if ranked[0][1][0][0] < closest:
+                closest, stalled = ranked[0][1][0][0], 0
+            else:
+                stalled += 1
+                if stalled >= SOLVER_STALL_LAYERS:  # The beam is circling a dead end; a wider one may not be
+                    return None
+        return None
+
+    def expand(self, snapshots):
+        """Per snapshot: (action, outcome, ticks, key, score, snapshot) for every surviving action"""
+        expanded = []
+        for snapshot in snapshots:
+            results = []
+            for action in ACTIONS:
+                self.world.restore(snapshot)
+                outcome, ticks = self._advance(action)
+                if outcome == 'victory':
+                    results.append((action, outcome, ticks, None, None, None))
+                    break
+                if outcome != 'death':
+                    results.append((action, outcome, ticks, self._key(), self._score(), self.world.capture()))
+            expanded.append(results)
+        return expanded
+
+    def _advance(self, action):
+        keys = ReplayKeys(action)
+        for tick in range(1, self.hold + 1):
+            outcome = self.level.step(self.dt, keys, self.player)
+            if outcome:
+                return outcome, tick
+        return None, self.hold
+
+    def _key(self):
+        """Duplicate-state bucket: tick, position, velocity and whether the player is standing"""
+        p = self.player
+        return (self.level.ticks, int(p.x) // SOLVER_CELL, int(p.y) // SOLVER_CELL,
+                int(p.vel_x) // 100, int(p.vel_y) // 100, self._standing())
+
+    def _standing(self):
+        """On the ground or resting flush on a solid (a standing player's on_ground is only set every other tick)"""
+        p = self.player
+        if p.on_ground:
+            return True
+        feet = pygame.Rect(int(p.x), int(p.y) + PLAYER_HEIGHT, PLAYER_WIDTH, 1)
+        return p.vel_y >= 0 and feet.collidelist(self.world.solids) != -1
+
+    def _score(self):
+        goal = self.level.goal.rect
+        x, y = self.player.x + self.player.width / 2, self.player.y + self.player.height / 2
+        return self.field.at(x, y), math.hypot(goal.centerx - x, goal.centery - y)
+
+    def margins(self, inputs):
+        """Replay a solution and collect its closest trap passes and edge-most landings"""
+        self.start()
+        keys = ReplayKeys()
+        clearances, landings = [], []
+        was_grounded = True
+        for tick, action in enumerate(inputs, 1):
+            keys.mask = action
+            self.level.step(self.dt, keys, self.player)
+            rect = self.player.get_rect()
+            gap, name = min(((_gap(rect, hazard), name) for hazard, name in self._hazards()), default=(None, None))
+            if gap is not None:
+                clearances.append({'tick': tick, 'px': gap, 'trap': name})
+            ground = self.player.ground
+            if self.player.on_ground and not was_grounded and ground is not None:
+                landings.append({'tick': tick, 'px': min(rect.right - ground.left, ground.right - rect.left)})
+            was_grounded = self.player.on_ground
+        closest = sorted(clearances, key=lambda m: m['px'])[:SOLVER_REPORT_MARGINS]
+        edges = sorted(landings, key=lambda m: m['px'])[:SOLVER_REPORT_MARGINS]
+        return closest, edges
+
+    def _hazards(self):
+        """Rects that kill on contact (fake platforms are ground, launcher housings are harmless)"""
+        for trap in self.level.traps:
+            if isinstance(trap, FakePlatform):
+                continue
+            name = type(trap).__name__
+            if isinstance(trap, NarrowGap):
+                yield pygame.Rect(trap.rect.x, 0, trap.rect.w, trap.gap_y), name
+                yield pygame.Rect(trap.rect.x, trap.gap_y + trap.gap_h, trap.rect.w, GAME_HEIGHT), name
+            elif not isinstance(trap, ArrowLauncher):
+                yield trap.rect, name
+        pool = self.level.projectiles
+        if pool:
+            half = PROJECTILE_HITBOX / 2
+            for x, y in (pool.origin[:pool.count] + pool.heading[:pool.count] * pool.traveled[:pool.count, None]).tolist():
+                yield pygame.Rect(x - half, y - half, PROJECTILE_HITBOX, PROJECTILE_HITBOX), 'ArrowLauncher'
+
+
+class LayerPool:
+    """Spreads each beam layer's expansion over worker processes.
+
+    Workers build their own levels (pygame objects don't pickle) and keep a
+    solver per (level, seed, hold); snapshots travel as plain tuples and
+    paths stay in the parent, so a chunk's results are just per-action
+    outcomes, scores and child snapshots.
+    """
+    def __init__(self, executor, workers):
+        self.executor = executor
+        self.workers = workers
+
+    def expander(self, level_num, seed, hold):
+        def expand(snapshots):
+            size = math.ceil(len(snapshots) / self.workers)
+            chunks = [snapshots[i:i + size] for i in range(0, len(snapshots), size)]
+            futures = [self.executor.submit(_expand_chunk, level_num, seed, hold, chunk) for chunk in chunks]
+            return [results for future in futures for results in future.result()]
+        return expand
+
+
+_worker_solvers = {}
+
+
+def _expand_chunk(level_num, seed, hold, snapshots):
+    """Worker entry point: expand() a slice of a layer on this process's copy of the level"""
+    key = (level_num, seed, hold)
+    if key not in _worker_solvers:
+        solver = LevelSolver(LevelFactory.create_all_levels()[level_num - 1], seed, hold=hold)
+        solver.start()
+        _worker_solvers[key] = solver
+    return _worker_solvers[key].expand(snapshots)
+
+
+def _unroll(path):
+    """Per-tick masks from a chain of (parent, action, ticks) links"""
+    inputs = []
+    while path:
+        path, action, ticks = path
+        inputs.extend([action] * ticks)
+    inputs.reverse()
+    return inputs
+
+
+def _gap(a, b):
+    """Pixels of clearance between two rects (0 when touching)"""
+    return max(b.left - a.right, a.left - b.right, b.top - a.bottom, a.top - b.bottom, 0)
+
+
+def search(level, seed=0, beam=SOLVER_BEAM_WIDTH, hold=SOLVER_HOLD_TICKS, max_ticks=SOLVER_MAX_TICKS, expand=None):
+    """(solver, inputs) of the first search to reach the goal, widening the beam after each that doesn't"""
+    for attempt in range(SOLVER_BEAM_RETRIES + 1):
+        solver = LevelSolver(level, seed, beam * 4 ** attempt, hold, max_ticks)
+        inputs = solver.solve(expand)
+        if inputs is not None:
+            break
+    return solver, inputs
+
+
+def solve_level(level_num, seed=0, beam=SOLVER_BEAM_WIDTH, hold=SOLVER_HOLD_TICKS, max_ticks=SOLVER_MAX_TICKS, pool=None):
+    """Solve one level (layers expanded on `pool` when given) and build its report entry"""
+    start = time.perf_counter()
+    level = LevelFactory.create_all_levels()[level_num - 1]
+    solver, inputs = search(level, seed, beam, hold, max_ticks, pool.expander(level_num, seed, hold) if pool else None)
+    entry = {'level': level_num, 'seed': seed, 'solved': inputs is not None, 'beam': solver.beam}
+    if inputs is not None:
+        closest, edges = solver.margins(inputs)
+        entry.update({'par_ticks': len(inputs), 'par_seconds': round(len(inputs) / FPS, 2),
+                      'closest_traps': closest, 'edge_landings': edges})
+    entry['search_seconds'] = round(time.perf_counter() - start, 2)
+    return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', help="Comma-separated level numbers (default: all)")
+    parser.add_argument('--seed', type=int, default=0, help="Trap seed (Level.reseed)")
+    parser.add_argument('--beam', type=int, default=SOLVER_BEAM_WIDTH)
+    parser.add_argument('--hold', type=int, default=SOLVER_HOLD_TICKS, help="Ticks each input is held")
+    parser.add_argument('--max-ticks', type=int, default=SOLVER_MAX_TICKS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes each layer is split across (1 = search in this process)")
+    parser.add_argument('--out', help="JSON results path")
+    args = parser.parse_args(argv)
+
+    level_count = len(LevelFactory.create_all_levels())
+    level_nums = [int(n) for n in args.levels.split(',')] if args.levels else range(1, level_count + 1)
+
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(args.workers) if args.workers > 1 else contextlib.nullcontext() as executor:
+        pool = LayerPool(executor, args.workers) if executor else None
+        for n in level_nums:
+            entry = solve_level(n, args.seed, args.beam, args.hold, args.max_ticks, pool)
+            results.append(entry)
+            if entry['solved']:
+                trap = entry['closest_traps'][0] if entry['closest_traps'] else None
+                edge = entry['edge_landings'][0] if entry['edge_landings'] else None
+                print(f"Level {entry['level']:2d}: par {entry['par_ticks']} ticks ({entry['par_seconds']}s)"
+                      + (f", closest trap {trap['px']}px ({trap['trap']} @ {trap['tick']})" if trap else "")
+                      + (f", tightest landing {edge['px']}px @ {edge['tick']}" if edge else "")
+                      + f"  [beam {entry['beam']}, {entry['search_seconds']}s]", flush=True)
+            else:
+                print(f"Level {entry['level']:2d}: UNSOLVED within {args.max_ticks} ticks  [beam {entry['beam']}, {entry['search_seconds']}s]",
+                      flush=True)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(entry['solved'] for entry in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ import random
 import math
 from abc import ABC, abstractmethod
 from settings import *
+from quality import current_tier, scaled_count
 
 # NEW: Particle system for visual effects
 class Particle:
@@ -37,13 +38,42 @@ class Trap(ABC):
         self.rect = pygame.Rect(x, y, w, h)
         self.active = True
         self.particles = []  # NEW: Particle effects for each trap
+        # NEW: Random streams (module-level by default, seeded per level via Level.reseed)
+        self.rng = random  # Gameplay decisions only
+        self.fx_rng = random  # Cosmetic effects, so quality tiers can't shift gameplay draws
+        # NEW: Dirty tracking so Level.reset only restores traps that changed
+        self.dirty = False
+        self.dirty_sink = None  # The owning level's dirty list
+        self.initial_state = None  # Captured by the owning level
 
     @abstractmethod
     def update(self, dt, player): pass
     @abstractmethod
     def draw(self, screen, camera_x): pass
-    @abstractmethod
-    def reset(self): pass
+
+    def reset(self):
+        """Back to the state captured when the level was built (same path as Level.reset)"""
+        self.restore(self.initial_state)
+    
+    def get_state(self):
+        """NEW: Compact snapshot of simulation state (particles are cosmetic and skipped)"""
+        return (self.active,)
+    
+    def set_state(self, state):
+        self.active, = state
+    
+    def mark_dirty(self):
+        """NEW: Called when state first diverges from the initial snapshot"""
+        if not self.dirty:
+            self.dirty = True
+            if self.dirty_sink is not None:
+                self.dirty_sink.append(self)
+    
+    def restore(self, state):
+        """NEW: Return to a captured state and drop cosmetic leftovers"""
+        self.set_state(state)
+        self.particles.clear()
+        self.dirty = False
     
     def check_collision(self, player):
         return self.active and self.rect.colliderect(player.get_rect())
@@ -59,12 +89,14 @@ class Trap(ABC):
     
     def spawn_particles(self, x, y, count, color, speed_range=(50, 150)):
         """NEW: Spawn particles at location"""
+        tier = current_tier()
+        count = min(scaled_count(count), tier['particle_cap'] - len(self.particles))
         for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(*speed_range)
+            angle = self.fx_rng.uniform(0, 2 * math.pi)
+            speed = self.fx_rng.uniform(*speed_range)
             vx = math.cos(angle) * speed
             vy = math.sin(angle) * speed - 100  # Upward bias
-            life = random.uniform(PARTICLE_LIFETIME_MIN, PARTICLE_LIFETIME_MAX)
+            life = self.fx_rng.uniform(PARTICLE_LIFETIME_MIN, PARTICLE_LIFETIME_MAX)
             self.particles.append(Particle(x, y, vx, vy, color, life))
 
 class InvisibleSpike(Trap):
@@ -79,6 +111,7 @@ class InvisibleSpike(Trap):
         self.update_particles(dt)  # NEW: Update particle effects
         if not self.visible and abs(player.x - self.rect.x) < self.reveal_dist:
             self.visible = True
+            self.mark_dirty()
             self.just_revealed = True
             # NEW: Spawn particles when spike appears
             self.spawn_particles(
@@ -106,17 +139,18 @@ class InvisibleSpike(Trap):
                 pygame.draw.polygon(screen, DARK_RED, p, 2)
                 
                 # NEW: Pulsing glow effect when just revealed
-                if self.just_revealed:
+                if self.just_revealed and current_tier()['glow']:
                     glow_alpha = int(100 * abs(math.sin(pygame.time.get_ticks() / 100)))
                     glow_surf = pygame.Surface((self.rect.w + 10, self.rect.h + 10), pygame.SRCALPHA)
                     pygame.draw.polygon(glow_surf, (*RED, glow_alpha), 
                                       [(self.rect.w//2 + 5, 0), (0, self.rect.h + 10), (self.rect.w + 10, self.rect.h + 10)])
                     screen.blit(glow_surf, (x - 5, self.rect.y - 5))
     
-    def reset(self):
-        self.visible = False
-        self.just_revealed = False
-        self.particles = []
+    def get_state(self):
+        return (self.visible, self.just_revealed)
+    
+    def set_state(self, state):
+        self.visible, self.just_revealed = state
 
 class FakePlatform(Trap):
     def __init__(self, x, y, width, delay=0.3):
@@ -132,14 +166,15 @@ class FakePlatform(Trap):
         if self.active and self.rect.colliderect(player.get_rect()):
             if not self.touched:
                 self.touched = True
+                self.mark_dirty()
             self.timer += dt
             
             # NEW: Spawn crumbling particles at 50% decay
             if self.timer / self.delay > 0.5 and not self.crumble_particles_spawned:
                 self.crumble_particles_spawned = True
                 # Spawn particles along platform width
-                for i in range(PARTICLE_COUNT_PLATFORM_CRUMBLE):
-                    particle_x = self.rect.x + random.uniform(0, self.rect.w)
+                for i in range(scaled_count(PARTICLE_COUNT_PLATFORM_CRUMBLE)):
+                    particle_x = self.rect.x + self.fx_rng.uniform(0, self.rect.w)
                     self.spawn_particles(
                         particle_x,
                         self.rect.y,
@@ -182,12 +217,11 @@ class FakePlatform(Trap):
     def get_platform_rect(self):
         return self.rect if self.active else pygame.Rect(0, 0, 0, 0)
     
-    def reset(self):
-        self.active = True
-        self.touched = False
-        self.timer = 0
-        self.crumble_particles_spawned = False
-        self.particles = []
+    def get_state(self):
+        return (self.active, self.touched, self.timer, self.crumble_particles_spawned)
+    
+    def set_state(self, state):
+        self.active, self.touched, self.timer, self.crumble_particles_spawned = state
 
 class TrollSaw(Trap):
     def __init__(self, x, y, end_x, speed=150, asset_manager=None):
@@ -201,13 +235,15 @@ class TrollSaw(Trap):
         self.asset_manager = asset_manager
         self.trail_positions = []  # NEW: Trail effect
         self.trail_max_length = 5
+        self.anim_phase = (x % 97) * 0.01  # NEW: Offset on the shared animation clock so saws don't spin in lockstep
     
     def update(self, dt, player):
         self.update_particles(dt)  # NEW: Update particle effects
+        self.mark_dirty()  # Saws leave their start on the first tick, so every respawn restores them
         
         # NEW: More aggressive speed variation
-        if random.random() < 0.03:  # Increased from 0.02
-            self.speed_mult = random.uniform(0.6, 2.2)  # Wider range
+        if self.rng.random() < 0.03:  # Increased from 0.02
+            self.speed_mult = self.rng.uniform(0.6, 2.2)  # Wider range
         
         old_x = self.rect.x
         self.rect.x += int(self.speed * self.direction * self.speed_mult * dt)
@@ -226,9 +262,10 @@ class TrollSaw(Trap):
         
         self.rotation += 400 * dt * self.speed_mult  # Rotation speed matches movement
         
-        # NEW: Update trail
+        # NEW: Update trail (length follows the active quality tier)
+        self.trail_max_length = current_tier()['trail_length']
         self.trail_positions.append((self.rect.centerx, self.rect.centery))
-        if len(self.trail_positions) > self.trail_max_length:
+        while len(self.trail_positions) > self.trail_max_length:
             self.trail_positions.pop(0)
     
     def draw(self, screen, camera_x):
@@ -245,8 +282,11 @@ class TrollSaw(Trap):
         # Draw particles
         self.draw_particles(screen, camera_x)
         
-        # NEW: Use sprite if available
-        if self.asset_manager and 'saw' in self.asset_manager.images:
+        # NEW: Animated sheet from the shared atlas, then the static sprite
+        frame = self.asset_manager.atlas.frame('saw_on', self.anim_phase) if self.asset_manager else None
+        if frame is not None:
+            screen.blit(frame, frame.get_rect(center=(x, y)))
+        elif self.asset_manager and 'saw' in self.asset_manager.images:
             saw_img = self.asset_manager.images['saw']
             # Rotate the saw sprite
             rotated_saw = pygame.transform.rotate(saw_img, -self.rotation)
@@ -255,10 +295,11 @@ class TrollSaw(Trap):
         else:
             # Enhanced fallback rendering
             # Outer glow for danger
-            glow_surf = pygame.Surface((50, 50), pygame.SRCALPHA)
-            glow_alpha = int(80 + 50 * abs(math.sin(self.rotation / 50)))
-            pygame.draw.circle(glow_surf, (*RED, glow_alpha), (25, 25), 25)
-            screen.blit(glow_surf, (x - 25, y - 25))
+            if current_tier()['glow']:
+                glow_surf = pygame.Surface((50, 50), pygame.SRCALPHA)
+                glow_alpha = int(80 + 50 * abs(math.sin(self.rotation / 50)))
+                pygame.draw.circle(glow_surf, (*RED, glow_alpha), (25, 25), 25)
+                screen.blit(glow_surf, (x - 25, y - 25))
             
             # Main saw body
             pygame.draw.circle(screen, GRAY, (x, y), 19)
@@ -272,11 +313,15 @@ class TrollSaw(Trap):
                 pygame.draw.line(screen, RED, (ex, ey), (tooth_x, tooth_y), 4)
                 pygame.draw.circle(screen, DARK_RED, (int(tooth_x), int(tooth_y)), 2)
     
-    def reset(self):
-        self.rect.x = self.start_x
-        self.direction = 1
-        self.trail_positions = []
-        self.particles = []
+    def get_state(self):
+        return (self.rect.x, self.direction, self.rotation, self.speed_mult)
+    
+    def set_state(self, state):
+        self.rect.x, self.direction, self.rotation, self.speed_mult = state
+    
+    def restore(self, state):
+        super().restore(state)
+        self.trail_positions.clear()
 
 class FakeGoal(Trap):
     def __init__(self, x, y):
@@ -286,11 +331,12 @@ class FakeGoal(Trap):
     
     def update(self, dt, player):
         self.update_particles(dt)  # NEW: Update particle effects
+        # Pulse and shimmer are cosmetic like particles: not snapshotted, so the trap never turns dirty
         self.pulse += dt * 3
         self.shimmer += dt * 8  # Faster shimmer
         
         # NEW: Occasionally spawn tempting particles
-        if random.random() < 0.05:
+        if self.fx_rng.random() < 0.05:
             self.spawn_particles(
                 self.rect.centerx,
                 self.rect.y + 10,
@@ -314,19 +360,16 @@ class FakeGoal(Trap):
         pygame.draw.rect(screen, color, (x, self.rect.y, self.rect.w, self.rect.h))
         
         # NEW: Add suspicious glow (subtle tell)
-        glow_surf = pygame.Surface((self.rect.w + 10, self.rect.h + 10), pygame.SRCALPHA)
-        glow_alpha = int(40 + 30 * abs(math.sin(self.shimmer)))
-        pygame.draw.rect(glow_surf, (*YELLOW, glow_alpha), (0, 0, self.rect.w + 10, self.rect.h + 10))
-        screen.blit(glow_surf, (x - 5, self.rect.y - 5))
+        if current_tier()['glow']:
+            glow_surf = pygame.Surface((self.rect.w + 10, self.rect.h + 10), pygame.SRCALPHA)
+            glow_alpha = int(40 + 30 * abs(math.sin(self.shimmer)))
+            pygame.draw.rect(glow_surf, (*YELLOW, glow_alpha), (0, 0, self.rect.w + 10, self.rect.h + 10))
+            screen.blit(glow_surf, (x - 5, self.rect.y - 5))
         
         # Flag with subtle difference
         pygame.draw.line(screen, BLACK, (x + 10, self.rect.y + 25), (x + 18 + shimmer_offset, self.rect.y + 35), 3)
         pygame.draw.line(screen, BLACK, (x + 18 + shimmer_offset, self.rect.y + 35), (x + 32, self.rect.y + 15), 3)
     
-    def reset(self):
-        self.pulse = 0
-        self.shimmer = 0
-        self.particles = []
 
 class NarrowGap(Trap):
     def __init__(self, x, y, gap_h=NARROW_GAP_MIN_HEIGHT):
@@ -337,10 +380,10 @@ class NarrowGap(Trap):
     
     def update(self, dt, player):
         self.update_particles(dt)  # NEW: Update particle effects
-        self.pulse += dt * 4
+        self.pulse += dt * 4  # Cosmetic, not snapshotted (see FakeGoal)
         
         # NEW: Spawn danger particles near gap
-        if random.random() < 0.02:
+        if self.fx_rng.random() < 0.02:
             # Spawn at top edge
             self.spawn_particles(
                 self.rect.centerx,
@@ -391,7 +434,3 @@ class NarrowGap(Trap):
         pygame.draw.rect(danger_surf, (*RED, edge_alpha), (0, 0, self.rect.w, 5))
         screen.blit(danger_surf, (x, self.gap_y - 2))
         screen.blit(danger_surf, (x, self.gap_y + self.gap_h - 3))
-    
-    def reset(self):
-        self.pulse = 0
-        self.particles = []
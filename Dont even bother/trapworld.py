@@ -0,0 +1,308 @@
+import math
+import pygame
+from settings import *
+from quality import current_tier, scaled_count
+from traps import InvisibleSpike, FakePlatform, TrollSaw, FakeGoal, NarrowGap
+
+try:
+    import numpy as np
+except ImportError:  # Levels keep the per-object trap backend without NumPy
+    np = None
+
+KINDS = (InvisibleSpike, FakePlatform, TrollSaw, FakeGoal, NarrowGap)
+TRAIL_CAPACITY = max(1, max(tier['trail_length'] for tier in QUALITY_TIERS))
+DRAW_MARGIN = 64  # Pixels beyond the view still drawn (saw glow, trails)
+
+
+class ParticlePool:
+    """Every trap particle of a level in flat arrays, updated in one pass"""
+    def __init__(self, capacity=TRAP_PARTICLE_POOL):
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.count = 0
+
+    def spawn(self, rng, xs, ys, per_origin, color, speed_range):
+        """Burst `per_origin` particles from each (x, y); same motion as Trap.spawn_particles"""
+        n = min(len(xs) * per_origin, len(self.life) - self.count)
+        if n <= 0:
+            return
+        origins = np.repeat(np.column_stack((xs, ys)), per_origin, axis=0)[:n]
+        angle = rng.uniform(0, 2 * math.pi, n)
+        speed = rng.uniform(speed_range[0], speed_range[1], n)
+        life = rng.uniform(PARTICLE_LIFETIME_MIN, PARTICLE_LIFETIME_MAX, n)
+        end = self.count + n
+        self.pos[self.count:end] = origins
+        self.vel[self.count:end, 0] = np.cos(angle) * speed
+        self.vel[self.count:end, 1] = np.sin(angle) * speed - 100  # Upward bias
+        self.life[self.count:end] = life
+        self.max_life[self.count:end] = life
+        self.color[self.count:end] = color
+        self.count = end
+
+    def update(self, dt):
+        n = self.count
+        if not n:
+            return
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n, 1] += PARTICLE_GRAVITY * dt
+        self.life[:n] -= dt
+        alive = np.nonzero(self.life[:n] > 0)[0]
+        if len(alive) < n:
+            self.count = len(alive)
+            for array in (self.pos, self.vel, self.life, self.max_life, self.color):
+                array[:self.count] = array[alive]
+
+    def draw(self, screen, camera_x):
+        n = self.count
+        if not n:
+            return
+        xs = self.pos[:n, 0] - camera_x
+        on_screen = np.nonzero((xs > -DRAW_MARGIN) & (xs < GAME_WIDTH + DRAW_MARGIN))[0]
+        sizes = np.maximum(1, (3 * self.life[on_screen] / self.max_life[on_screen]).astype(np.int64))
+        for x, y, color, size in zip(xs[on_screen].astype(np.int64).tolist(),
+                                     self.pos[on_screen, 1].astype(np.int64).tolist(),
+                                     self.color[on_screen].tolist(), sizes.tolist()):
+            pygame.draw.circle(screen, color, (x, y), size)
+
+    def clear(self):
+        self.count = 0
+
+
+class TrapWorld:
+    """Array-backed backend for a level's traps.
+
+    Each trap kind keeps its state in typed arrays and one system per kind
+    updates every instance in a single vectorised pass. The original trap
+    objects stay in Level.traps as read-only views: they keep the level's
+    trap order (killer_index, death causes) and are synced from the arrays
+    only when on screen, so their draw() code renders as before.
+
+    Gameplay matches the object backend tick for tick, saw speed changes
+    included (they draw from each saw's own rng). Cosmetic particles come
+    from a shared pool and the world's own fx stream instead.
+    """
+    def __init__(self, traps):
+        self.traps = traps
+        self.index = {kind: np.array([i for i, trap in enumerate(traps) if type(trap) is kind], dtype=np.int64)
+                      for kind in KINDS}
+        self.particles = ParticlePool()
+        self.fx_rng = np.random.default_rng()
+
+        spikes = self._members(InvisibleSpike)
+        self.spike_x = np.array([t.rect.x for t in spikes], dtype=np.int64)
+        self.spike_y = np.array([t.rect.y for t in spikes], dtype=np.int64)
+        self.spike_reveal = np.array([t.reveal_dist for t in spikes], dtype=np.float64)
+        self.spike_visible = np.array([t.visible for t in spikes], dtype=bool)
+        self.spike_revealed = np.array([t.just_revealed for t in spikes], dtype=bool)
+
+        platforms = self.platform_views = self._members(FakePlatform)
+        self.plat_x = np.array([t.rect.x for t in platforms], dtype=np.int64)
+        self.plat_y = np.array([t.rect.y for t in platforms], dtype=np.int64)
+        self.plat_w = np.array([t.rect.w for t in platforms], dtype=np.int64)
+        self.plat_delay = np.array([t.delay for t in platforms], dtype=np.float64)
+        self.plat_active = np.array([t.active for t in platforms], dtype=bool)
+        self.plat_touched = np.array([t.touched for t in platforms], dtype=bool)
+        self.plat_timer = np.array([t.timer for t in platforms], dtype=np.float64)
+        self.plat_crumbled = np.array([t.crumble_particles_spawned for t in platforms], dtype=bool)
+
+        saws = self._members(TrollSaw)
+        self.saw_x = np.array([t.rect.x for t in saws], dtype=np.int64)
+        self.saw_y = np.array([t.rect.y for t in saws], dtype=np.int64)
+        self.saw_start = np.array([t.start_x for t in saws], dtype=np.int64)
+        self.saw_end = np.array([t.end_x for t in saws], dtype=np.int64)
+        self.saw_speed = np.array([t.speed for t in saws], dtype=np.int64)
+        self.saw_direction = np.array([t.direction for t in saws], dtype=np.int64)
+        self.saw_rotation = np.array([t.rotation for t in saws], dtype=np.float64)
+        self.saw_mult = np.array([t.speed_mult for t in saws], dtype=np.float64)
+        self.saw_trail = np.zeros((len(saws), TRAIL_CAPACITY, 2), dtype=np.int64)
+        self.trail_head = 0  # Every saw appends each tick, so the ring cursor is shared
+        self.trail_count = 0
+        self.bind_rngs()
+
+        goals = self._members(FakeGoal)
+        self.goal_x = np.array([t.rect.x for t in goals], dtype=np.int64)
+        self.goal_y = np.array([t.rect.y for t in goals], dtype=np.int64)
+        self.goal_pulse = np.array([t.pulse for t in goals], dtype=np.float64)
+        self.goal_shimmer = np.array([t.shimmer for t in goals], dtype=np.float64)
+
+        gaps = self._members(NarrowGap)
+        self.gap_x = np.array([t.rect.x for t in gaps], dtype=np.int64)
+        self.gap_y = np.array([t.gap_y for t in gaps], dtype=np.int64)
+        self.gap_h = np.array([t.gap_h for t in gaps], dtype=np.int64)
+        self.gap_pulse = np.array([t.pulse for t in gaps], dtype=np.float64)
+
+        self.initial_state = self.get_state()
+
+    @staticmethod
+    def supports(traps):
+        """True when NumPy is present and every trap is one of the built-in kinds"""
+        return np is not None and all(type(trap) in KINDS for trap in traps)
+
+    def _members(self, kind):
+        return [self.traps[i] for i in self.index[kind]]
+
+    def _state_arrays(self):
+        return (self.spike_visible, self.spike_revealed,
+                self.plat_active, self.plat_touched, self.plat_timer, self.plat_crumbled,
+                self.saw_x, self.saw_direction, self.saw_rotation, self.saw_mult,
+                self.goal_pulse, self.goal_shimmer, self.gap_pulse)
+
+    def bind_rngs(self):
+        """Pick up the saws' gameplay streams (call after Level.reseed replaces them)"""
+        self.saw_rngs = [trap.rng for trap in self._members(TrollSaw)]
+
+    def reseed(self, seed):
+        self.fx_rng = np.random.default_rng(seed)
+        self.bind_rngs()
+
+    def get_state(self):
+        """Every mutable component packed into one bytes value (cheap to compare in the rewind buffer)"""
+        return b''.join(array.tobytes() for array in self._state_arrays())
+
+    def set_state(self, state):
+        offset = 0
+        for array in self._state_arrays():
+            array[...] = np.frombuffer(state, dtype=array.dtype, count=array.size, offset=offset)
+            offset += array.nbytes
+        self._sync_platform_views()
+
+    def reset(self):
+        self.set_state(self.initial_state)
+        self.particles.clear()
+        self.trail_count = 0
+
+    def _sync_platform_views(self):
+        """Fake platform views keep `active` current; the level's broadphase reads it"""
+        for platform, active in zip(self.platform_views, self.plat_active.tolist()):
+            platform.active = active
+
+    def update(self, dt, player):
+        self.particles.update(dt)
+        self._update_spikes(player)
+        self._update_platforms(dt, player.get_rect())
+        self._update_saws(dt)
+        self._update_goals(dt)
+        self._update_gaps(dt)
+
+    def _spawn(self, xs, ys, count, color, speed_range):
+        self.particles.spawn(self.fx_rng, xs, ys, scaled_count(count), color, speed_range)
+
+    def _update_spikes(self, player):
+        reveal = ~self.spike_visible & (np.abs(player.x - self.spike_x) < self.spike_reveal)
+        if reveal.any():
+            self.spike_visible |= reveal
+            self.spike_revealed |= reveal
+            self._spawn(self.spike_x[reveal] + 8, self.spike_y[reveal] + 8, PARTICLE_COUNT_TRAP, RED, (80, 200))
+
+    def _update_platforms(self, dt, player_rect):
+        touching = self.plat_active & _overlaps(self.plat_x, self.plat_y, self.plat_w, 20, player_rect)
+        if not touching.any():
+            return
+        self.plat_touched |= touching
+        self.plat_timer[touching] += dt
+        crumble = touching & ~self.plat_crumbled & (self.plat_timer / self.plat_delay > 0.5)
+        if crumble.any():
+            self.plat_crumbled |= crumble
+            for i in np.nonzero(crumble)[0]:
+                count = scaled_count(PARTICLE_COUNT_PLATFORM_CRUMBLE)
+                xs = self.plat_x[i] + self.fx_rng.uniform(0, self.plat_w[i], count)
+                self.particles.spawn(self.fx_rng, xs, np.full(count, self.plat_y[i]), 1, LIGHT_GRAY, (30, 100))
+        fallen = touching & (self.plat_timer >= self.plat_delay)
+        if fallen.any():
+            self.plat_active &= ~fallen
+            for i in np.nonzero(fallen)[0]:
+                self.platform_views[i].active = False
+
+    def _update_saws(self, dt):
+        if not len(self.saw_x):
+            return
+        # Per-saw streams, drawn in the same order as TrollSaw.update
+        mult = self.saw_mult
+        for i, rng in enumerate(self.saw_rngs):
+            if rng.random() < 0.03:
+                mult[i] = rng.uniform(0.6, 2.2)
+
+        self.saw_x += (self.saw_speed * self.saw_direction * mult * dt).astype(np.int64)
+        reverse = (self.saw_x >= self.saw_end) | (self.saw_x <= self.saw_start)
+        if reverse.any():
+            self.saw_direction[reverse] *= -1
+            self._spawn(self.saw_x[reverse] + 19, self.saw_y[reverse] + 19, 8, ORANGE, (50, 120))
+        self.saw_rotation += 400 * dt * mult
+
+        self.saw_trail[:, self.trail_head, 0] = self.saw_x + 19
+        self.saw_trail[:, self.trail_head, 1] = self.saw_y + 19
+        self.trail_head = (self.trail_head + 1) % TRAIL_CAPACITY
+        self.trail_count = min(self.trail_count + 1, TRAIL_CAPACITY)
+
+    def _update_goals(self, dt):
+        self.goal_pulse += dt * 3
+        self.goal_shimmer += dt * 8
+        tempt = self.fx_rng.random(len(self.goal_x)) < 0.05
+        if tempt.any():
+            self._spawn(self.goal_x[tempt] + 20, self.goal_y[tempt] + 10, 2, YELLOW, (20, 60))
+
+    def _update_gaps(self, dt):
+        self.gap_pulse += dt * 4
+        sparks = self.fx_rng.random(len(self.gap_x)) < 0.02
+        if sparks.any():
+            xs = self.gap_x[sparks] + 10
+            self._spawn(xs, self.gap_y[sparks] - 5, 1, RED, (10, 30))
+            self._spawn(xs, self.gap_y[sparks] + self.gap_h[sparks] + 5, 1, RED, (10, 30))
+
+    def collide(self, player):
+        """Index (in Level.traps order) of the first trap touching the player, or None"""
+        pr = player.get_rect()
+        hits = [
+            self.index[InvisibleSpike][_overlaps(self.spike_x, self.spike_y, 16, 16, pr)],
+            self.index[FakePlatform][self.plat_active & _overlaps(self.plat_x, self.plat_y, self.plat_w, 20, pr)],
+            self.index[TrollSaw][_overlaps(self.saw_x, self.saw_y, 38, 38, pr)],
+            self.index[FakeGoal][_overlaps(self.goal_x, self.goal_y, 40, 50, pr)],
+            self.index[NarrowGap][_overlaps(self.gap_x, 0, 20, self.gap_y, pr)
+                                  | _overlaps(self.gap_x, self.gap_y + self.gap_h, 20, GAME_HEIGHT, pr)],
+        ]
+        return min((int(hit[0]) for hit in hits if len(hit)), default=None)
+
+    def draw(self, screen, camera_x):
+        """Sync on-screen trap views from the arrays and let them draw themselves"""
+        self.particles.draw(screen, camera_x)
+        left, right = camera_x - DRAW_MARGIN, camera_x + GAME_WIDTH + DRAW_MARGIN
+
+        for i in _visible(self.spike_x, 16, left, right):
+            spike = self.traps[self.index[InvisibleSpike][i]]
+            spike.visible, spike.just_revealed = bool(self.spike_visible[i]), bool(self.spike_revealed[i])
+            spike.draw(screen, camera_x)
+        for i in _visible(self.plat_x, self.plat_w, left, right):
+            platform = self.platform_views[i]
+            platform.touched = bool(self.plat_touched[i])
+            platform.timer = float(self.plat_timer[i])
+            platform.draw(screen, camera_x)
+
+        trail_length = min(current_tier()['trail_length'], self.trail_count)
+        trail_slots = [(self.trail_head - trail_length + k) % TRAIL_CAPACITY for k in range(trail_length)]
+        for i in _visible(self.saw_x, 38, left, right):
+            saw = self.traps[self.index[TrollSaw][i]]
+            saw.rect.x = int(self.saw_x[i])
+            saw.rotation = float(self.saw_rotation[i])
+            saw.trail_positions = [tuple(point) for point in self.saw_trail[i, trail_slots].tolist()]
+            saw.draw(screen, camera_x)
+
+        for i in _visible(self.goal_x, 40, left, right):
+            goal = self.traps[self.index[FakeGoal][i]]
+            goal.pulse, goal.shimmer = float(self.goal_pulse[i]), float(self.goal_shimmer[i])
+            goal.draw(screen, camera_x)
+        for i in _visible(self.gap_x, 20, left, right):
+            gap = self.traps[self.index[NarrowGap][i]]
+            gap.pulse = float(self.gap_pulse[i])
+            gap.draw(screen, camera_x)
+
+
+def _overlaps(xs, ys, ws, hs, rect):
+    """Vectorised pygame.Rect.colliderect against one rect"""
+    return (xs < rect.right) & (xs + ws > rect.x) & (ys < rect.bottom) & (ys + hs > rect.y)
+
+
+def _visible(xs, ws, left, right):
+    return np.nonzero((xs + ws > left) & (xs < right))[0].tolist()
@@ -1,10 +1,73 @@
 import pygame
+import collections
 import math
 import random
 from settings import *
+from quality import current_tier, scaled_count
+from retained import RetainedView
+from effects import EffectSprites, EffectLayer
+from assets import ThumbnailCache
+
+
+class NineSlice:
+    """A bordered image resized by stretching only its edges and centre, so corners keep their shape"""
+    def __init__(self, image, border=BUTTON_SLICE_BORDER):
+        self.image = image
+        w, h = image.get_size()
+        self.border = max(0, min(border, (w - 1) // 2, (h - 1) // 2))
+
+    def render(self, size):
+        w, h = size
+        image_w, image_h = self.image.get_size()
+        b = min(self.border, w // 2, h // 2)
+        # (source offset, source length, target offset, target length) for the three bands each way
+        columns = ((0, b, 0, b), (b, image_w - 2 * b, b, w - 2 * b), (image_w - b, b, w - b, b))
+        rows = ((0, b, 0, b), (b, image_h - 2 * b, b, h - 2 * b), (image_h - b, b, h - b, b))
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        for src_x, src_w, dst_x, dst_w in columns:
+            for src_y, src_h, dst_y, dst_h in rows:
+                if min(src_w, src_h, dst_w, dst_h) <= 0:
+                    continue
+                piece = self.image.subsurface((src_x, src_y, src_w, src_h))
+                if (dst_w, dst_h) != (src_w, src_h):
+                    piece = pygame.transform.scale(piece, (dst_w, dst_h))
+                surf.blit(piece, (dst_x, dst_y))
+        return surf
+
+
+class ButtonSkin:
+    """NEW: Pre-rendered button faces and glows shared by every button.
+
+    Button sizes are quantized (BUTTON_SCALE_STEPS between rest and hover
+    scale) and glow alpha to BUTTON_GLOW_STEPS levels, so each face or glow
+    is built once by nine-slicing and afterwards is a dict lookup.
+    """
+    def __init__(self, asset_manager=None):
+        images = asset_manager.ui_images if asset_manager else {}
+        self.slices = {kind: NineSlice(images[kind]) for kind in ('button_normal', 'button_hover') if kind in images}
+        self.faces = {}
+        self.glows = {}
+
+    def has(self, kind):
+        return kind in self.slices
+
+    def face(self, kind, size):
+        key = (kind, size)
+        if key not in self.faces:
+            self.faces[key] = self.slices[kind].render(size)
+        return self.faces[key]
+
+    def glow(self, size, alpha):
+        key = (size, alpha)
+        if key not in self.glows:
+            glow_surf = pygame.Surface((size[0] + 10, size[1] + 10), pygame.SRCALPHA)
+            pygame.draw.rect(glow_surf, (*CYAN, alpha), (0, 0, size[0] + 10, size[1] + 10), border_radius=10)
+            self.glows[key] = glow_surf
+        return self.glows[key]
+
 
 class Button:
-    def __init__(self, x, y, w, h, text, color=BLUE, hover_color=CYAN, asset_manager=None):
+    def __init__(self, x, y, w, h, text, color=BLUE, hover_color=CYAN, asset_manager=None, skin=None):
         self.base_rect = pygame.Rect(x - w // 2, y - h // 2, w, h)
         self.rect = self.base_rect.copy()
         self.text = text
@@ -12,22 +75,30 @@ class Button:
         self.hover_color = hover_color
         self.is_hovered = False
         self.asset_manager = asset_manager
+        self.icon = None  # NEW: Optional image drawn above the text
+        self.value = None  # NEW: What the button stands for (level number, page step)
+        self.skin = skin or ButtonSkin(asset_manager)  # NEW: Cached faces and glows (share one between buttons)
+        self.text_cache = (None, None, None)  # NEW: (text, font, rendered surface)
         # NEW: Animation properties
         self.hover_scale = 1.0
         self.target_scale = 1.0
         self.pulse_timer = random.uniform(0, math.pi * 2)  # Random start for variety
 
-    def update(self, mouse_pos):
-        was_hovered = self.is_hovered
-        self.is_hovered = self.base_rect.collidepoint(mouse_pos)
-        
+    def set_hovered(self, hovered):
+        """NEW: Hover comes from UIManager's hit test, once per mouse event"""
+        self.is_hovered = hovered
+        self.target_scale = BUTTON_HOVER_SCALE if hovered else 1.0
+
+    def animate(self, dt):
+        """NEW: Advance hover scaling and the pulse once per frame by the real dt"""
         # NEW: Smooth scaling animation
-        self.target_scale = BUTTON_HOVER_SCALE if self.is_hovered else 1.0
-        self.hover_scale += (self.target_scale - self.hover_scale) * 0.15
+        self.hover_scale += (self.target_scale - self.hover_scale) * (1 - (1 - BUTTON_HOVER_SMOOTHING) ** (FPS * dt))
         
-        # Update rect with scale
-        w = int(self.base_rect.width * self.hover_scale)
-        h = int(self.base_rect.height * self.hover_scale)
+        # Update rect with scale, quantized so faces come from the skin cache
+        step = round((self.hover_scale - 1.0) / (BUTTON_HOVER_SCALE - 1.0) * BUTTON_SCALE_STEPS)
+        scale = 1.0 + step * (BUTTON_HOVER_SCALE - 1.0) / BUTTON_SCALE_STEPS
+        w = int(self.base_rect.width * scale)
+        h = int(self.base_rect.height * scale)
         self.rect = pygame.Rect(
             self.base_rect.centerx - w // 2,
             self.base_rect.centery - h // 2,
@@ -35,7 +106,23 @@ class Button:
         )
         
         # NEW: Update pulse timer
-        self.pulse_timer += 0.05
+        self.pulse_timer += BUTTON_PULSE_SPEED * dt
+
+    def _glow_alpha(self):
+        if self.is_hovered and current_tier()['glow']:
+            return 80 * round(abs(math.sin(self.pulse_timer)) * BUTTON_GLOW_STEPS) // BUTTON_GLOW_STEPS
+        return 0
+
+    def _uses_sprite(self):
+        return self.skin.has('button_hover' if self.is_hovered else 'button_normal')
+
+    def visual_state(self):
+        """NEW: Everything that changes how the button looks (retained UI redraws it when this changes)"""
+        return self.text, self.icon, self.is_hovered, tuple(self.rect), 0 if self._uses_sprite() else self._glow_alpha()
+
+    def bounds(self):
+        """NEW: Screen area the button can touch, shadow and glow included"""
+        return self.rect.inflate(10, 10).union(self.rect.move(BUTTON_SHADOW_OFFSET, BUTTON_SHADOW_OFFSET))
 
     def draw(self, screen, font):
         # NEW: Enhanced rendering with asset manager sprites or procedural
@@ -48,30 +135,53 @@ class Button:
         pygame.draw.rect(screen, (20, 20, 20), shadow_rect, border_radius=8)
         
         # Draw button using sprites if available
-        if self.asset_manager and ('button_hover' if self.is_hovered else 'button_normal') in self.asset_manager.ui_images:
-            btn_img = self.asset_manager.ui_images['button_hover' if self.is_hovered else 'button_normal']
-            scaled_img = pygame.transform.scale(btn_img, (self.rect.width, self.rect.height))
-            screen.blit(scaled_img, self.rect)
+        if self._uses_sprite():
+            screen.blit(self.skin.face('button_hover' if self.is_hovered else 'button_normal', self.rect.size), self.rect)
         else:
             # Procedural button with gradient
             pygame.draw.rect(screen, color, self.rect, border_radius=8)
             # Subtle pulse glow when hovered
-            if self.is_hovered:
-                pulse = abs(math.sin(self.pulse_timer))
-                glow_surf = pygame.Surface((self.rect.w + 10, self.rect.h + 10), pygame.SRCALPHA)
-                glow_alpha = int(80 * pulse)
-                pygame.draw.rect(glow_surf, (*CYAN, glow_alpha), (0, 0, self.rect.w + 10, self.rect.h + 10), border_radius=10)
-                screen.blit(glow_surf, (self.rect.x - 5, self.rect.y - 5))
+            glow_alpha = self._glow_alpha()
+            if glow_alpha:
+                screen.blit(self.skin.glow(self.rect.size, glow_alpha), (self.rect.x - 5, self.rect.y - 5))
             pygame.draw.rect(screen, WHITE, self.rect, 3, border_radius=8)
         
-        # Draw text
-        text_surf = font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.center)
+        # Draw text (below the icon when there is one)
+        if self.text_cache[:2] != (self.text, font):
+            self.text_cache = (self.text, font, font.render(self.text, True, WHITE))
+        text_surf = self.text_cache[2]
+        if self.icon is not None and not self.text:
+            screen.blit(self.icon, self.icon.get_rect(center=self.rect.center))
+            return
+        if self.icon is not None:
+            screen.blit(self.icon, self.icon.get_rect(centerx=self.rect.centerx, centery=self.rect.centery - self.rect.h // 8))
+            text_rect = text_surf.get_rect(centerx=self.rect.centerx, centery=self.rect.bottom - self.rect.h // 5)
+        else:
+            text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
 
     def is_clicked(self, event):
         return event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.is_hovered
 
+class ButtonIndex:
+    """Uniform grid over button rects, so a hit test checks one cell instead of every button"""
+    def __init__(self, buttons, cell=UI_HIT_CELL):
+        self.cell = cell
+        self.cells = collections.defaultdict(list)
+        for btn in buttons:
+            rect = btn.base_rect
+            for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+                for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                    self.cells[(cx, cy)].append(btn)
+
+    def hit(self, pos):
+        """Button under a screen point, or None"""
+        for btn in self.cells.get((pos[0] // self.cell, pos[1] // self.cell), ()):
+            if btn.base_rect.collidepoint(pos):
+                return btn
+        return None
+
+
 class UIManager:
     def __init__(self, save_manager, level_count, asset_manager=None):
         self.save_manager = save_manager
@@ -85,91 +195,163 @@ class UIManager:
         self.menu_timer = 0
         self.death_timer = 0
         self.victory_timer = 0
-        # NEW: Menu particles
-        self.menu_particles = []
+        # NEW: Screen-space particles, drawn from pre-rendered sprites
+        self.effect_sprites = EffectSprites(asset_manager)
+        self.menu_particles = EffectLayer(wrap=(SCREEN_WIDTH, SCREEN_HEIGHT))
         self._init_menu_particles()
         # NEW: Death/Victory particles
-        self.death_particles = []
-        self.victory_particles = []
+        self.death_particles = EffectLayer()
+        self.victory_particles = EffectLayer()
         self._create_buttons()
+        # NEW: Hit-test grids per screen; the hovered button is found once per mouse event
+        self.button_indexes = {'menu': ButtonIndex(self.menu_buttons)}
+        self.hovered = None
+        self.ui_state = None
+        # NEW: Level select shows one page; its cells are reused for every page
+        self.thumbnails = ThumbnailCache()
+        self.page_count = max(1, -(-level_count // len(self.level_cells)))
+        self.level_page = None
+        self.show_level_page(0)
+        # NEW: Retained menu/level-select screens, presented with dirty rects
+        self.menu_view = RetainedView(self._menu_background)
+        self.level_select_view = RetainedView(self._level_select_background)
+        self.active_view = None
+        self.active_screen = None
+        self.title_surfs = None
     
     def _init_menu_particles(self):
         """NEW: Initialize floating menu particles"""
         for _ in range(MENU_PARTICLE_COUNT):
-            self.menu_particles.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT),
-                'vx': random.uniform(-20, 20),
-                'vy': random.uniform(-30, 30),
-                'size': random.randint(2, 4),
-                'alpha': random.randint(50, 150)
-            })
+            self.menu_particles.spawn(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT),
+                                      random.uniform(-20, 20), random.uniform(-30, 30),
+                                      self.effect_sprites.dot(WHITE, random.randint(2, 4), random.randint(50, 150)))
+
+    def _screen_buttons(self, state):
+        return {'menu': self.menu_buttons, 'level_select': self.level_buttons}.get(state, ())
+
+    def hover(self, state, pos):
+        """NEW: Hit-test the mouse against the screen's buttons and move the hover state"""
+        index = self.button_indexes.get(state)
+        hovered = index.hit(pos) if index else None
+        if hovered is not self.hovered:
+            if self.hovered:
+                self.hovered.set_hovered(False)
+            if hovered:
+                hovered.set_hovered(True)
+            self.hovered = hovered
+
+    def clicked_button(self, state, event):
+        """NEW: Button a left click landed on, or None"""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.hover(state, event.pos)
+            return self.hovered
+        return None
+
+    def update(self, dt, state, screen_height=SCREEN_HEIGHT):
+        """NEW: Advance UI timers and particles by the real frame time (tuned as per-frame steps at FPS)"""
+        if state != self.ui_state:
+            self.ui_state = state
+            self.hover(state, pygame.mouse.get_pos())  # The mouse may already rest on a button
+        for btn in self._screen_buttons(state):
+            btn.animate(dt)
+        if state == 'menu':
+            self.menu_timer += 0.05 * FPS * dt
+            self.menu_particles.update(dt)
+        elif state == 'death':
+            self.death_timer += 0.1 * FPS * dt
+            self.death_particles.update(dt, screen_height)
+        elif state == 'victory':
+            self.victory_timer += 0.08 * FPS * dt
+            self.victory_particles.update(dt, screen_height)
+        elif state == 'level_select':
+            # NEW: Visible thumbnails first, then one prefetched neighbour per frame
+            for btn in self.level_buttons:
+                if btn.icon is None and btn.value and btn in self.level_cells:
+                    btn.icon = self.thumbnails.get(btn.value)
+            self.thumbnails.load_next()
 
     def _create_buttons(self):
         center_x = SCREEN_WIDTH // 2
+        skin = ButtonSkin(self.asset_manager)  # NEW: One face/glow cache for every button
         
         # NEW: Pass asset_manager to buttons
         self.menu_buttons = [
-            Button(center_x, SCREEN_HEIGHT // 2 - 100, 250, 70, "PLAY", asset_manager=self.asset_manager),
-            Button(center_x, SCREEN_HEIGHT // 2, 250, 70, "SETTINGS", asset_manager=self.asset_manager),
-            Button(center_x, SCREEN_HEIGHT // 2 + 100, 250, 70, "EXIT", asset_manager=self.asset_manager),
+            Button(center_x, SCREEN_HEIGHT // 2 - 100, 250, 70, "PLAY", asset_manager=self.asset_manager, skin=skin),
+            Button(center_x, SCREEN_HEIGHT // 2, 250, 70, "SETTINGS", asset_manager=self.asset_manager, skin=skin),
+            Button(center_x, SCREEN_HEIGHT // 2 + 100, 250, 70, "EXIT", asset_manager=self.asset_manager, skin=skin),
         ]
 
-        self.level_buttons = []
-        rows, cols = 2, 5
+        # NEW: One page of level cells plus previous/next page buttons (see show_level_page)
+        rows, cols = LEVEL_GRID_ROWS, LEVEL_GRID_COLS
         btn_w, btn_h = 160, 110
         spacing_x, spacing_y = 190, 150
         grid_w = (cols - 1) * spacing_x
         start_x = center_x - grid_w // 2
         start_y = SCREEN_HEIGHT // 2 - 100
 
-        for i in range(self.level_count):
+        self.level_cells = []
+        for i in range(rows * cols):
             row = i // cols
             col = i % cols
             x = start_x + col * spacing_x
             y = start_y + row * spacing_y
-            self.level_buttons.append(Button(x, y, btn_w, btn_h, f"Level {i + 1}", asset_manager=self.asset_manager))
+            self.level_cells.append(Button(x, y, btn_w, btn_h, "", asset_manager=self.asset_manager, skin=skin))
 
-    def draw_menu(self, screen):
+        middle_y = start_y + (rows - 1) * spacing_y // 2
+        self.page_buttons = [Button(start_x - spacing_x, middle_y, 70, 70, "<", asset_manager=self.asset_manager, skin=skin),
+                             Button(start_x + grid_w + spacing_x, middle_y, 70, 70, ">", asset_manager=self.asset_manager, skin=skin)]
+        for btn, step, icon in zip(self.page_buttons, (-1, 1), ('menu_previous', 'menu_next')):
+            btn.value = step
+            # NEW: Arrow art from assets/Menu/Buttons replaces the text when present
+            if self.asset_manager and icon in self.asset_manager.ui_images:
+                btn.icon, btn.text = self.asset_manager.ui_images[icon], ""
+        self.page_label_y = start_y + (rows - 1) * spacing_y + btn_h // 2 + 40
+
+    def show_level_page(self, page):
+        """NEW: Point the cells at a page's levels; thumbnails load lazily, neighbours are prefetched"""
+        page = max(0, min(self.page_count - 1, page))
+        if page == self.level_page:
+            return
+        self.level_page = page
+        first = page * len(self.level_cells) + 1
+        self.level_buttons = []
+        for i, btn in enumerate(self.level_cells):
+            if first + i > self.level_count:
+                break
+            btn.value = first + i
+            btn.text = f"Level {first + i}"
+            btn.icon = None
+            self.level_buttons.append(btn)
+        if page > 0:
+            self.level_buttons.append(self.page_buttons[0])
+        if page < self.page_count - 1:
+            self.level_buttons.append(self.page_buttons[1])
+        self.button_indexes['level_select'] = ButtonIndex(self.level_buttons)
+        if self.hovered:
+            self.hovered.set_hovered(False)
+            self.hovered = None
+        self.ui_state = None  # Re-test hover against the new page next frame
+        size = len(self.level_cells)
+        neighbours = [n for p in (page + 1, page - 1) if 0 <= p < self.page_count
+                      for n in range(p * size + 1, min(self.level_count, (p + 1) * size) + 1)]
+        self.thumbnails.prefetch(neighbours)
+
+    def invalidate(self):
+        """NEW: The window contents were lost (expose/resize); repaint the next menu frame fully"""
+        self.active_view = None
+
+    def _present(self, view, screen, widgets, background_key=()):
+        """NEW: Render a retained view; returns dirty rects, or None if the whole screen needs a flip"""
+        if view is not self.active_view or screen is not self.active_screen:
+            view.invalidate()
+            self.active_view, self.active_screen = view, screen
+        return view.render(screen, widgets, background_key)
+
+    def _menu_background(self, size):
+        """NEW: Static menu content, rebuilt only when the death total or screen size changes"""
+        screen = pygame.Surface(size)
         screen.fill(DARK_PURPLE)
-        
-        # NEW: Update and draw floating particles
-        for particle in self.menu_particles:
-            particle['x'] += particle['vx'] * 0.016
-            particle['y'] += particle['vy'] * 0.016
-            # Wrap around screen
-            if particle['x'] < 0: particle['x'] = SCREEN_WIDTH
-            if particle['x'] > SCREEN_WIDTH: particle['x'] = 0
-            if particle['y'] < 0: particle['y'] = SCREEN_HEIGHT
-            if particle['y'] > SCREEN_HEIGHT: particle['y'] = 0
-            # Draw particle
-            color = (*WHITE, particle['alpha'])
-            surf = pygame.Surface((particle['size']*2, particle['size']*2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, color, (particle['size'], particle['size']), particle['size'])
-            screen.blit(surf, (int(particle['x']), int(particle['y'])))
-        
-        # NEW: Animated title with pulse effect
-        self.menu_timer += 0.05
-        pulse = abs(math.sin(self.menu_timer * TITLE_PULSE_SPEED))
-        title_scale = 1.0 + 0.05 * pulse
-        
-        # Draw title with shadow
-        title_text = "DON'T EVEN BOTHER"
-        title_surf = self.font_huge.render(title_text, True, RED)
-        title_w, title_h = title_surf.get_size()
-        scaled_w, scaled_h = int(title_w * title_scale), int(title_h * title_scale)
-        title_scaled = pygame.transform.scale(title_surf, (scaled_w, scaled_h))
-        
-        # Shadow
-        title_shadow = self.font_huge.render(title_text, True, DARK_RED)
-        title_shadow_scaled = pygame.transform.scale(title_shadow, (scaled_w, scaled_h))
-        shadow_rect = title_shadow_scaled.get_rect(centerx=screen.get_width() // 2 + 5, y=155)
-        screen.blit(title_shadow_scaled, shadow_rect)
-        
-        # Main title
-        title_rect = title_scaled.get_rect(centerx=screen.get_width() // 2, y=150)
-        screen.blit(title_scaled, title_rect)
-        
+
         # Subtitle
         subtitle = self.font_small.render("Pure Evil Edition - NO WARNINGS!", True, ORANGE)
         screen.blit(subtitle, subtitle.get_rect(centerx=screen.get_width() // 2, y=260))
@@ -186,30 +368,82 @@ class UIManager:
         
         hint = self.font_small.render("ESC = Menu | F11 = Fullscreen", True, GRAY)
         screen.blit(hint, hint.get_rect(centerx=screen.get_width() // 2, bottom=screen.get_height() - 60))
+        return screen
+
+    def draw_menu(self, screen):
+        widgets = []
+
+        # NEW: Floating particles (count follows the quality tier), each its own dirty region
+        for i, particle in enumerate(self.menu_particles.particles[:scaled_count(MENU_PARTICLE_COUNT)]):
+            surf, pos = self.menu_particles.sprite(particle)
+            widgets.append((('particle', i), pos, surf.get_rect(topleft=pos),
+                            lambda screen, surf=surf, pos=pos: screen.blit(surf, pos)))
+        
+        # NEW: Animated title with pulse effect
+        pulse = abs(math.sin(self.menu_timer * TITLE_PULSE_SPEED))
+        title_scale = 1.0 + 0.05 * pulse
+        
+        # Title and shadow are rendered once; only the pulse scale changes
+        if self.title_surfs is None:
+            title_text = "DON'T EVEN BOTHER"
+            self.title_surfs = (self.font_huge.render(title_text, True, RED), self.font_huge.render(title_text, True, DARK_RED))
+        title_w, title_h = self.title_surfs[0].get_size()
+        scaled_size = (int(title_w * title_scale), int(title_h * title_scale))
+        title_rect = pygame.Rect((0, 150), scaled_size)
+        title_rect.centerx = screen.get_width() // 2
+        shadow_rect = title_rect.move(5, 5)
+        widgets.append(('title', scaled_size, title_rect.union(shadow_rect),
+                        lambda screen: self._draw_title(screen, title_rect, shadow_rect)))
         
         # Draw buttons
-        for btn in self.menu_buttons:
-            btn.draw(screen, self.font_med)
+        for i, btn in enumerate(self.menu_buttons):
+            widgets.append((('button', i), btn.visual_state(), btn.bounds(),
+                            lambda screen, btn=btn: btn.draw(screen, self.font_med)))
 
-    def draw_level_select(self, screen):
+        return self._present(self.menu_view, screen, widgets, self.save_manager.data['total_deaths'])
+
+    def _draw_title(self, screen, title_rect, shadow_rect):
+        title_surf, title_shadow = self.title_surfs
+        # Shadow
+        screen.blit(pygame.transform.scale(title_shadow, shadow_rect.size), shadow_rect)
+        # Main title
+        screen.blit(pygame.transform.scale(title_surf, title_rect.size), title_rect)
+
+    def _level_select_background(self, size):
+        screen = pygame.Surface(size)
         screen.fill(DARK_PURPLE)
         title = self.font_large.render("SELECT LEVEL", True, YELLOW)
         hint = self.font_small.render("ESC to go back", True, WHITE)
 
         screen.blit(title, title.get_rect(centerx=screen.get_width() // 2, y=100))
         screen.blit(hint, hint.get_rect(centerx=screen.get_width() // 2, bottom=screen.get_height() - 60))
+        return screen
 
+    def draw_level_select(self, screen):
+        widgets = []
         unlocked = self.save_manager.data["unlocked_level"]
+        # NEW: Only the current page's cells exist, so draw cost doesn't grow with the level count
         for i, btn in enumerate(self.level_buttons):
-            if i + 1 <= unlocked:
-                btn.draw(screen, self.font_med)
+            if btn not in self.level_cells or btn.value <= unlocked:
+                widgets.append((('level', i), btn.visual_state(), btn.bounds(),
+                                lambda screen, btn=btn: btn.draw(screen, self.font_med)))
             else:
-                pygame.draw.rect(screen, GRAY, btn.rect)
-                pygame.draw.rect(screen, DARK_PURPLE, btn.rect, 3)
-                lock_surf = self.font_med.render("LOCKED", True, DARK_PURPLE)
-                screen.blit(lock_surf, lock_surf.get_rect(center=btn.rect.center))
+                widgets.append((('level', i), ('locked', tuple(btn.rect)), btn.rect.copy(),
+                                lambda screen, btn=btn: self._draw_locked(screen, btn)))
+        if self.page_count > 1:
+            label = self.font_small.render(f"Page {self.level_page + 1}/{self.page_count}", True, WHITE)
+            label_rect = label.get_rect(centerx=screen.get_width() // 2, centery=self.page_label_y)
+            widgets.append(('page', self.level_page, label_rect, lambda screen: screen.blit(label, label_rect)))
+        return self._present(self.level_select_view, screen, widgets)
+
+    def _draw_locked(self, screen, btn):
+        pygame.draw.rect(screen, GRAY, btn.rect)
+        pygame.draw.rect(screen, DARK_PURPLE, btn.rect, 3)
+        lock_surf = self.font_med.render("LOCKED", True, DARK_PURPLE)
+        screen.blit(lock_surf, lock_surf.get_rect(center=btn.rect.center))
 
     def draw_hud(self, screen, level):
+        self.active_view = None  # NEW: Gameplay drew over the screen; menus repaint fully next time
         # NEW: Enhanced HUD with skull icon and borders
         hud_padding = 10
         
@@ -234,44 +468,32 @@ class UIManager:
         screen.blit(level_txt, level_rect)
 
     def draw_death_screen(self, screen, message):
-        # NEW: Vignette darkening effect
-        vignette = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        center_x, center_y = screen.get_width() // 2, screen.get_height() // 2
-        for r in range(max(screen.get_width(), screen.get_height()) // 2, 0, -20):
-            alpha = int(150 * (1 - r / (max(screen.get_width(), screen.get_height()) // 2)))
-            pygame.draw.circle(vignette, (*DARK_RED, alpha), (center_x, center_y), r)
-        screen.blit(vignette, (0, 0))
+        # NEW: Vignette darkening effect (ring step follows the quality tier, 0 = off)
+        vignette_step = current_tier()['vignette_step']
+        if vignette_step:
+            vignette = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            center_x, center_y = screen.get_width() // 2, screen.get_height() // 2
+            for r in range(max(screen.get_width(), screen.get_height()) // 2, 0, -vignette_step):
+                alpha = int(150 * (1 - r / (max(screen.get_width(), screen.get_height()) // 2)))
+                pygame.draw.circle(vignette, (*DARK_RED, alpha), (center_x, center_y), r)
+            screen.blit(vignette, (0, 0))
         
         overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
         overlay.fill((80, 0, 0, 200))
         screen.blit(overlay, (0, 0))
         
         # NEW: Spawn death particles if not initialized
-        if len(self.death_particles) < 30:
-            for _ in range(30):
-                self.death_particles.append({
-                    'x': random.randint(0, screen.get_width()),
-                    'y': -20,
-                    'vy': random.uniform(50, 150),
-                    'size': random.randint(3, 8),
-                    'color': random.choice([RED, DARK_RED, ORANGE]),
-                    'life': random.uniform(2, 4)
-                })
+        death_particle_count = scaled_count(DEATH_PARTICLE_COUNT)
+        if len(self.death_particles) < death_particle_count:
+            for _ in range(death_particle_count):
+                frames = self.effect_sprites.dot(random.choice([RED, DARK_RED, ORANGE]), random.randint(3, 8))
+                self.death_particles.spawn(random.randint(0, screen.get_width()), -20, 0, random.uniform(50, 150),
+                                           frames, life=random.uniform(2, 4))
         
-        # NEW: Update and draw death particles
-        for particle in self.death_particles[:]:
-            particle['y'] += particle['vy'] * 0.016
-            particle['life'] -= 0.016
-            if particle['y'] > screen.get_height() or particle['life'] <= 0:
-                self.death_particles.remove(particle)
-            else:
-                alpha = int(255 * (particle['life'] / 4))
-                surf = pygame.Surface((particle['size']*2, particle['size']*2), pygame.SRCALPHA)
-                pygame.draw.circle(surf, (*particle['color'], alpha), (particle['size'], particle['size']), particle['size'])
-                screen.blit(surf, (int(particle['x']), int(particle['y'])))
+        # NEW: Draw death particles (advanced in update)
+        self.death_particles.draw(screen)
         
         # NEW: Animated "YOU DIED" with shake effect
-        self.death_timer += 0.1
         shake_x = int(random.uniform(-3, 3) * abs(math.sin(self.death_timer * 5)))
         shake_y = int(random.uniform(-3, 3) * abs(math.sin(self.death_timer * 5)))
         pulse = 1.0 + 0.1 * abs(math.sin(self.death_timer * 2))
@@ -295,37 +517,20 @@ class UIManager:
         overlay.fill((0, 100, 0, 150))
         screen.blit(overlay, (0, 0))
         
-        # NEW: Spawn victory confetti
-        if len(self.victory_particles) < 100:
-            for _ in range(100):
-                self.victory_particles.append({
-                    'x': random.randint(0, screen.get_width()),
-                    'y': random.randint(-100, -20),
-                    'vx': random.uniform(-50, 50),
-                    'vy': random.uniform(100, 200),
-                    'size': random.randint(4, 10),
-                    'color': random.choice([GREEN, YELLOW, CYAN, WHITE]),
-                    'rotation': random.uniform(0, 360),
-                    'rot_speed': random.uniform(-5, 5)
-                })
+        # NEW: Spawn victory confetti (pieces are pre-rotated; spin is degrees per second)
+        confetti_count = scaled_count(VICTORY_CONFETTI_COUNT)
+        if len(self.victory_particles) < confetti_count:
+            kinds = self.effect_sprites.confetti_kinds()
+            for _ in range(confetti_count):
+                frames = self.effect_sprites.confetti_piece(random.randrange(kinds), random.randint(4, 10))
+                self.victory_particles.spawn(random.randint(0, screen.get_width()), random.randint(-100, -20),
+                                             random.uniform(-50, 50), random.uniform(100, 200), frames,
+                                             angle=random.uniform(0, 360), spin=random.uniform(-300, 300))
         
-        # NEW: Update and draw confetti
-        for particle in self.victory_particles[:]:
-            particle['x'] += particle['vx'] * 0.016
-            particle['y'] += particle['vy'] * 0.016
-            particle['rotation'] += particle['rot_speed']
-            if particle['y'] > screen.get_height() + 20:
-                self.victory_particles.remove(particle)
-            else:
-                # Draw rotating confetti
-                surf = pygame.Surface((particle['size']*2, particle['size']*2), pygame.SRCALPHA)
-                pygame.draw.rect(surf, particle['color'], (0, 0, particle['size'], particle['size']))
-                rotated = pygame.transform.rotate(surf, particle['rotation'])
-                rect = rotated.get_rect(center=(int(particle['x']), int(particle['y'])))
-                screen.blit(rotated, rect)
+        # NEW: Draw confetti in one batch (advanced in update)
+        self.victory_particles.draw(screen)
         
         # NEW: Animated victory banner
-        self.victory_timer += 0.08
         pulse = 1.0 + 0.08 * abs(math.sin(self.victory_timer * 2))
         
         win_text = "LEVEL COMPLETE!"
@@ -335,10 +540,11 @@ class UIManager:
         win_rect = win_scaled.get_rect(centerx=screen.get_width() // 2, centery=screen.get_height() // 3)
         
         # Glow effect
-        glow_alpha = int(100 * abs(math.sin(self.victory_timer * 3)))
-        glow_surf = pygame.Surface((win_rect.w + 20, win_rect.h + 20), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surf, (*GREEN, glow_alpha), (0, 0, win_rect.w + 20, win_rect.h + 20))
-        screen.blit(glow_surf, (win_rect.x - 10, win_rect.y - 10))
+        if current_tier()['glow']:
+            glow_alpha = int(100 * abs(math.sin(self.victory_timer * 3)))
+            glow_surf = pygame.Surface((win_rect.w + 20, win_rect.h + 20), pygame.SRCALPHA)
+            pygame.draw.rect(glow_surf, (*GREEN, glow_alpha), (0, 0, win_rect.w + 20, win_rect.h + 20))
+            screen.blit(glow_surf, (win_rect.x - 10, win_rect.y - 10))
         
         screen.blit(win_scaled, win_rect)
         
@@ -2,16 +2,28 @@ import pygame
 import json
 import random
 import os
-from settings import GAME_WIDTH
+import tempfile
+import threading
+import time
+from settings import GAME_WIDTH, SAVE_DURABILITY, SAVE_COALESCE_SECONDS
 
 class SaveManager:
-    def __init__(self, save_file="rage_save.json"):
+    def __init__(self, save_file="rage_save.json", durability=SAVE_DURABILITY):
         self.save_file = save_file
+        self.durability = durability
         self.data = {
             "total_deaths": 0,
             "unlocked_level": 1,
             "rage_meter": 0
         }
+        # NEW: Background writer state (all guarded by _lock)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._dirty = False
+        self._writing = False
+        self._flushing = False
+        self._closed = False
+        self._writer = None
         self.load()
 
     def load(self):
@@ -24,20 +36,88 @@ class SaveManager:
                 self.save()
 
     def save(self):
+        """NEW: Queue a write; bursts of calls collapse into one background write"""
+        if self.durability == 'sync':
+            with self._lock:
+                payload = json.dumps(self.data, indent=2)
+            self._write(payload)
+            return
+        with self._changed:
+            self._dirty = True
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="SaveWriter", daemon=True)
+                self._writer.start()
+            self._changed.notify_all()
+
+    def flush(self):
+        """NEW: Block until every queued change is on disk (quit, level change)"""
+        with self._changed:
+            if self._writer is None:
+                return
+            self._flushing = True
+            self._changed.notify_all()
+            while self._dirty or self._writing:
+                self._changed.wait()
+            self._flushing = False
+
+    def close(self):
+        self.flush()
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def _writer_loop(self):
+        while True:
+            with self._changed:
+                while not (self._dirty or self._closed):
+                    self._changed.wait()
+                if not self._dirty:
+                    return
+                # Give the burst time to settle unless someone is waiting on us
+                deadline = time.monotonic() + SAVE_COALESCE_SECONDS
+                while not (self._flushing or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+                payload = json.dumps(self.data, indent=2)
+                self._dirty = False
+                self._writing = True
+            self._write(payload)
+            with self._changed:
+                self._writing = False
+                self._changed.notify_all()
+
+    def _write(self, payload):
+        """NEW: Atomic replace so a crash mid-write never corrupts the save"""
+        directory = os.path.dirname(os.path.abspath(self.save_file))
+        tmp_path = None
         try:
-            with open(self.save_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(self.save_file), suffix='.tmp', dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+                if self.durability == 'durable':
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.save_file)
         except IOError:
             print(f"Error: Could not write to save file '{self.save_file}'.")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def add_death(self):
-        self.data["total_deaths"] += 1
-        self.data["rage_meter"] = min(100, self.data["rage_meter"] + 3)
+        with self._lock:
+            self.data["total_deaths"] += 1
+            self.data["rage_meter"] = min(100, self.data["rage_meter"] + 3)
         self.save()
 
     def unlock_level(self, level_num):
         if level_num > self.data["unlocked_level"]:
-            self.data["unlocked_level"] = level_num
+            with self._lock:
+                self.data["unlocked_level"] = level_num
             self.save()
 
 class Camera:
@@ -60,6 +140,13 @@ class Camera:
         self.shake_intensity = intensity
         self.shake_timer = duration
 
+    def get_state(self):
+        """NEW: Compact snapshot for the rewind buffer"""
+        return (self.x, self.shake_timer, self.shake_intensity)
+
+    def set_state(self, state):
+        self.x, self.shake_timer, self.shake_intensity = state
+
     def get_x(self):
         if self.shake_timer > 0:
             offset = random.randint(-int(self.shake_intensity), int(self.shake_intensity))
@@ -0,0 +1,74 @@
+import random
+import time
+import pygame
+from settings import *
+from player import Player
+from utils import Camera
+from rewind import RewindBuffer
+from simthread import RenderView
+
+
+class LevelWarmup:
+    """Builds everything a level start needs, a slice at a time.
+
+    Started when the victory screen comes up, it resets and seeds the next
+    level, constructs its player, camera and rewind buffer, draws the opening
+    view offscreen so lazily built render caches (atlas variants, zone
+    overlays) exist, and flushes pending saves, spending at most a small
+    budget per frame. Game._start_level then only swaps the prepared objects
+    in; without a warm-up it runs the same steps to completion.
+    """
+    def __init__(self, game, level_num):
+        self.level_num = level_num
+        self.done = False
+        self._steps = self._prepare(game)
+
+    def advance(self, budget=WARMUP_FRAME_BUDGET):
+        """Run steps for up to `budget` seconds (idle time on the victory screen)"""
+        deadline = time.perf_counter() + budget
+        while not self.done and time.perf_counter() < deadline:
+            self._step()
+
+    def finish(self):
+        while not self.done:
+            self._step()
+        return self
+
+    def _step(self):
+        try:
+            next(self._steps)
+        except StopIteration:
+            self.done = True
+
+    def _prepare(self, game):
+        level = game.levels[self.level_num - 1]
+        level.death_count = 0
+        level.reset()
+        # Seed the level's random streams so the attempt can be replayed
+        self.seed = LEVEL_SEED if LEVEL_SEED is not None else random.getrandbits(32)
+        level.reseed(self.seed)
+        self.level = level
+        yield
+        spawn_x, spawn_y = level.spawn
+        self.player = Player(spawn_x, spawn_y, game.asset_manager)
+        self.camera = Camera(level.width)
+        yield
+        self.rewind = RewindBuffer(level.snapshot_entities(self.player, self.camera))
+        if game.ghosts:
+            game.ghosts.stacks[self.level_num]  # Allocates the level's ghost rows
+        yield
+        # Render caches are built on first draw; do that draw offscreen now
+        surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
+        level.draw(surface, self.camera.get_x())
+        self.player.draw(surface, self.camera.get_x())
+        yield
+        if game.show_heatmap:
+            game._get_heatmap(level)
+            yield
+        self.render_view = None
+        if game.sim_thread:
+            self.render_view = RenderView(game.render_levels[self.level_num - 1],
+                                          Player(spawn_x, spawn_y, game.asset_manager), Camera(level.width))
+            yield
+        game.save_manager.flush()  # Persist progress at level boundaries
+        game.death_log.flush()
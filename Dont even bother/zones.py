@@ -0,0 +1,115 @@
+import array
+import pygame
+from settings import *
+
+# Physics modifier applied to the player: multipliers on ACCELERATION,
+# DECELERATION and PLAYER_SPEED (ground only), wind acceleration (always)
+# and the launch speed of a bounce pad (0 = none)
+NEUTRAL = (1.0, 1.0, 1.0, 0.0, 0.0, 0.0)
+
+MATERIALS = {
+    'ice': (0.3, 0.05, 1.2, 0.0, 0.0, 0.0),
+    'mud': (0.5, 2.0, 0.6, 0.0, 0.0, 0.0),
+    'sand': (0.7, 1.5, 0.8, 0.0, 0.0, 0.0),
+}
+MATERIAL_COLORS = {'ice': (170, 220, 255), 'mud': (110, 75, 45), 'sand': (220, 190, 120)}
+
+
+def combine(a, b):
+    """Overlapping zones multiply friction, add wind and keep the stronger bounce"""
+    return (a[0] * b[0], a[1] * b[1], a[2] * b[2], a[3] + b[3], a[4] + b[4], max(a[5], b[5]))
+
+
+class Zone:
+    """A rectangle of modified physics: wind, a bounce pad or a surface material.
+
+    Surface zones are a thin band on top of a platform, so they catch the
+    point under the player's feet while they stand there.
+    """
+    def __init__(self, rect, kind, modifier, asset_manager=None):
+        self.rect = pygame.Rect(rect)
+        self.kind = kind
+        self.modifier = modifier
+        self.asset_manager = asset_manager
+        self.draught = None  # Translucent wind overlay, built on first draw
+
+    @classmethod
+    def wind(cls, rect, force_x=0.0, force_y=-3500.0, asset_manager=None):
+        """Fan draught; force_y below -GRAVITY lifts the player"""
+        return cls(rect, 'wind', (1.0, 1.0, 1.0, force_x, force_y, 0.0), asset_manager)
+
+    @classmethod
+    def bounce(cls, plat, speed=BOUNCE_PAD_SPEED, width=28, offset=None, asset_manager=None):
+        """Trampoline on top of a platform (centred unless an x offset is given)"""
+        if speed > PLAYER_MAX_VERTICAL_SPEED:
+            raise ValueError(f"Bounce speed {speed} exceeds the player's vertical speed clamp ({PLAYER_MAX_VERTICAL_SPEED})")
+        x = plat.x + (plat.w - width) // 2 if offset is None else plat.x + offset
+        return cls((x, plat.top - ZONE_SURFACE_BAND, width, ZONE_SURFACE_BAND), 'bounce',
+                   (1.0, 1.0, 1.0, 0.0, 0.0, speed), asset_manager)
+
+    @classmethod
+    def surface(cls, plat, material, asset_manager=None):
+        """Ice, mud or sand covering a platform's top"""
+        return cls((plat.x, plat.top - ZONE_SURFACE_BAND, plat.w, ZONE_SURFACE_BAND), material,
+                   MATERIALS[material], asset_manager)
+
+    def draw(self, screen, camera_x):
+        x = self.rect.x - camera_x
+        if self.kind == 'wind':
+            atlas = self.asset_manager.atlas if self.asset_manager else None
+            fan = atlas.frame('fan_on', self.rect.x * 0.001) if atlas else None
+            if fan is not None:
+                for offset in range(0, self.rect.w - fan.get_width() + 1, fan.get_width()):
+                    screen.blit(fan, (x + offset, self.rect.bottom - fan.get_height()))
+            if self.draught is None:
+                self.draught = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+                self.draught.fill((200, 230, 255, 25))
+            screen.blit(self.draught, (x, self.rect.y))
+        elif self.kind == 'bounce':
+            pad = self.asset_manager.images.get('trampoline') if self.asset_manager else None
+            if pad:
+                screen.blit(pad, (x, self.rect.bottom - pad.get_height()))
+            else:
+                pygame.draw.rect(screen, ORANGE, (x, self.rect.bottom - 6, self.rect.w, 6))
+        else:
+            pygame.draw.rect(screen, MATERIAL_COLORS[self.kind], (x, self.rect.bottom, self.rect.w, 4))
+
+
+class ZoneGrid:
+    """Zones baked into a per-level grid of cells.
+
+    Each cell holds an index into a table of combined modifiers (built once
+    when the level loads), so the player's physics step does one lookup
+    however many zones the level has.
+    """
+    def __init__(self, zones, width, height=GAME_HEIGHT, cell=ZONE_CELL):
+        self.zones = list(zones)
+        self.cell = cell
+        self.cols = max(1, -(-width // cell))
+        self.rows = max(1, -(-height // cell))
+        self.table = [NEUTRAL]
+        self.cells = array.array('H', bytes(2 * self.cols * self.rows))
+        table_index = {NEUTRAL: 0}
+        for zone in self.zones:
+            left, right = max(0, zone.rect.left // cell), min(self.cols - 1, (zone.rect.right - 1) // cell)
+            top, bottom = max(0, zone.rect.top // cell), min(self.rows - 1, (zone.rect.bottom - 1) // cell)
+            for row in range(top, bottom + 1):
+                for col in range(left, right + 1):
+                    i = row * self.cols + col
+                    modifier = combine(self.table[self.cells[i]], zone.modifier)
+                    if modifier not in table_index:
+                        table_index[modifier] = len(self.table)
+                        self.table.append(modifier)
+                    self.cells[i] = table_index[modifier]
+
+    def at(self, x, y):
+        """Modifier for a world point (NEUTRAL outside the level)"""
+        col, row = int(x) // self.cell, int(y) // self.cell
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.table[self.cells[row * self.cols + col]]
+        return NEUTRAL
+
+    def draw(self, screen, camera_x):
+        for zone in self.zones:
+            if zone.rect.right > camera_x and zone.rect.x < camera_x + GAME_WIDTH:
+                zone.draw(screen, camera_x)